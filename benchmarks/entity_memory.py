@@ -0,0 +1,80 @@
+"""
+Memory benchmark for characters. Spawns 100k mob-like characters into a minimal world
+and reports the memory allocated per character (including its `HitPoints`, `Status`,
+and scheduler handles), as measured by `tracemalloc`.
+
+Bytes per mob measured with Python 3.13, the first being the layout before entities were slotted:
+
+    Per-instance __dict__, eager containers        3,098
+    __slots__, lazily allocated containers         1,218
+    + position store slot                          1,302
+    + region membership on creation                1,429
+
+Usage: python -m benchmarks.entity_memory
+"""
+import asyncio
+import gc
+import tracemalloc
+from typing import List
+
+from game.entity.character.character import Character
+from game.map.positions import Positions
+from game.map.regions import Regions
+from game.scheduler import Scheduler
+from network.shared_types import EntityData
+
+COUNT = 100_000
+# Bytes per mob of the per-instance `__dict__` layout, see the table above.
+BASELINE = 3_098
+
+
+class Mob(Character):
+    """
+    Stand-in for a mob, the server does not implement mobs yet.
+    """
+    __slots__ = ()
+
+    def serialize(self) -> EntityData:
+        return super().serialize()
+
+
+class World:
+    """
+    The parts of the world a character uses when it is created.
+    """
+
+    def __init__(self):
+        self.scheduler = Scheduler()
+        self.positions = Positions()
+        self.regions = Regions(1200, 1200)
+
+    def push(self, *_args) -> None:
+        pass
+
+
+async def measure() -> None:
+    world = World()
+    mobs: List[Mob] = []
+
+    gc.collect()
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+
+    for index in range(COUNT):
+        mobs.append(Mob(f"3-{index}", world, "rat", index % 1200, index // 1200))
+
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    # The list holding the mobs is not part of their cost.
+    total = after - before - (len(mobs) * 8)
+
+    print(f"Spawned {COUNT:,} mobs: {total / 1024 / 1024:,.1f} MiB, {total / COUNT:,.0f} bytes per mob.")
+    print(f"Baseline {BASELINE:,} bytes per mob, {1 - total / COUNT / BASELINE:.0%} less.")
+    print(f"Per-instance __dict__: {'yes' if hasattr(mobs[0], '__dict__') else 'no'}")
+
+    world.scheduler.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(measure())
@@ -0,0 +1,72 @@
+"""
+Microbenchmark for `Packet.serialize` on the hottest packets. Compares the generated
+fast-path serializer against pydantic's `model_dump(by_alias=True, exclude_none=True)`.
+
+Usage: python -m benchmarks.packet_serialize
+"""
+import timeit
+from typing import Callable, List, Tuple
+
+from network import opcodes as Opcodes
+from network.impl.combat import CombatPacket, CombatPacketData
+from network.impl.movement import MovementPacket, MovementPacketData
+from network.impl.points import PointsPacket, PointsPacketData
+from network.modules import Hits, Orientation
+from network.packet import Packet
+from network.shared_types import HitData
+from network import serializer
+
+ITERATIONS = 100_000
+
+
+def build_movement() -> Packet:
+    return MovementPacket(Opcodes.Movement.Step, MovementPacketData(
+        instance="0-12345", x=120, y=340, orientation=Orientation.Left, movement_speed=220
+    ))
+
+
+def build_points() -> Packet:
+    return PointsPacket(PointsPacketData(instance="0-12345", hit_points=420, max_hit_points=609))
+
+
+def build_combat() -> Packet:
+    return CombatPacket(Opcodes.Combat.Hit, CombatPacketData(
+        instance="0-12345", target="3-54321", hit=HitData(type=Hits.Normal, damage=17, ranged=False, aoe=0)
+    ))
+
+
+def model_dump(model):
+    return model.model_dump(by_alias=True, exclude_none=True)
+
+
+def run(label: str, build: Callable[[], Packet]) -> Tuple[float, float]:
+    packet = build()
+    results: List[float] = []
+
+    for implementation in (model_dump, serializer.serialize):
+        elapsed = timeit.timeit(lambda: serialize_with(packet, implementation), number=ITERATIONS)
+        results.append(ITERATIONS / elapsed)
+
+    before, after = results
+    print(f"{label:<10} model_dump: {before:>12,.0f} packets/s   fast path: {after:>12,.0f} packets/s   ({after / before:.2f}x)")
+
+    return before, after
+
+
+def serialize_with(packet: Packet, implementation) -> list:
+    """
+    Mirrors `Packet.serialize` with the model serializer swapped out.
+    """
+    data = implementation(packet.data)
+
+    if packet.opcode is None:
+        return [packet.id.value, data]
+
+    return [packet.id.value, packet.opcode.value, data]
+
+
+if __name__ == "__main__":
+    print(f"Serializing {ITERATIONS:,} packets per run.")
+    run("Movement", build_movement)
+    run("Points", build_points)
+    run("Combat", build_combat)
@@ -5,6 +5,12 @@ from pydantic_settings import BaseSettings, SettingsConfigDict
 # Used for multiple database support
 DatabaseTypes = Literal["mongo", "mongodb"]
 
+# How connections that cannot keep up with their outbound packets are handled.
+SlowConsumerPolicies = Literal["drop", "disconnect"]
+
+# How the packet queues are flushed every tick (see `NetworkManager.parse`).
+FlushModes = Literal["writer", "concurrent"]
+
 
 class Config(BaseSettings):
     model_config = SettingsConfigDict(
@@ -47,6 +53,7 @@ class Config(BaseSettings):
     mongodb_srv: bool = False
     mongodb_tls: bool = False
     mongodb_auth_source: str = ""
+    ip_ban_refresh: int = 60  # Seconds between reloads of the IP bans when change streams are unavailable.
     aggregate_threshold: int = 60000
 
     # === World Configurations ===
@@ -58,9 +65,48 @@ class Config(BaseSettings):
     gver: str = "0.0.1-alpha"
     minor: str = ""
     region_cache: bool = True
+    region_cache_size: int = 256  # Encoded regions kept in memory before the least recently used are evicted.
+    region_cache_path: str = ""  # Directory encoded regions are also stored in, disabled if empty.
+    map_width: int = 1200  # Width of the map in tiles, used to build the region grid.
+    map_height: int = 1200  # Height of the map in tiles, used to build the region grid.
     save_interval: int = 60000
+    save_slots: int = 12  # Groups of players saved one after the other over the save interval.
     message_limit: int = 300
 
+    # === Admission ===
+    # Seconds covered by the sliding windows counting connection attempts.
+    admission_window: int = 10
+    # Connection attempts allowed per address within the window.
+    admission_address_limit: int = 5
+    # Connection attempts allowed from all addresses within the window.
+    admission_global_limit: int = 200
+    # Seconds an address is denied for after going over its limit or being found banned.
+    admission_deny_duration: int = 30
+
+    # === Outbound Buffers ===
+    # Bytes buffered (or being written) for a connection before it is considered a slow consumer.
+    outbound_high_watermark: int = 256 * 1024
+    # Bytes the buffer must drain below before a slow consumer is considered caught up.
+    outbound_low_watermark: int = 64 * 1024
+    # Bytes after which a slow consumer is disconnected regardless of the policy.
+    outbound_max_buffer: int = 1024 * 1024
+    # What to do with slow consumers, `drop` discards stale coalescable packets (movement, points).
+    slow_consumer_policy: SlowConsumerPolicies = "drop"
+    # `writer` hands the queues off to each connection's writer task, `concurrent` sends them in groups.
+    flush_mode: FlushModes = "writer"
+    # Maximum number of connections written to at once by the `concurrent` flush.
+    flush_concurrency: int = 50
+    # Whether clients may negotiate the binary protocol (see `network/binary.py`) during the handshake.
+    binary_protocol: bool = True
+    # Whether clients may negotiate zlib compression of large frames (see `network/compression.py`).
+    frame_compression: bool = True
+    # Frames of at least this many bytes are compressed for clients that negotiated compression.
+    compression_threshold: int = 1024
+    # Largest size (in bytes) a compressed message from a client may decompress to.
+    max_message_size: int = 64 * 1024
+    # Whether WebSocket permessage-deflate is offered to clients, passed to uvicorn.
+    ws_per_message_deflate: bool = True
+
     # === Discord ===
     discord_enabled: bool = False
     discord_channel_id: str = ""
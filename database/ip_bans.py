@@ -0,0 +1,153 @@
+import asyncio
+import ipaddress
+from typing import Any, Dict, Iterable, Optional, Set, Tuple
+from common.log import log
+
+# Type alias for better readability
+BanNetworks = Dict[Tuple[int, int], Set[int]]  # (IP version, prefix length) -> masked network addresses
+
+class IPBans:
+    """
+    In-memory copy of the `ipbans` collection, so checking whether an address is banned is a
+    set lookup rather than a database round trip per connection. Each document's `ip` is either
+    a single address (`1.2.3.4`) or a CIDR range (`1.2.3.0/24`), IPv4 or IPv6.
+
+    Single addresses are kept in a set of strings. Ranges are grouped by IP version and prefix
+    length, each group being a set of network addresses as integers, so an address is checked
+    against all the ranges by masking it once per distinct prefix length.
+
+    The copy is refreshed from the collection by `watch`, which follows the collection's change
+    stream and falls back to polling every `interval` seconds when change streams are not
+    available (standalone servers), so bans are at most `interval` seconds stale.
+    """
+
+    def __init__(self, interval: float = 60):
+        self.interval = interval
+
+        self.addresses: Set[str] = set()
+        self.networks: BanNetworks = {}
+
+        self.loaded = False
+        self.task: Optional[asyncio.Task] = None
+
+    def is_banned(self, ip: str) -> bool:
+        """
+        :param ip: The IP string that we are checking for.
+        :return: True if the address is banned, or within a banned range.
+        """
+        if ip in self.addresses:
+            return True
+
+        try:
+            address = ipaddress.ip_address(ip)
+        except ValueError:
+            return False
+
+        # IPv4 clients connecting over an IPv6 socket show up as `::ffff:1.2.3.4`.
+        if address.version == 6 and address.ipv4_mapped:
+            address = address.ipv4_mapped
+
+            if str(address) in self.addresses:
+                return True
+
+        value = int(address)
+        bits = address.max_prefixlen
+
+        for (version, prefix), networks in self.networks.items():
+            if version != address.version:
+                continue
+
+            if (value >> (bits - prefix)) << (bits - prefix) in networks:
+                return True
+
+        return False
+
+    def load(self, documents: Iterable[Dict[str, Any]]):
+        """
+        Replaces the bans with the documents of the `ipbans` collection. The new sets are built
+        before they are swapped in, so checks made during a refresh see either the old or the new bans.
+        :param documents: The documents of the collection, entries without a valid `ip` are skipped.
+        """
+        addresses: Set[str] = set()
+        networks: BanNetworks = {}
+
+        for document in documents:
+            ip = document.get("ip")
+
+            if not isinstance(ip, str):
+                continue
+
+            try:
+                if "/" not in ip:
+                    addresses.add(str(ipaddress.ip_address(ip)))
+                    continue
+
+                network = ipaddress.ip_network(ip, strict=False)
+            except ValueError:
+                log.warning(f"Skipping invalid IP ban entry: {ip}.")
+                continue
+
+            # Full length prefixes are single addresses.
+            if network.prefixlen == network.max_prefixlen:
+                addresses.add(str(network.network_address))
+                continue
+
+            key = (network.version, network.prefixlen)
+            networks.setdefault(key, set()).add(int(network.network_address))
+
+        self.addresses, self.networks = addresses, networks
+        self.loaded = True
+
+    async def refresh(self, collection):
+        """
+        Reloads the bans from the collection.
+        :param collection: The `ipbans` collection.
+        """
+        documents = await collection.find({}, {"_id": 0, "ip": 1}).to_list(length=None)
+
+        self.load(documents)
+
+    async def watch(self, collection):
+        """
+        Keeps the bans up to date for as long as the server runs. Any change to the collection
+        reloads it entirely, ban lists being small compared to the cost of tracking each change.
+        :param collection: The `ipbans` collection.
+        """
+        try:
+            async with collection.watch() as stream:
+                async for _ in stream:
+                    await self.refresh(collection)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            log.debug(f"IP ban change stream unavailable ({e}), polling every {self.interval}s.")
+
+        await self.poll(collection)
+
+    async def poll(self, collection):
+        """
+        Reloads the bans every `interval` seconds.
+        :param collection: The `ipbans` collection.
+        """
+        while True:
+            await asyncio.sleep(self.interval)
+
+            try:
+                await self.refresh(collection)
+            except Exception as e:
+                log.error(f"Failed to refresh IP bans: {e}")
+
+    def start(self, collection):
+        """
+        Starts the task watching the collection.
+        """
+        self.stop()
+        self.task = asyncio.create_task(self.watch(collection))
+
+    def stop(self):
+        """
+        Stops the task watching the collection.
+        """
+        if self.task:
+            self.task.cancel()
+            self.task = None
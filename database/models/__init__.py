@@ -2,7 +2,7 @@ from .player import (
     PlayerInfo, PoisonInfo, ResetToken, SerializedEffects, SerializedDuration,
     PlayerEquipmentModel, PlayerInventoryModel, PlayerBankModel,
     PlayerQuestsModel, PlayerAchievementsModel, PlayerSkillsModel,
-    PlayerAbilitiesModel
+    PlayerAbilitiesModel, PlayerBundle
 )
 from .statistics import PlayerStatisticsModel, StatisticsData
 from .guild import GuildModel
@@ -7,6 +7,7 @@ from network.impl.quest import SerializedQuest
 from network.impl.achievement import SerializedAchievement
 from network.impl.skill import SerializedSkills
 from network.impl.ability import SerializedAbility
+from database.models.statistics import PlayerStatisticsModel
 
 class ResetToken(CamelModel):
     token: str
@@ -70,3 +71,18 @@ class PlayerSkillsModel(SerializedSkills):
 
 class PlayerAbilitiesModel(SerializedAbility):
     username: str
+
+class PlayerBundle(CamelModel):
+    """
+    All the data of a player, loaded from each of the player collections at once by the `Loader`.
+    Collections without a document for the player (e.g. new players) are left as None.
+    """
+    info: Optional[PlayerInfo] = None
+    equipment: Optional[PlayerEquipmentModel] = None
+    inventory: Optional[PlayerInventoryModel] = None
+    bank: Optional[PlayerBankModel] = None
+    quests: Optional[PlayerQuestsModel] = None
+    achievements: Optional[PlayerAchievementsModel] = None
+    skills: Optional[PlayerSkillsModel] = None
+    abilities: Optional[PlayerAbilitiesModel] = None
+    statistics: Optional[PlayerStatisticsModel] = None
@@ -1,7 +1,9 @@
 import asyncio
 from typing import Optional, Callable, Any
 from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
+from common.config import config
 from common.log import log
+from database.ip_bans import IPBans
 from database.mongodb_loader import Loader
 from database.mongodb_creator import Creator
 
@@ -33,6 +35,7 @@ class MongoDB:
         self.database: Optional[AsyncIOMotorDatabase] = None
         self.loader: Optional[Loader] = None
         self.creator: Optional[Creator] = None
+        self.ip_bans = IPBans(config.ip_ban_refresh)
         
         self.ready_callback: Optional[Callable[[], Any]] = None
         self.fail_callback: Optional[Callable[[Exception], Any]] = None
@@ -57,6 +60,10 @@ class MongoDB:
             self.database = client[self.database_name]
             self.loader = Loader(self.database)
             self.creator = Creator(self.database)
+
+            # Bans are loaded before any connection is accepted, then kept up to date in the background.
+            await self.ip_bans.refresh(self.database.ipbans)
+            self.ip_bans.start(self.database.ipbans)
             
             log.notice("Successfully connected to the MongoDB server.")
             
@@ -86,12 +93,10 @@ class MongoDB:
     async def is_ip_banned(self, ip: str) -> bool:
         """
         Checks whether or not an IP string is contained within the database collection
-        for IP bans.
+        for IP bans. The check is made against the in-memory copy of the collection
+        (see `IPBans`), so it does not wait on the database.
 
         :param ip: The IP string that we are checking for.
         :return: True if the IP is banned, False otherwise.
         """
-        # TODO: Implement database query for IP bans
-        # cursor = self.database.ipbans.find({"ip": ip})
-        # return await cursor.to_list(length=1) is not None
-        return False
+        return self.ip_bans.is_banned(ip)
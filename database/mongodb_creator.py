@@ -1,5 +1,6 @@
 from __future__ import annotations
-from typing import TYPE_CHECKING
+from typing import Any, Callable, Dict, Iterable, TYPE_CHECKING
+from pydantic_core import to_jsonable_python
 from common.config import config
 from database.models.player import PlayerInfo, PoisonInfo
 
@@ -24,32 +25,65 @@ class Creator:
         @returns A serialized object that contains the player's information, we use
         this and store it in the database.
         """
-        return PlayerInfo(
-            username=player.username,
-            password=player.password,
-            email=player.email,
-            x=player.x,
-            y=player.y,
-            user_agent=player.user_agent,
-            rank=player.rank,
-            poison=PoisonInfo(
-                type=player.poison.type.value if player.poison and player.poison.type else -1,
-                remaining=int(player.poison.get_remaining_time()) if player.poison else -1
-            ) if player.poison is not None else None,
-            effects={}, # player.status.serialize() - Not yet implemented
-            hit_points=player.hit_points.get_hit_points(),
-            mana=player.mana.get_mana(),
-            orientation=player.orientation,
-            ban=player.ban,
-            mute=player.mute,
-            jail=player.jail,
-            last_warp=player.last_warp,
-            map_version=player.map_version,
-            regions_loaded=player.regions_loaded,
-            friends=[], # player.friends.serialize() - Not yet implemented
-            last_server_id=config.server_id,
-            last_address=player.connection.address,
-            last_global_chat=0, # player.last_global_chat - Not yet implemented
-            guild=player.guild,
-            pet="" # player.pet.key if player.pet else "" - Not yet implemented
-        )
+        return PlayerInfo(**{name: get(player) for name, get in PLAYER_INFO_FIELDS.items()})
+
+    @staticmethod
+    def serialize_fields(player: Player, fields: Iterable[str]) -> Dict[str, Any]:
+        """
+        Serializes only some of the player's information, as it is stored in the database.
+        @param player The player object that we want to serialize.
+        @param fields The names of the `PlayerInfo` fields we are serializing.
+        @returns The values of the fields keyed by their database (camelCase) name.
+        """
+        return {
+            PlayerInfo.model_fields[name].alias: to_jsonable_python(PLAYER_INFO_FIELDS[name](player), by_alias=True)
+            for name in fields
+        }
+
+    @staticmethod
+    def serialize_changes(player: Player, fields: Iterable[str]) -> Dict[str, Any]:
+        """
+        Creates the update document for the changes made to the player since it was last saved.
+        Only the changed fields are set, so that only what changed is encoded and written.
+        @param player The player whose changes we are saving.
+        @param fields The names of the `PlayerInfo` fields that changed.
+        @returns The update document (`$set`), empty if nothing changed.
+        """
+        fields = set(fields)
+
+        if not fields:
+            return {}
+
+        return {"$set": Creator.serialize_fields(player, fields)}
+
+
+# How each field of `PlayerInfo` is obtained from the player.
+PLAYER_INFO_FIELDS: Dict[str, Callable[[Player], Any]] = {
+    "username": lambda player: player.username,
+    "password": lambda player: player.password,
+    "email": lambda player: player.email,
+    "x": lambda player: player.x,
+    "y": lambda player: player.y,
+    "user_agent": lambda player: player.user_agent,
+    "rank": lambda player: player.rank,
+    "poison": lambda player: PoisonInfo(
+        type=player.poison.type.value if player.poison and player.poison.type else -1,
+        remaining=int(player.poison.get_remaining_time()) if player.poison else -1
+    ) if player.poison is not None else None,
+    "effects": lambda player: {}, # player.status.serialize() - Not yet implemented
+    "hit_points": lambda player: player.hit_points.get_hit_points(),
+    "mana": lambda player: player.mana.get_mana(),
+    "orientation": lambda player: player.orientation,
+    "ban": lambda player: player.ban,
+    "mute": lambda player: player.mute,
+    "jail": lambda player: player.jail,
+    "last_warp": lambda player: player.last_warp,
+    "map_version": lambda player: player.map_version,
+    "regions_loaded": lambda player: player.regions_loaded,
+    "friends": lambda player: [], # player.friends.serialize() - Not yet implemented
+    "last_server_id": lambda player: config.server_id,
+    "last_address": lambda player: player.connection.address,
+    "last_global_chat": lambda player: 0, # player.last_global_chat - Not yet implemented
+    "guild": lambda player: player.guild,
+    "pet": lambda player: "" # player.pet.key if player.pet else "" - Not yet implemented
+}
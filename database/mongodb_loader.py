@@ -1,6 +1,76 @@
+import asyncio
+from typing import Dict, Iterable, Optional, Tuple, Type
+from pydantic import ValidationError
+from common.log import log
+from database.models.player import (
+    PlayerInfo, PlayerEquipmentModel, PlayerInventoryModel, PlayerBankModel, PlayerQuestsModel,
+    PlayerAchievementsModel, PlayerSkillsModel, PlayerAbilitiesModel, PlayerBundle
+)
+from database.models.statistics import PlayerStatisticsModel
+from network.model import CamelModel
+
+# Type alias for better readability
+PlayerCollection = Tuple[str, Type[CamelModel]]  # (collection name, model of its documents)
+
+# The collections a player's data is stored in, keyed by their field in the `PlayerBundle`.
+PLAYER_COLLECTIONS: Dict[str, PlayerCollection] = {
+    "info": ("player_info", PlayerInfo),
+    "equipment": ("player_equipment", PlayerEquipmentModel),
+    "inventory": ("player_inventory", PlayerInventoryModel),
+    "bank": ("player_bank", PlayerBankModel),
+    "quests": ("player_quests", PlayerQuestsModel),
+    "achievements": ("player_achievements", PlayerAchievementsModel),
+    "skills": ("player_skills", PlayerSkillsModel),
+    "abilities": ("player_abilities", PlayerAbilitiesModel),
+    "statistics": ("player_statistics", PlayerStatisticsModel)
+}
+
+# Only the fields of the models are fetched, leaving out `_id` and any fields no longer in use.
+PROJECTIONS: Dict[str, Dict[str, int]] = {
+    collection: {"_id": 0, **{field.alias or name: 1 for name, field in model.model_fields.items()}}
+    for collection, model in PLAYER_COLLECTIONS.values()
+}
+
 class Loader:
     """
     The Loader class is responsible for retrieving and loading game data from the database.
     """
     def __init__(self, database=None):
         self.database = database
+
+    async def load_player(self, username: str, fields: Optional[Iterable[str]] = None) -> PlayerBundle:
+        """
+        Loads the data of a player from each of the player collections. The collections are
+        queried concurrently, so loading takes as long as the slowest query rather than all of them.
+        :param username: The username of the player we are loading.
+        :param fields: The fields of the `PlayerBundle` to load, all of them by default.
+        :returns: The player's data, with the collections that have no document left as None.
+        """
+        fields = list(PLAYER_COLLECTIONS if fields is None else fields)
+
+        if self.database is None:
+            return PlayerBundle()
+
+        documents = await asyncio.gather(*(self.find(field, username) for field in fields))
+
+        return PlayerBundle(**dict(zip(fields, documents)))
+
+    async def find(self, field: str, username: str) -> Optional[CamelModel]:
+        """
+        Finds the document of a player in one of the player collections.
+        :param field: The field of the `PlayerBundle` whose collection we are querying.
+        :param username: The username of the player.
+        :returns: The document validated by the collection's model, or None if there is no
+        document or it is invalid.
+        """
+        collection, model = PLAYER_COLLECTIONS[field]
+        document = await self.database[collection].find_one({"username": username}, PROJECTIONS[collection])
+
+        if document is None:
+            return None
+
+        try:
+            return model.model_validate(document)
+        except ValidationError as e:
+            log.error(f"Invalid {collection} document for {username}: {e}")
+            return None
@@ -0,0 +1,263 @@
+from __future__ import annotations
+import asyncio
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Set, Tuple, TYPE_CHECKING
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+from common.log import log
+from database.mongodb_creator import Creator
+
+if TYPE_CHECKING:
+    from database.mongodb import MongoDB
+    from game.entity.character.player.player import Player
+
+# Type alias for better readability
+PlayerWrite = Tuple[str, UpdateOne]  # (username, write)
+
+class Persistence:
+    """
+    Write-behind persistence of the players currently logged in. Rather than saving every
+    player to every collection at once each `save_interval`, players are marked dirty when
+    their data changes and are written in the background:
+
+    - Players are spread over `slots` slots, and one slot is flushed every `interval / slots`
+      seconds, so the writes are staggered across the interval instead of all happening at once.
+    - The player's information (`player_info`) is tracked per field by the player itself, so
+      only the fields that changed are serialized and written (`$set`).
+    - The writes of a flush are sent with a single unordered `bulk_write`.
+
+    Only `player_info` is saved, the player does not have the equipment, inventory, bank,
+    quests, achievements, skills, abilities, or statistics that the other collections hold.
+    """
+
+    def __init__(self, database: Optional[MongoDB] = None, interval: float = 60, slots: int = 12):
+        self.database = database
+        self.interval = interval  # Seconds in which every slot is flushed once.
+        self.slots = max(1, slots)
+
+        self.players: Dict[str, Player] = {}  # Players being persisted, keyed by username.
+        self.player_slots: Dict[str, int] = {}
+        self.next_slot = 0  # Slot given to the next player added, assigned round-robin.
+        self.slot = 0  # Slot flushed next.
+
+        self.dirty: Set[str] = set()
+        # Players that logged out, they are forgotten once their changes have been written.
+        self.leaving: Set[str] = set()
+        self.removals: Set[asyncio.Task] = set()  # Pending `remove` tasks started by `schedule_remove`.
+        # Flushes in progress per player, players are not forgotten while their changes are being written.
+        self.writing: Counter[str] = Counter()
+
+        self.flushes = 0
+        self.writes = 0  # Documents written.
+        self.skipped = 0  # Dirty documents that turned out unchanged.
+        self.failures = 0
+
+    def add(self, player: Player, saved: bool = True):
+        """
+        Starts persisting a player, generally once it has been loaded from the database.
+        :param player: The player we are adding.
+        :param saved: Whether the player's current data is what the database holds, in which
+        case nothing is written until it changes.
+        """
+        username = player.username
+
+        self.players[username] = player
+        self.leaving.discard(username)
+        self.player_slots[username] = self.next_slot
+        self.next_slot = (self.next_slot + 1) % self.slots
+
+        if saved:
+            # Changes made while loading the player are already in the database.
+            player.take_changes()
+        else:
+            player.mark_dirty()
+            self.dirty.add(username)
+
+    async def remove(self, player: Player):
+        """
+        Writes the player's pending changes and stops persisting it, used when the player logs out.
+        If the write fails, the player stays registered (and dirty) until a later flush succeeds.
+        """
+        username = player.username
+
+        if self.players.get(username) is not player:
+            return
+
+        self.leaving.add(username)
+
+        await self.flush([username])
+
+    def schedule_remove(self, player: Player):
+        """
+        Removes a player in the background, for callers that cannot wait on the write.
+        The task is kept until it finishes, see `wait_for_removals`.
+        """
+        if self.players.get(player.username) is not player:
+            return
+
+        task = asyncio.create_task(self.remove(player))
+
+        self.removals.add(task)
+        task.add_done_callback(self.removals.discard)
+
+    async def wait_for_removals(self):
+        """
+        Waits for the pending `remove` tasks, used before saving on shutdown.
+        """
+        if self.removals:
+            await asyncio.gather(*self.removals, return_exceptions=True)
+
+    def forget(self, username: str):
+        """
+        Stops persisting a player.
+        """
+        self.players.pop(username, None)
+        self.player_slots.pop(username, None)
+        self.leaving.discard(username)
+        self.dirty.discard(username)
+
+    def mark_dirty(self, player: Player):
+        """
+        Marks a player as changed so that it is written with its slot's next flush.
+        """
+        if player.username in self.players:
+            self.dirty.add(player.username)
+
+    def get_operations(self, usernames: Iterable[str]) -> Tuple[Dict[str, List[PlayerWrite]], Dict[str, Set[str]]]:
+        """
+        Builds the writes for the changes of the players.
+        :returns: The writes (and the player each is for) grouped by collection, and the changes
+        taken from each player, which are put back if their write fails.
+        """
+        operations: Dict[str, List[PlayerWrite]] = {}
+        taken: Dict[str, Set[str]] = {}
+
+        for username in usernames:
+            player = self.players.get(username)
+
+            if not player:
+                continue
+
+            fields = taken[username] = player.take_changes()
+            update = Creator.serialize_changes(player, fields)
+
+            if not update:
+                self.skipped += 1
+                continue
+
+            operations.setdefault("player_info", []).append(
+                (username, UpdateOne({"username": username}, update, upsert=True))
+            )
+
+        return operations, taken
+
+    async def flush(self, usernames: Iterable[str]):
+        """
+        Writes the changed documents of the players, with one `bulk_write` per collection.
+        Players whose writes fail are marked dirty again and retried with their next flush.
+        """
+        usernames = [username for username in usernames if username in self.players]
+        self.dirty.difference_update(usernames)
+        self.writing.update(usernames)
+
+        try:
+            await self.write(usernames)
+        finally:
+            self.writing -= Counter(usernames)
+
+            # Players that logged out are forgotten once nothing is left to write for them, and
+            # no other flush is still writing their changes (which are put back if it fails).
+            for username in self.leaving.intersection(usernames).difference(self.dirty, self.writing):
+                self.forget(username)
+
+    async def write(self, usernames: List[str]):
+        """
+        Sends the writes for the players' changes, see `flush`.
+        """
+        if not usernames or not self.database or self.database.database is None:
+            return
+
+        operations, taken = self.get_operations(usernames)
+
+        if not operations:
+            return
+
+        collections = list(operations)
+        results = await asyncio.gather(
+            *(self.database.database[collection].bulk_write([write for _, write in operations[collection]], ordered=False)
+              for collection in collections),
+            return_exceptions=True
+        )
+
+        self.flushes += 1
+
+        # Usernames whose write failed, per collection.
+        failed: Dict[str, Set[str]] = {}
+
+        for collection, result in zip(collections, results):
+            if not isinstance(result, Exception):
+                self.writes += len(operations[collection])
+                continue
+
+            # The writes are unordered, so all but the failed writes of a bulk write were applied.
+            failed[collection] = {
+                operations[collection][index][0]
+                for index in self.get_failed_writes(result, len(operations[collection]))
+            }
+
+            self.writes += len(operations[collection]) - len(failed[collection])
+            self.failures += 1
+            log.error(f"Failed to save {len(failed[collection])} documents to {collection}: {result}")
+
+        for username in failed.get("player_info", ()):
+            self.players[username].restore_changes(taken[username])
+            self.dirty.add(username)
+
+    @staticmethod
+    def get_failed_writes(error: Exception, count: int) -> Set[int]:
+        """
+        :param error: The exception raised by a bulk write.
+        :param count: The number of writes in the bulk write.
+        :returns: The indices of the writes that were not applied. Only a `BulkWriteError`
+        reports them, any other error is assumed to have failed the entire bulk write.
+        """
+        if isinstance(error, BulkWriteError):
+            return {write_error["index"] for write_error in error.details.get("writeErrors", [])}
+
+        return set(range(count))
+
+    async def flush_slot(self):
+        """
+        Flushes the dirty players of the next slot.
+        """
+        slot = self.slot
+        self.slot = (self.slot + 1) % self.slots
+
+        await self.flush([username for username in self.dirty if self.player_slots.get(username) == slot])
+
+    async def flush_all(self):
+        """
+        Flushes every dirty player, used when the server shuts down.
+        """
+        await self.flush(list(self.dirty))
+
+    async def run(self):
+        """
+        Flushes one slot every `interval / slots` seconds for as long as the server runs.
+        """
+        while True:
+            await asyncio.sleep(self.interval / self.slots)
+
+            try:
+                await self.flush_slot()
+            except Exception as e:
+                log.error(f"Error while saving players: {e}")
+
+    def summary(self) -> str:
+        """
+        :returns: A one line summary of the persistence counters.
+        """
+        return (
+            f"players: {len(self.players)}, dirty: {len(self.dirty)}, flushes: {self.flushes}, "
+            f"writes: {self.writes}, skipped: {self.skipped}, failures: {self.failures}"
+        )
@@ -8,6 +8,7 @@ from datetime import datetime
 from typing import List, Optional, Callable, Dict, override, Any, TYPE_CHECKING
 
 if TYPE_CHECKING:
+    from game.scheduler import Interval
     from game.world import World
 from game.packet_data import PacketData
 
@@ -16,9 +17,10 @@ from game.entity.entity import Entity
 from game.info.formulas import Formulas
 from game.entity.character.points.hitpoints import HitPoints
 from game.entity.character.effect.poison import Poison
-from game.entity.character.effect.status import Status
+from game.entity.character.effect.status import Status, effect_mask
 from game.entity.character.combat.hit import Hit
-from network.packet import Packet
+from game.entity.character.combat.hit_table import HitTable
+from network.packet import Packet, PacketBatch
 from network.modules import Constants, Defaults, Orientation, Hits, Effects, PacketType, PoisonTypes
 from network.shared_types import EntityData, Stats, Bonuses
 from network import opcodes as Opcodes, AttackStyle
@@ -35,12 +37,25 @@ PoisonCallback = Callable[[Optional[PoisonTypes], bool], None]
 HitCallback = Callable[[int, Optional["Character"], bool], None]
 DeathCallback = Callable[[Optional["Character"]], None]
 
+# Status effects that prevent a character from healing.
+HEALING_BLOCKERS = effect_mask(Effects.Freezing, Effects.Burning, Effects.Terror)
+
 
 class Character(Entity):
+    __slots__ = (
+        "world", "level", "attack_range", "plateau_level", "hit_points", "heal_rate", "movement_speed",
+        "attack_rate", "orientation", "damage_type", "poison", "status", "target", "_attackers",
+        "_damage_table", "moving", "pvp", "teleporting", "aoe", "status_effects", "projectile_name",
+        "last_step", "last_movement", "last_region_change", "healing_interval", "effect_interval",
+        "poison_interval", "poison_callback", "hit_callback", "death_callback", "death_i_callback"
+    )
+
     def __init__(self, instance: str, world: World, key: str, x: int, y: int):
         super().__init__(instance, key, x, y)
 
         self.world = world
+        self.world.positions.add(self)
+        self.world.regions.add(self)
         self.level = 1
         self.attack_range = 1
         self.plateau_level = 0
@@ -57,16 +72,18 @@ class Character(Entity):
 
         # States
         self.poison: Optional[Poison] = None
-        self.status: Status = Status()
+        self.status: Status = Status(world.scheduler)
 
         # Character that is currently being targeted.
         self.target: Optional["Character"] = None
 
         # List of entities attacking this character.
         # Used by combat to determine which character to target.
-        self.attackers: List["Character"] = []
+        # Most characters are never attacked, so the containers are only
+        # allocated on first use (see `attackers` and `damage_table`).
+        self._attackers: Optional[List["Character"]] = None
 
-        self.damage_table: Dict[str, int] = {}
+        self._damage_table: Optional[Dict[str, int]] = None
 
         self.moving = False
         self.pvp = False
@@ -82,9 +99,9 @@ class Character(Entity):
         self.last_movement = int(time.time() * 1000)
         self.last_region_change = -1
 
-        self.healing_task: Optional[asyncio.Task] = None
-        self.effect_task: Optional[asyncio.Task] = None
-        self.poison_task: Optional[asyncio.Task] = None
+        self.healing_interval: Optional[Interval] = None
+        self.effect_interval: Optional[Interval] = None
+        self.poison_interval: Optional[Interval] = None
 
         self.poison_callback: Optional[PoisonCallback] = None
         self.hit_callback: Optional[HitCallback] = None
@@ -99,52 +116,70 @@ class Character(Entity):
 
         self.start_intervals()
 
+    @property
+    def attackers(self) -> List["Character"]:
+        """
+        The characters attacking this character, allocated on first use.
+        """
+        if self._attackers is None:
+            self._attackers = []
+
+        return self._attackers
+
+    @attackers.setter
+    def attackers(self, attackers: List["Character"]) -> None:
+        self._attackers = attackers
+
+    @property
+    def damage_table(self) -> Dict[str, int]:
+        """
+        The total damage dealt by each attacking player (keyed by instance), allocated on first use.
+        """
+        if self._damage_table is None:
+            self._damage_table = {}
+
+        return self._damage_table
+
+    @damage_table.setter
+    def damage_table(self, damage_table: Dict[str, int]) -> None:
+        self._damage_table = damage_table
+
     def start_intervals(self) -> None:
         """
-        Starts the periodic intervals for the character.
+        Registers the periodic healing and effect callbacks with the world's scheduler.
         """
-        self.healing_task = asyncio.create_task(self._interval_loop(self.heal, self.heal_rate / 1000.0))
-        self.effect_task = asyncio.create_task(self._interval_loop(self.effects, Constants.EFFECT_RATE / 1000.0))
+        self.healing_interval = self.world.scheduler.every(self.heal_rate, self.heal)
+        self.effect_interval = self.world.scheduler.every(Constants.EFFECT_RATE, self.effects)
 
     def stop_intervals(self) -> None:
         """
-        Stops all active interval tasks.
+        Cancels all the active periodic callbacks.
         """
-        if self.healing_task:
-            self.healing_task.cancel()
-            self.healing_task = None
+        if self.healing_interval:
+            self.healing_interval.cancel()
+            self.healing_interval = None
 
-        if self.effect_task:
-            self.effect_task.cancel()
-            self.effect_task = None
+        if self.effect_interval:
+            self.effect_interval.cancel()
+            self.effect_interval = None
 
         self.stop_poison_interval()
 
     def start_poison_interval(self) -> None:
         """
-        Starts the poison interval task.
+        Registers the poison callback with the scheduler at the rate of the poison.
         """
         if self.poison:
-            self.poison_task = asyncio.create_task(self._interval_loop(self.handle_poison, self.poison.rate.total_seconds()))
+            rate = int(self.poison.rate.total_seconds() * 1000)
+            self.poison_interval = self.world.scheduler.every(rate, self.handle_poison)
 
     def stop_poison_interval(self) -> None:
         """
-        Stops the poison interval task.
-        """
-        if self.poison_task:
-            self.poison_task.cancel()
-            self.poison_task = None
-
-    async def _interval_loop(self, callback: Callable[[], Any], interval: float) -> None:
-        """
-        A helper method to run a callback periodically.
+        Cancels the poison callback.
         """
-        try:
-            while True:
-                await asyncio.sleep(interval)
-                callback()
-        except asyncio.CancelledError:
-            pass
+        if self.poison_interval:
+            self.poison_interval.cancel()
+            self.poison_interval = None
 
     def handle_hit_points(self) -> None:
         """
@@ -228,32 +263,49 @@ class Character(Entity):
         """
         Handles the area of effect damage.
         """
-        def aoe_callback(character: "Character") -> None:
+        targets: List["Character"] = []
+        self.for_each_nearby_character(targets.append, range_val)
+
+        table = HitTable()
+
+        for character in targets:
             distance = self.get_distance(character) + 1
-            hit = Hit(
-                Hits.Normal,
-                math.floor(damage / distance),
-                False,
-                distance
-            )
-            hit_data = hit.serialize()
-
-            # Create a hit packet and send it to the nearby regions.
-            self.send_to_regions(
-                CombatPacket(
-                    Opcodes.Combat.Hit,
-                    CombatPacketData(
-                        instance=attacker.instance if attacker else '',
-                        target=character.instance,
-                        hit=hit_data
-                    )
+            table.add(character, math.floor(damage / distance), aoe=distance)
+
+        self.handle_hit_table(table, attacker)
+
+    def handle_hit_table(self, table: HitTable, attacker: Optional["Character"] = None, hit_type: Hits = Hits.Normal) -> None:
+        """
+        Emits every hit in the table to the nearby regions in a single push, and then
+        applies the damage to each target.
+        :param table: The damage dealt to each target (see `handle_aoe`).
+        :param attacker: The character responsible for the hits.
+        :param hit_type: The type of hit displayed to the client.
+        """
+        if not table:
+            return
+
+        instance = attacker.instance if attacker else ''
+        packets: List[Packet] = []
+
+        for index, target in enumerate(table.targets):
+            hit = Hit(hit_type, table.damages[index], False, table.aoe[index])
+
+            packets.append(CombatPacket(
+                Opcodes.Combat.Hit,
+                CombatPacketData(
+                    instance=instance,
+                    target=target.instance,
+                    hit=hit.serialize()
                 )
-            )
+            ))
 
-            # Apply the damage to the character.
-            character.hit(hit.damage, attacker)
+        # Create the hit packets and send them to the nearby regions all at once.
+        self.send_to_regions(packets)
 
-        self.for_each_nearby_character(aoe_callback, range_val)
+        # Apply the damage to the characters.
+        for target, damage in table:
+            target.hit(damage, attacker)
 
     def handle_cold_damage(self) -> None:
         """
@@ -361,9 +413,7 @@ class Character(Entity):
             return
 
         # Certain status effects prevent the character from healing.
-        if (self.status.has(Effects.Freezing) or
-                self.status.has(Effects.Burning) or
-                self.status.has(Effects.Terror)):
+        if self.status.has_any(HEALING_BLOCKERS):
             return
 
         self.hit_points.increment(amount)
@@ -520,19 +570,20 @@ class Character(Entity):
         """
         Clears the attackers.
         """
-        self.attackers = []
+        self._attackers = None
 
     def remove_attacker(self, attacker: "Character") -> None:
         """
         Removes an attacker.
         """
-        self.attackers = [a for a in self.attackers if a.instance != attacker.instance]
+        if self._attackers:
+            self._attackers = [a for a in self._attackers if a.instance != attacker.instance]
 
     def get_attacker_count(self) -> int:
         """
         Gets the attacker count.
         """
-        return len(self.attackers)
+        return len(self._attackers) if self._attackers else 0
 
     def get_attack_rate(self) -> int:
         """
@@ -628,10 +679,10 @@ class Character(Entity):
         """
         Gets a random attacker.
         """
-        if not self.attackers:
+        if not self._attackers:
             return None
         # TODO: There should be a function in the random package to return a random element from a list already
-        return self.attackers[random.randint(0, len(self.attackers) - 1)]
+        return self._attackers[random.randint(0, len(self._attackers) - 1)]
 
     def get_aoe(self) -> int:
         """
@@ -682,7 +733,10 @@ class Character(Entity):
         """
         Checks if the character has an attacker.
         """
-        return any(a.instance == attacker.instance for a in self.attackers)
+        if not self._attackers:
+            return False
+
+        return any(a.instance == attacker.instance for a in self._attackers)
 
     def has_arrows(self) -> bool:
         """
@@ -705,7 +759,7 @@ class Character(Entity):
         #         len(self.attackers) > 0 or
         #         self.has_target() or
         #         not self.combat.expired())
-        return len(self.attackers) > 0 or self.has_target()
+        return bool(self._attackers) or self.has_target()
 
     def is_ranged(self) -> bool:
         """
@@ -831,10 +885,12 @@ class Character(Entity):
         if damage >= self.hit_points.get_hit_points():
             damage = self.hit_points.get_hit_points()
 
-        if attacker.instance not in self.damage_table:
-            self.damage_table[attacker.instance] = damage
+        damage_table = self.damage_table
+
+        if attacker.instance not in damage_table:
+            damage_table[attacker.instance] = damage
         else:
-            self.damage_table[attacker.instance] += damage
+            damage_table[attacker.instance] += damage
 
     def add_status_effect(self, hit: Hit) -> None:
         """
@@ -858,19 +914,12 @@ class Character(Entity):
         """
         Finds the nearest character to target within the list of attackers.
         """
-        if not self.attackers:
+        if not self._attackers:
             return None
 
-        nearest = self.attackers[0]
-        min_dist = self.get_distance(nearest)
+        slots = [attacker.slot for attacker in self._attackers if attacker.slot >= 0]
 
-        for i in range(1, len(self.attackers)):
-            dist = self.get_distance(self.attackers[i])
-            if dist < min_dist:
-                min_dist = dist
-                nearest = self.attackers[i]
-
-        return nearest
+        return self.world.positions.get_nearest(self.x, self.y, slots)
 
     def set_hit_points(self, hit_points: int) -> None:
         """
@@ -921,9 +970,9 @@ class Character(Entity):
             ignore=self.instance if ignore else ''
         ))
 
-    def send_to_regions(self, packet: Packet, ignore: bool = False) -> None:
+    def send_to_regions(self, packet: PacketBatch, ignore: bool = False) -> None:
         """
-        Sends a packet to all regions surrounding the player.
+        Sends a packet (or a group of packets) to all regions surrounding the player.
         """
         self.world.push(PacketType.Regions, PacketData(
             region=self.region,
@@ -941,16 +990,31 @@ class Character(Entity):
 
     def for_each_nearby_character(self, callback: Callable[["Character"], None], range_val: int = 1) -> None:
         """
-        Iterates through each nearby character.
+        Iterates through each nearby character. Only the entities within the surrounding
+        regions are checked, and the character itself is excluded.
+        :param callback: The nearby character currently being iterated.
+        :param range_val: The maximum distance (in tiles) of the characters from this one.
         """
-        # TODO: Implement world.get_grids() reference
-        pass
+        # Only the slots of the surrounding regions are candidates, and the distance
+        # check is done against the position store's columns.
+        nearby = self.world.positions.get_within(
+            self.x, self.y, range_val, self.world.regions.get_surrounding_slots(self.region)
+        )
+
+        for entity in nearby:
+            if entity.instance == self.instance or not entity.is_character():
+                continue
+
+            callback(entity)
 
     def for_each_attacker(self, callback: Callable[["Character"], None]) -> None:
         """
         Iterates through each attacker.
         """
-        for attacker in self.attackers:
+        if not self._attackers:
+            return
+
+        for attacker in self._attackers:
             callback(attacker)
 
     @override
@@ -3,6 +3,8 @@ from network.shared_types import HitData
 
 
 class Hit:
+    __slots__ = ("type", "damage", "ranged", "aoe", "magic", "archery", "attack_style")
+
     def __init__(
         self,
         hit_type: Hits,
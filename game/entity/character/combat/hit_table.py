@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+from array import array
+from typing import TYPE_CHECKING, Iterator, List, Tuple
+
+if TYPE_CHECKING:
+    from game.entity.character.character import Character
+
+
+class HitTable:
+    """
+    The hits of one attack against several targets (e.g. AoE damage). Rather than one `Hit`
+    object per target, every column is a flat array indexed the same way as `targets`,
+    so a crowd of targets costs a handful of arrays.
+    """
+    __slots__ = ("targets", "damages", "aoe")
+
+    def __init__(self):
+        self.targets: List[Character] = []
+        self.damages = array("q")
+        self.aoe = array("l")
+
+    def __len__(self) -> int:
+        return len(self.targets)
+
+    def __iter__(self) -> Iterator[Tuple[Character, int]]:
+        return zip(self.targets, self.damages)
+
+    def add(self, target: Character, damage: int, aoe: int = 0) -> None:
+        """
+        Appends a row to the table.
+        :param target: The character being hit.
+        :param damage: The damage dealt to the character.
+        :param aoe: The AoE radius reported to the client for this hit.
+        """
+        self.targets.append(target)
+        self.damages.append(damage)
+        self.aoe.append(aoe)
+
+    def get_total_damage(self) -> int:
+        """
+        :returns: The sum of the damage dealt to every target.
+        """
+        return sum(self.damages)
@@ -1,4 +1,4 @@
 from .poison import Poison
-from .status import Status
+from .status import Status, effect_mask
 
-__all__ = ["Poison", "Status"]
+__all__ = ["Poison", "Status", "effect_mask"]
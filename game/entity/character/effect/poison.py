@@ -5,6 +5,8 @@ class Poison:
     """
     Initializes an object of poison that can be stored in a character.
     """
+    __slots__ = ("type", "start", "name", "damage", "duration", "rate")
+
     def __init__(self, poison_type: PoisonTypes, start: datetime | None = None):
         self.type = poison_type
         self.start = start or datetime.now()
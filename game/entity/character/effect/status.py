@@ -1,24 +1,59 @@
-import asyncio
-from datetime import datetime, timedelta
 from typing import Dict, List, Callable, Optional
+from game.scheduler import Scheduler, Timeout
 from network.modules import Effects
 from database.models.player import SerializedEffects, SerializedDuration
 
 
-class Duration:
-    def __init__(self, task: asyncio.Task, start_time: datetime, duration: timedelta):
-        self.task = task
-        self.start_time = start_time
-        self.duration = duration
+def effect_mask(*effects: Effects) -> int:
+    """
+    Combines status effects into a bitmask that can be checked against a `Status`
+    in a single operation (see `Status.has_any` and `Status.has_all`).
+    :param effects: The status effects we are combining.
+    :returns: An integer with the bit of each effect set.
+    """
+    mask = 0
+
+    for effect in effects:
+        mask |= 1 << effect
+
+    return mask
 
 
 class Status:
-    def __init__(self):
-        self.effects: List[Effects] = []
-        self.durations: Dict[Effects, Duration] = {}
+    __slots__ = ("scheduler", "mask", "_effects", "_durations", "add_callback", "remove_callback")
+
+    def __init__(self, scheduler: Scheduler):
+        self.scheduler = scheduler
+        # Bitmask of the active effects, bit `n` is set when `Effects(n)` is active.
+        self.mask = 0
+        # Active effects in the order they were added, used only for iterating.
+        # Most characters never have an effect, so this is allocated on first use.
+        self._effects: Optional[List[Effects]] = None
+        # Timeouts for the effects with a duration, stored in the scheduler's deadline heap.
+        self._durations: Optional[Dict[Effects, Timeout]] = None
         self.add_callback: Optional[Callable[[Effects], None]] = None
         self.remove_callback: Optional[Callable[[Effects], None]] = None
 
+    @property
+    def effects(self) -> List[Effects]:
+        """
+        The active effects in the order they were added, allocated on first use.
+        """
+        if self._effects is None:
+            self._effects = []
+
+        return self._effects
+
+    @property
+    def durations(self) -> Dict[Effects, Timeout]:
+        """
+        The timeouts of the effects with a duration, allocated on first use.
+        """
+        if self._durations is None:
+            self._durations = {}
+
+        return self._durations
+
     def load(self, effects: SerializedEffects) -> None:
         """
         Loads the serialized status effects from the database and uses the start time
@@ -41,10 +76,13 @@ class Status:
         :param status_effects: The new status(es) effect we are adding.
         """
         for status in status_effects:
+            bit = 1 << status
+
             # Don't add the effect if it already exists.
-            if self.has(status):
+            if self.mask & bit:
                 continue
 
+            self.mask |= bit
             self.effects.append(status)
 
             if self.add_callback:
@@ -70,29 +108,17 @@ class Status:
 
         self.add(status_effect)
 
-        # Clear existing timeouts.
+        # Clear existing timeouts, the cancelled entry is discarded lazily by the scheduler.
         if status_effect in self.durations:
-            self.durations[status_effect].task.cancel()
-            del self.durations[status_effect]
+            self.durations.pop(status_effect).cancel()
 
         # Start a new effect duration handler.
-        async def timeout_coro():
-            try:
-                await asyncio.sleep(duration_ms / 1000.0)
-                self.remove(status_effect)
-                if callback:
-                    callback()
-            except asyncio.CancelledError:
-                # Task was cancelled, don't remove or call callback
-                pass
-
-        task = asyncio.create_task(timeout_coro())
-
-        self.durations[status_effect] = Duration(
-            task=task,
-            start_time=datetime.now() - timedelta(seconds=1),  # Match TS: Date.now() - 1000
-            duration=timedelta(milliseconds=duration_ms)
-        )
+        def expire():
+            self.remove(status_effect)
+            if callback:
+                callback()
+
+        self.durations[status_effect] = self.scheduler.timeout(duration_ms, expire)
 
     def remove(self, *status_effects: Effects) -> None:
         """
@@ -100,13 +126,15 @@ class Status:
         :param status_effects: The status effect(s) we are removing.
         """
         for status in status_effects:
-            if status in self.effects:
+            bit = 1 << status
+
+            if self.mask & bit:
+                self.mask &= ~bit
                 self.effects.remove(status)
 
             # Remove the status effect from the list of durations.
-            if status in self.durations:
-                self.durations[status].task.cancel()
-                del self.durations[status]
+            if self._durations and status in self._durations:
+                self._durations.pop(status).cancel()
 
             if self.remove_callback:
                 self.remove_callback(status)
@@ -115,20 +143,39 @@ class Status:
         """
         Removes all the effects and timeouts from the character's list of effects.
         """
-        self.effects = []
+        self.mask = 0
+        self._effects = None
 
         # Clear all the timeouts.
-        for status in list(self.durations.keys()):
-            self.durations[status].task.cancel()
-            del self.durations[status]
+        if self._durations:
+            for timeout in self._durations.values():
+                timeout.cancel()
+
+        self._durations = None
 
     def has(self, status: Effects) -> bool:
         """
-        Checks the array of status effects to see if the character has the status effect.
+        Checks the bitmask of status effects to see if the character has the status effect.
         :param status: The status effect we are checking the existence of.
-        :returns: Whether or not the character has the status effect in the array of effects.
+        :returns: Whether or not the character has the status effect.
+        """
+        return bool(self.mask & (1 << status))
+
+    def has_any(self, mask: int) -> bool:
+        """
+        Checks whether the character has at least one of the effects in a mask.
+        :param mask: A bitmask of effects created with `effect_mask`.
+        :returns: Whether any of the effects in the mask are active.
         """
-        return status in self.effects
+        return bool(self.mask & mask)
+
+    def has_all(self, mask: int) -> bool:
+        """
+        Checks whether the character has every one of the effects in a mask.
+        :param mask: A bitmask of effects created with `effect_mask`.
+        :returns: Whether all the effects in the mask are active.
+        """
+        return self.mask & mask == mask
 
     def has_timeout(self, status: Effects) -> bool:
         """
@@ -136,7 +183,7 @@ class Status:
         :param status: The status effect we are checking the existence of.
         :returns: Whether or not there is an existent timeout for the status effect.
         """
-        return status in self.durations
+        return bool(self._durations) and status in self._durations
 
     def has_permanent_freezing(self) -> bool:
         """
@@ -156,14 +203,12 @@ class Status:
         """
         effects: SerializedEffects = {}
 
-        now = datetime.now()
-        for status, duration in self.durations.items():
-            # Calculate remaining time in milliseconds
-            elapsed = now - duration.start_time
-            remaining = duration.duration - elapsed
-            remaining_ms = int(max(0, int(remaining.total_seconds() * 1000)))
+        if not self._durations:
+            return effects
 
-            effects[int(status)] = SerializedDuration(remaining_time=remaining_ms)
+        for status, timeout in self._durations.items():
+            # The remaining time is read straight from the deadline of the timeout.
+            effects[int(status)] = SerializedDuration(remaining_time=timeout.get_remaining_time())
 
         return effects
 
@@ -172,7 +217,10 @@ class Status:
         Iterates through all the active status effects and executes the callback function.
         :param callback: Contains the status effect we are iterating through currently.
         """
-        for status in self.effects:
+        if not self._effects:
+            return
+
+        for status in self._effects:
             callback(status)
 
     def on_add(self, callback: Callable[[Effects], None]) -> None:
@@ -1,13 +1,18 @@
 from __future__ import annotations
-from typing import TYPE_CHECKING, Any, Dict, List, Optional
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Dict, Optional, Tuple, Type
 import time
 
+from pydantic import BaseModel
+
 from common.config import config
 from common.log import log
 from common.utils import Utils
 from database.mongodb_creator import Creator
-from network import Login
+from network import Login, binary, compression
 from network.impl.handshake import HandshakePacket, ClientHandshakePacketData
+from network.impl.login import LoginPacketData
+from network.impl.ready import ReadyPacketData
+from network.packet_view import PacketView
 from network.packets import Packets
 
 if TYPE_CHECKING:
@@ -15,6 +20,27 @@ if TYPE_CHECKING:
     from game.world import World
     from network.connection import Connection
 
+# Type alias for better readability
+PacketHandler = Callable[["Incoming", Any], Awaitable[None]]
+
+# Dispatch table from packet id to the data model (if any) and the handler of the packet.
+_handlers: Dict[int, Tuple[Optional[Type[BaseModel]], PacketHandler]] = {}
+
+
+def handles(packet: Packets, model: Optional[Type[BaseModel]] = None) -> Callable[[PacketHandler], PacketHandler]:
+    """
+    Registers an `Incoming` method as the handler of a packet. When a model is specified, the
+    handler receives a `PacketView` of the packet data, validated lazily against the model,
+    rather than the raw data.
+    :param packet: The packet the method handles.
+    :param model: The `*PacketData` model describing the data of the packet.
+    """
+    def register(handler: PacketHandler) -> PacketHandler:
+        _handlers[packet] = (model, handler)
+        return handler
+
+    return register
+
 
 class Incoming:
     def __init__(self, player: Player):
@@ -27,8 +53,7 @@ class Incoming:
         self.connection.on_message(self.handle_message)
 
     async def handle_message(self, message: Any):
-        # TODO: Improve the validation and type checking
-        # The message is typically a list [packet_id, data] or [packet_id, opcode, data]
+        # The message is typically a list [packet_id, data]
         if not isinstance(message, list) or len(message) < 2:
             log.error(f"Invalid message format received: {message}")
             return
@@ -37,32 +62,51 @@ class Incoming:
         packet_id = message[0]
         data = message[1] if len(message) > 1 else None
 
-        self.connection.refresh_timeout()
+        if not self.completed_handshake and packet_id != Packets.Handshake:
+            log.warning(f"Received packet {packet_id} before handshake was completed.")
+            await self.connection.reject("lost")
+            return
 
-        try:
-            if not self.completed_handshake and packet_id != Packets.Handshake:
-                log.warning(f"Received packet {packet_id} before handshake was completed.")
-                await self.connection.reject("lost")
-            if packet_id == Packets.Handshake:
-                await self.handle_handshake(data)
-            elif packet_id == Packets.Login:
-                await self.handle_login(data)
-            elif packet_id == Packets.Ready:
-                pass
-            elif packet_id == Packets.Focus:
-                pass
-            else:
-                log.warning(f"Received unknown packet {packet_id}.")
+        metrics = self.world.network_manager.packet_metrics
+        entry = _handlers.get(packet_id) if isinstance(packet_id, int) else None
+
+        if entry is None:
+            metrics.unknown += 1
+            log.warning(f"Received unknown packet {packet_id}.")
+            return
+
+        model, handler = entry
+        start = time.perf_counter()
 
+        try:
+            await handler(self, PacketView(model, data) if model else data)
         except Exception as e:
+            metrics.errors += 1
             log.error(f"Error handling packet {packet_id}: {e}")
 
-    async def handle_handshake(self, data: Dict[str, Any]):
+        metrics.record(int(packet_id), self.get_opcode(data), (time.perf_counter() - start) * 1000)
+
+    @staticmethod
+    def get_opcode(data: Any) -> Optional[int]:
+        """
+        Opcodes are used to break the packet metrics down, so only small integers are accepted
+        to prevent clients from creating an unbounded number of entries.
+        :returns: The opcode in the packet data, if any.
+        """
+        opcode = data.get("opcode") if isinstance(data, dict) else None
+
+        if isinstance(opcode, int) and 0 <= opcode < 256:
+            return int(opcode)
+
+        return None
+
+    @handles(Packets.Handshake, ClientHandshakePacketData)
+    async def handle_handshake(self, data: PacketView[ClientHandshakePacketData]):
         """
         The handshake is responsible for verifying the integrity of the client initially.
         We ensure that the client is on the right version and reject it if it is not.
         """
-        game_version = data.get("gVer")
+        game_version = data.g_ver
         
         if game_version != config.gver:
             log.warning(f"Client version mismatch: {game_version} != {config.gver}")
@@ -71,30 +115,40 @@ class Incoming:
 
         self.completed_handshake = True
 
+        # Clients that support it may ask for the binary protocol and compression, the handshake reply is still JSON.
+        # These are read unvalidated so that clients asking for options we do not support fall back onto JSON.
+        use_binary = config.binary_protocol and data.get("encoding") == "binary"
+        use_compression = config.frame_compression and data.get("compression") == "zlib"
+
         # Immediately send the handshake packet by bypassing the queue so that server time is accurate.
         handshake_data = ClientHandshakePacketData(
             type="client",
             instance=self.player.instance,
             server_id=config.server_id,
-            server_time=int(time.time() * 1000) # Using milliseconds
+            server_time=int(time.time() * 1000), # Using milliseconds
+            encoding="binary" if use_binary else "json",
+            keys=list(binary.KEYS) if use_binary else None,
+            compression="zlib" if use_compression else None,
+            dictionary=compression.DICTIONARY.decode("utf-8") if use_compression else None
         )
         
         await self.connection.send([HandshakePacket(handshake_data).serialize()])
 
-    async def handle_login(self, data: Dict[str, Any]):
+        # Every frame after the handshake reply is sent (and may be received) in binary.
+        self.connection.binary = use_binary
+        self.connection.compression = use_compression
+
+    @handles(Packets.Login, LoginPacketData)
+    async def handle_login(self, data: PacketView[LoginPacketData]):
         # Login example: [{'opcode': 0, 'password': 'password', 'username': 'DearVolt'}]
         # Register example: [{'opcode': 0, 'password': 'password', 'username': 'DearVolt', 'email': 'example@example.com'}]
         # Guest example: [{'opcode': 2}]
-        opcode = data.get("opcode")
-        username = data.get("username")
-        password = data.get("password")
-        email = data.get("email")
+        opcode = data.opcode
 
         if opcode == Login.Login:
-            log.notice(f"Login request received with {data=}.")
-            pass
+            log.notice(f"Login request received for {data.username}.")
         elif opcode == Login.Register:
-            log.notice(f"Register request received with {data=}.")
+            log.notice(f"Register request received for {data.username}.")
         elif opcode == Login.Guest:
             log.notice("Guest login request received.")
             self.player.authenticated = True
@@ -102,5 +156,11 @@ class Incoming:
             self.player.username = Utils.get_guest_username()
 
             await self.player.load(Creator.serialize(self.player))
-        else:
-            log.warning(f"Received unknown login opcode {opcode}.")
+
+    @handles(Packets.Ready, ReadyPacketData)
+    async def handle_ready(self, data: PacketView[ReadyPacketData]):
+        pass
+
+    @handles(Packets.Focus)
+    async def handle_focus(self, data: Any):
+        pass
@@ -1,6 +1,6 @@
 import asyncio
 from datetime import datetime
-from typing import Dict, List
+from typing import Dict, List, Set, override
 
 from common.log import log
 from game.entity.character.character import Character
@@ -12,11 +12,12 @@ from network.impl.welcome import WelcomePacket
 from network.impl.points import PointsPacket, PointsPacketData
 from network.impl.player import PlayerData, PlayerPacket, PlayerPacketData
 from game.packet_data import PacketData
-from network.modules import PacketType, Ranks, AttackStyle, PoisonTypes
+from network.modules import PacketType, Ranks, AttackStyle, PoisonTypes, Orientation
 from network.packet import Packet
 from network import opcodes as Opcodes
 from game.entity.character.player.incoming import Incoming
 from database.models.player import PlayerInfo
+from database.mongodb_creator import PLAYER_INFO_FIELDS
 from game.entity.character.points.mana import Mana
 
 
@@ -63,23 +64,28 @@ class Player(Character):
         # Region data
         self.regions_loaded: List[int] = []
 
+        # Fields of the player's `PlayerInfo` changed since it was last saved, so saving only
+        # writes what changed (see `Persistence`).
+        self.changed_fields: Set[str] = set()
+
         self.connection.on_close(self.handle_close)
 
 
-    async def load(self, data: PlayerInfo) -> None:
+    async def load(self, data: PlayerInfo, saved: bool = True) -> None:
         """
         Loads the player data from the database. This is a crucial
         method as it ensures that the player's information is
         fully loaded from the database prior to calculating region data.
         @param data PlayerInfo object containing all data.
+        @param saved Whether the data is the player's stored document. Players without one
+        are written in full with their first save.
         """
         # The player's ban timestamp is in the future, so they are still banned.
         if data.ban > datetime.now().timestamp() * 1000:
             return await self.connection.reject("banned")
 
         # Store coords for when we're done loading.
-        self.x = data.x
-        self.y = data.y
+        self.update_position(data.x, data.y)
         self.name = data.username
         self.username = data.username
         self.guild = data.guild
@@ -101,6 +107,10 @@ class Player(Character):
         self.hit_points.update_hit_points(data.hit_points)
         self.mana.update_mana(data.mana)
 
+        # Guests are never saved. Changes to other players are saved in the background from here on.
+        if not self.is_guest:
+            self.world.persistence.add(self, saved)
+
         # self.friends.load(data.friends)
 
         # self.load_skills()
@@ -168,6 +178,22 @@ class Player(Character):
 
     def set_last_warp(self, last_warp: int) -> None:
         self.last_warp = last_warp
+        self.mark_dirty("last_warp")
+
+    @override
+    def set_position(self, x: int, y: int, with_teleport: bool = False) -> None:
+        super().set_position(x, y, with_teleport)
+        self.mark_dirty("x", "y")
+
+    @override
+    def set_orientation(self, orientation: Orientation) -> None:
+        super().set_orientation(orientation)
+        self.mark_dirty("orientation")
+
+    @override
+    def handle_hit_points(self) -> None:
+        super().handle_hit_points()
+        self.mark_dirty("hit_points")
 
     def handle_mana(self) -> None:
         self.send(PointsPacket(PointsPacketData(
@@ -175,11 +201,43 @@ class Player(Character):
             mana=self.mana.get_mana(),
             max_mana=self.mana.get_max_mana()
         )))
+        self.mark_dirty("mana")
+
+    def mark_dirty(self, *fields: str) -> None:
+        """
+        Marks fields of the player's `PlayerInfo` as changed so that they are saved with the
+        next flush (see `Persistence`).
+        @param fields The names of the fields that changed, every field if none are given.
+        """
+        self.changed_fields.update(fields or PLAYER_INFO_FIELDS)
+        self.world.persistence.mark_dirty(self)
+
+    def take_changes(self) -> Set[str]:
+        """
+        Returns the changes made since the player was last saved, and starts tracking anew.
+        @returns The changed fields.
+        """
+        fields = self.changed_fields
+        self.changed_fields = set()
+
+        return fields
+
+    def restore_changes(self, fields: Set[str]) -> None:
+        """
+        Puts back changes taken with `take_changes` that could not be saved.
+        """
+        self.changed_fields.update(fields)
 
     def handle_close(self) -> None:
         log.info(f"Closing player: {self.connection.address}")
         self.stop_intervals()
 
+        # Save the player's pending changes before it stops being persisted.
+        self.world.persistence.schedule_remove(self)
+
+        self.world.regions.remove(self)
+        self.world.positions.remove(self)
+
     def send(self, packet: Packet) -> None:
         """
         We create this function to make it easier to send
@@ -6,6 +6,8 @@ HitPointsCallback = Callable[[], None]
 
 
 class HitPoints(Points):
+    __slots__ = ("hit_points_callback",)
+
     def __init__(self, hit_points: int, max_hit_points: int | None = None):
         super().__init__(hit_points, max_hit_points if max_hit_points is not None else hit_points)
         self.hit_points_callback: Optional[HitPointsCallback] = None
@@ -6,6 +6,8 @@ ManaCallback = Callable[[], None]
 
 
 class Mana(Points):
+    __slots__ = ("mana_callback",)
+
     def __init__(self, mana: int, max_mana: int | None = None):
         super().__init__(mana, max_mana if max_mana is not None else mana)
         self.mana_callback: Optional[ManaCallback] = None
@@ -5,6 +5,7 @@ class Points(ABC):
     """
     An abstract class for creating a system used to manage points.
     """
+    __slots__ = ("points", "max_points")
 
     def __init__(self, points: int, max_points: int):
         self.points = points
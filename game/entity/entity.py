@@ -1,10 +1,15 @@
+from __future__ import annotations
 from abc import ABC, abstractmethod
-from typing import List, Optional, Callable, Any, Union
+from typing import List, Optional, Callable, Any, Union, TYPE_CHECKING
 import math
 
 from network.modules import EntityType, ResourceState, Orientation
 from network.shared_types import EntityData, EntityDisplayInfo
 
+if TYPE_CHECKING:
+    from game.map.positions import Positions
+    from game.map.regions import Regions
+
 # Type alias for better readability
 MovementCallback = Callable[[int, int], None]
 
@@ -14,6 +19,13 @@ class Entity(ABC):
     represents a unique ID assigned to each entity. `key` represents
     the entity's data identification (and image file name).
     """
+    # Entities are created by the thousands, so their attributes are slotted rather than
+    # stored in a per-instance `__dict__`. Subclasses that declare `__slots__` stay lean.
+    __slots__ = (
+        "instance", "key", "type", "name", "x", "y", "old_x", "old_y", "dead", "region",
+        "colour", "scale", "visible", "_recent_regions", "movement_callback", "positions", "slot",
+        "regions"
+    )
 
     def __init__(self, instance: str = "", key: str = "", x: int = -1, y: int = -1):
         self.instance = instance
@@ -35,10 +47,16 @@ class Entity(ABC):
         self.scale: float = 0.0  # scale of the entity (default if not specified)
         self.visible: bool = True  # used to hide an entity from being sent to the client.
 
-        self.recent_regions: List[int] = []  # regions the entity just left
+        self._recent_regions: Optional[List[int]] = None  # regions the entity just left, see `recent_regions`
 
         self.movement_callback: Optional[MovementCallback] = None
 
+        # The world's position store and our slot in it, assigned by `Positions.add`.
+        self.positions: Optional[Positions] = None
+        self.slot: int = -1
+        # The world's regions, assigned by `Regions.add`.
+        self.regions: Optional[Regions] = None
+
         self.update_position(x, y)
 
     def _get_entity_type(self, instance: Optional[str]) -> EntityType:
@@ -80,6 +98,12 @@ class Entity(ABC):
         self.x = x
         self.y = y
 
+        if self.positions is not None:
+            self.positions.set(self.slot, x, y, self.old_x, self.old_y)
+
+        if self.regions is not None:
+            self.regions.handle(self)
+
         # Make a callback
         if self.movement_callback:
             self.movement_callback(x, y)
@@ -99,6 +123,12 @@ class Entity(ABC):
         self.x = x
         self.y = y
 
+        if self.positions is not None:
+            self.positions.set(self.slot, x, y, self.old_x, self.old_y)
+
+        if self.regions is not None:
+            self.regions.handle(self)
+
     def set_region(self, region: int) -> None:
         """
         Update the entity's position.
@@ -106,12 +136,27 @@ class Entity(ABC):
         """
         self.region = region
 
+    @property
+    def recent_regions(self) -> List[int]:
+        """
+        The regions the entity just left. The list is only allocated once the entity
+        has changed regions.
+        """
+        if self._recent_regions is None:
+            self._recent_regions = []
+
+        return self._recent_regions
+
+    @recent_regions.setter
+    def recent_regions(self, regions: List[int]) -> None:
+        self._recent_regions = regions
+
     def set_recent_regions(self, regions: List[int]) -> None:
         """
         Replaces the array indicating recently left regions with a new array.
         :param regions: The new array of recent regions the entity left from.
         """
-        self.recent_regions = regions
+        self._recent_regions = regions
 
     def get_distance(self, entity: "Entity") -> int:
         """
@@ -1,11 +1,19 @@
 import math
 import random
-from typing import List, Optional, Union
+from bisect import bisect_right
+from typing import Iterable, List, Optional, Union
 
 from common.utils import Utils
+from game.entity.character.effect.status import effect_mask
 from network.modules import AttackStyle, Constants, DamageStyle, Effects
 from network.shared_types import Stats
 
+# Status effects that modify an attack. Most characters have none of them, so each group is
+# checked with a single `Status.has_any` before looking at the individual effects.
+ATTACKER_ACCURACY_EFFECTS = effect_mask(Effects.AccuracyBuff, Effects.AccuracySuperBuff, Effects.Terror)
+TARGET_ACCURACY_EFFECTS = effect_mask(Effects.DefenseBuff, Effects.DefenseSuperBuff, Effects.Terror)
+DAMAGE_EFFECTS = effect_mask(Effects.StrengthBuff, Effects.StrengthSuperBuff)
+
 
 class Formulas:
     LEVEL_EXP: List[int] = []
@@ -106,25 +114,27 @@ class Formulas:
             # Shared attack style increases accuracy by a factor of 0.05
             accuracy -= 0.05
 
-        # Increase accuracy if the attacker has the accuracy potion effect.
-        if attacker.status.has(Effects.AccuracyBuff):
-            accuracy -= 0.07
-        if attacker.status.has(Effects.AccuracySuperBuff):
-            accuracy -= 0.12
+        if attacker.status.has_any(ATTACKER_ACCURACY_EFFECTS):
+            # Increase accuracy if the attacker has the accuracy potion effect.
+            if attacker.status.has(Effects.AccuracyBuff):
+                accuracy -= 0.07
+            if attacker.status.has(Effects.AccuracySuperBuff):
+                accuracy -= 0.12
 
-        # Decrease accuracy if the target has the defense potion effect.
-        if target.status.has(Effects.DefenseBuff):
-            accuracy += 0.08
-        if target.status.has(Effects.DefenseSuperBuff):
-            accuracy += 0.12
+            # Terror decreases overall accuracy, so we increase it by 1.
+            if attacker.status.has(Effects.Terror):
+                accuracy += 1
 
-        # Increase accuracy if the target has the terror effect.
-        if target.status.has(Effects.Terror):
-            accuracy -= 0.4
+        if target.status.has_any(TARGET_ACCURACY_EFFECTS):
+            # Decrease accuracy if the target has the defense potion effect.
+            if target.status.has(Effects.DefenseBuff):
+                accuracy += 0.08
+            if target.status.has(Effects.DefenseSuperBuff):
+                accuracy += 0.12
 
-        # Terror decreases overall accuracy, so we increase it by 1.
-        if attacker.status.has(Effects.Terror):
-            accuracy += 1
+            # Increase accuracy if the target has the terror effect.
+            if target.status.has(Effects.Terror):
+                accuracy -= 0.4
 
         # We apply the damage absorption onto the max damage. See `get_damage_reduction` for more information.
         max_damage *= target.get_damage_reduction()
@@ -169,13 +179,14 @@ class Formulas:
             # Shared attack style gives a 3% boost.
             damage *= 1.03
 
-        # Apply a 10% damage boost if the character has the strength potion effect.
-        if character.status.has(Effects.StrengthBuff):
-            damage *= 1.1
+        if character.status.has_any(DAMAGE_EFFECTS):
+            # Apply a 10% damage boost if the character has the strength potion effect.
+            if character.status.has(Effects.StrengthBuff):
+                damage *= 1.1
 
-        # Apply 15% damage boost if the character has the super strength potion effect.
-        if character.status.has(Effects.StrengthSuperBuff):
-            damage *= 1.15
+            # Apply 15% damage boost if the character has the super strength potion effect.
+            if character.status.has(Effects.StrengthSuperBuff):
+                damage *= 1.15
 
         # Ensure the damage is not negative.
         if damage < 0:
@@ -274,36 +285,65 @@ class Formulas:
 
     @staticmethod
     def next_exp(experience: int) -> int:
+        """
+        :param experience: The experience we are checking.
+        :returns: The experience required for the next level, or -1 at the maximum level.
+        """
         if experience < 0:
             return -1
 
-        for i in range(1, len(Formulas.LEVEL_EXP)):
-            if experience < Formulas.LEVEL_EXP[i]:
-                return Formulas.LEVEL_EXP[i]
+        # `LEVEL_EXP` is sorted, so the first entry greater than the experience is the next level.
+        index = max(bisect_right(Formulas.LEVEL_EXP, experience), 1)
 
-        return -1
+        return Formulas.LEVEL_EXP[index] if index < len(Formulas.LEVEL_EXP) else -1
 
     @staticmethod
     def prev_exp(experience: int) -> int:
+        """
+        :param experience: The experience we are checking.
+        :returns: The experience required for the current level, or 0 below level 2.
+        """
         if experience < 0:
             return 0
 
-        for i in range(Constants.MAX_LEVEL, 0, -1):
-            if i < len(Formulas.LEVEL_EXP) and experience >= Formulas.LEVEL_EXP[i]:
-                return Formulas.LEVEL_EXP[i]
+        index = min(bisect_right(Formulas.LEVEL_EXP, experience), Constants.MAX_LEVEL + 1) - 1
 
-        return 0
+        return Formulas.LEVEL_EXP[index] if index >= 1 else 0
 
     @staticmethod
     def exp_to_level(experience: int) -> int:
+        """
+        :param experience: The experience we are converting.
+        :returns: The level for the amount of experience, or -1 for negative experience.
+        """
         if experience < 0:
             return -1
 
-        for i in range(1, len(Formulas.LEVEL_EXP)):
-            if experience < Formulas.LEVEL_EXP[i]:
-                return i
+        index = max(bisect_right(Formulas.LEVEL_EXP, experience), 1)
+
+        return index if index < len(Formulas.LEVEL_EXP) else Constants.MAX_LEVEL
+
+    @staticmethod
+    def exp_to_levels(experiences: Iterable[int]) -> List[int]:
+        """
+        Converts many experience values into levels in a single call, for example when
+        loading every skill of a player or building a leaderboard.
+        :param experiences: The experience values we are converting.
+        :returns: The levels in the same order as the experience values.
+        """
+        level_exp = Formulas.LEVEL_EXP
+        length = len(level_exp)
+        levels: List[int] = []
+
+        for experience in experiences:
+            if experience < 0:
+                levels.append(-1)
+                continue
+
+            index = max(bisect_right(level_exp, experience), 1)
+            levels.append(index if index < length else Constants.MAX_LEVEL)
 
-        return Constants.MAX_LEVEL
+        return levels
 
     @staticmethod
     def levels_to_experience(start_level: int, end_level: int) -> int:
@@ -14,6 +14,8 @@ class Loader:
         """
         Loads the levels into the Formulas global class. The formula has been taken from RuneScape
         experience formula. https://runescape.fandom.com/wiki/Experience
+        The resulting table is strictly increasing, which is what allows `Formulas` to look
+        levels up by bisection.
         """
         Formulas.LEVEL_EXP = [0] * Constants.MAX_LEVEL
         Formulas.LEVEL_EXP[0] = 0
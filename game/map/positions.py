@@ -0,0 +1,170 @@
+from __future__ import annotations
+from array import array
+from typing import Callable, Iterable, List, Optional, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from game.entity.entity import Entity
+
+# Type alias for better readability
+EntityFilter = Callable[["Entity"], bool]
+
+
+class Positions:
+    """
+    Column store for the positions of every entity in the world. Each entity is given a
+    dense slot id when it is added, and its coordinates are kept in flat arrays indexed by
+    that slot. `Entity.set_position` writes through to the store, so proximity queries read
+    integers straight out of the arrays rather than the attributes of each entity.
+
+    Queries are given the candidate slots to look at (usually the slots of the surrounding
+    regions, see `Regions.get_surrounding_slots`), and scan the whole store otherwise.
+    """
+
+    def __init__(self):
+        self.x = array("l")
+        self.y = array("l")
+        self.old_x = array("l")
+        self.old_y = array("l")
+
+        self.entities: List[Optional[Entity]] = []
+
+        # Slots freed by removed entities, reused before the arrays are grown.
+        self.free: List[int] = []
+
+    def __len__(self) -> int:
+        return len(self.entities) - len(self.free)
+
+    def add(self, entity: Entity) -> int:
+        """
+        Assigns a slot to the entity and stores its current position.
+        :param entity: The entity we are adding.
+        :returns: The slot id of the entity.
+        """
+        if entity.positions is self:
+            return entity.slot
+
+        if self.free:
+            slot = self.free.pop()
+            self.entities[slot] = entity
+        else:
+            slot = len(self.entities)
+            self.entities.append(entity)
+
+            for column in (self.x, self.y, self.old_x, self.old_y):
+                column.append(-1)
+
+        entity.positions = self
+        entity.slot = slot
+
+        self.set(slot, entity.x, entity.y, entity.old_x, entity.old_y)
+
+        return slot
+
+    def remove(self, entity: Entity) -> None:
+        """
+        Frees the slot of an entity so it can be reused.
+        :param entity: The entity we are removing.
+        """
+        if entity.positions is not self:
+            return
+
+        slot = entity.slot
+
+        self.entities[slot] = None
+        self.x[slot] = self.y[slot] = self.old_x[slot] = self.old_y[slot] = -1
+        self.free.append(slot)
+
+        entity.positions = None
+        entity.slot = -1
+
+    def set(self, slot: int, x: int, y: int, old_x: int, old_y: int) -> None:
+        """
+        Updates the position stored in a slot.
+        """
+        self.x[slot] = x
+        self.y[slot] = y
+        self.old_x[slot] = old_x
+        self.old_y[slot] = old_y
+
+    def get(self, slot: int) -> Optional[Entity]:
+        """
+        :returns: The entity occupying the slot, if any.
+        """
+        return self.entities[slot]
+
+    def get_within(
+            self,
+            x: int,
+            y: int,
+            distance: int,
+            slots: Optional[Iterable[int]] = None,
+            predicate: Optional[EntityFilter] = None
+    ) -> List[Entity]:
+        """
+        Finds every entity that is at most `distance` tiles away from a position on both
+        axes (the same check as `Entity.is_near`).
+        :param x: The x grid coordinate we are searching around.
+        :param y: The y grid coordinate we are searching around.
+        :param distance: The maximum distance in tiles on each axis.
+        :param slots: The candidate slots, every slot in the store is checked if not specified.
+        :param predicate: Optional filter applied to the entities within range.
+        :returns: The entities within range, in the order of the candidate slots.
+        """
+        xs, ys, entities = self.x, self.y, self.entities
+        min_x, max_x, min_y, max_y = x - distance, x + distance, y - distance, y + distance
+
+        if slots is None:
+            slots = range(len(entities))
+
+        found: List[Entity] = []
+
+        for slot in slots:
+            if min_x <= xs[slot] <= max_x and min_y <= ys[slot] <= max_y:
+                entity = entities[slot]
+
+                if entity is not None and (predicate is None or predicate(entity)):
+                    found.append(entity)
+
+        return found
+
+    def get_nearest(
+            self,
+            x: int,
+            y: int,
+            slots: Optional[Iterable[int]] = None,
+            predicate: Optional[EntityFilter] = None
+    ) -> Optional[Entity]:
+        """
+        Finds the entity closest to a position (by the same measure as `Entity.get_distance`).
+        When several entities are equally close, the first candidate wins.
+        :param x: The x grid coordinate we are searching around.
+        :param y: The y grid coordinate we are searching around.
+        :param slots: The candidate slots, every slot in the store is checked if not specified.
+        :param predicate: Optional filter the entity must pass (e.g. hostility).
+        :returns: The nearest entity, or None if there are no candidates.
+        """
+        xs, ys, entities = self.x, self.y, self.entities
+
+        if slots is None:
+            slots = range(len(entities))
+
+        nearest: Optional[Entity] = None
+        nearest_distance = -1
+
+        for slot in slots:
+            entity = entities[slot]
+
+            if entity is None:
+                continue
+
+            distance = abs(xs[slot] - x) + abs(ys[slot] - y)
+
+            if nearest is not None and distance >= nearest_distance:
+                continue
+
+            if predicate is not None and not predicate(entity):
+                continue
+
+            nearest, nearest_distance = entity, distance
+
+        return nearest
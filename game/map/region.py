@@ -0,0 +1,57 @@
+from __future__ import annotations
+from typing import Dict, Set, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from game.entity.entity import Entity
+
+
+class Region:
+    """
+    A region is a square section of the map (`Constants.MAP_DIVISION_SIZE` tiles wide).
+    It keeps track of the entities currently inside it so that packets can be sent to
+    the players in the vicinity without scanning the entire world.
+    """
+
+    def __init__(self, region_id: int):
+        self.id = region_id
+
+        # Instances of the players in the region, used as recipients for packets.
+        self.players: Set[str] = set()
+        # All the entities (including players) in the region, keyed by instance.
+        self.entities: Dict[str, Entity] = {}
+        # Position store slots of the entities in the region (an insertion-ordered set).
+        self.slots: Dict[int, None] = {}
+
+    def add_entity(self, entity: Entity) -> None:
+        """
+        Adds an entity to the region. Players are also added to the set of players.
+        :param entity: The entity we are adding.
+        """
+        self.entities[entity.instance] = entity
+
+        if entity.slot >= 0:
+            self.slots[entity.slot] = None
+
+        if entity.is_player():
+            self.players.add(entity.instance)
+
+    def remove_entity(self, entity: Entity) -> None:
+        """
+        Removes an entity (and the player instance if applicable) from the region.
+        :param entity: The entity we are removing.
+        """
+        self.entities.pop(entity.instance, None)
+        self.slots.pop(entity.slot, None)
+        self.players.discard(entity.instance)
+
+    def has_entity(self, entity: Entity) -> bool:
+        """
+        :returns: Whether or not the entity is in the region.
+        """
+        return entity.instance in self.entities
+
+    def has_players(self) -> bool:
+        """
+        :returns: Whether or not there are any players in the region.
+        """
+        return len(self.players) > 0
@@ -0,0 +1,165 @@
+import mmap
+import os
+import struct
+from collections import OrderedDict
+from typing import Any, Callable, Optional, Tuple
+
+from common.log import log
+from network.impl.map import EncodedMapData, encode_map_data
+
+# Type aliases for better readability
+RegionKey = Tuple[int, int]  # (map version, region id)
+RegionBuilder = Callable[[], Any]
+
+# Files on disk start with the buffer size of the payload (unsigned 32-bit, little endian), followed by the gzipped data.
+_header = struct.Struct("<I")
+
+
+class RegionCache:
+    """
+    Cache of the encoded map data (see `MapPacket`) of each region, keyed by the map version
+    and the region id. The terrain of a region only changes with the map version, so logins
+    and region transitions reuse the gzipped payload rather than encoding
+    identical data for every player.
+
+    Payloads are kept in memory with least recently used eviction once there are more than
+    `max_entries`. If a directory is specified, payloads are also written to disk and read back
+    through memory-mapped files, so they survive restarts and evicted regions are not re-encoded.
+    """
+
+    def __init__(self, max_entries: int = 256, directory: Optional[str] = None, enabled: bool = True):
+        self.max_entries = max_entries
+        self.directory = directory or None
+        self.enabled = enabled
+
+        self.entries: OrderedDict[RegionKey, EncodedMapData] = OrderedDict()
+
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        if self.enabled and self.directory:
+            os.makedirs(self.directory, exist_ok=True)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def get(self, map_version: int, region_id: int, build: RegionBuilder) -> EncodedMapData:
+        """
+        Grabs the encoded map data of a region, encoding it (and caching the result) if necessary.
+        :param map_version: The version of the map the region data belongs to.
+        :param region_id: The id of the region.
+        :param build: Creates the (unencoded) map data of the region, only called on a cache miss.
+        :returns: The encoded map data, ready to be sent with a `MapPacket`.
+        """
+        if not self.enabled:
+            return encode_map_data(build())
+
+        key = (map_version, region_id)
+        encoded = self.entries.get(key)
+
+        if encoded is not None:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return encoded
+
+        encoded = self.read(key)
+
+        if encoded is not None:
+            self.disk_hits += 1
+        else:
+            self.misses += 1
+            encoded = encode_map_data(build())
+            self.write(key, encoded)
+
+        self.store(key, encoded)
+
+        return encoded
+
+    def store(self, key: RegionKey, encoded: EncodedMapData) -> None:
+        """
+        Adds the encoded data to the in-memory cache, evicting the least recently used entries.
+        """
+        self.entries[key] = encoded
+        self.entries.move_to_end(key)
+
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def get_path(self, key: RegionKey) -> str:
+        """
+        :returns: The path of the file the region's encoded data is stored in on disk.
+        """
+        map_version, region_id = key
+        return os.path.join(self.directory, f"{map_version}-{region_id}.region")
+
+    def read(self, key: RegionKey) -> Optional[EncodedMapData]:
+        """
+        Reads the encoded data of a region from disk.
+        :returns: The encoded data, or None if there is no disk cache or the region is not in it.
+        """
+        if not self.directory:
+            return None
+
+        try:
+            with open(self.get_path(key), "rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                (buffer_size,) = _header.unpack_from(data)
+                return EncodedMapData(data[_header.size:], buffer_size)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, struct.error) as e:
+            log.warning(f"Could not read cached region {key}: {e}")
+            return None
+
+    def write(self, key: RegionKey, encoded: EncodedMapData) -> None:
+        """
+        Writes the encoded data of a region to disk, if the disk cache is enabled. The file is
+        written under a temporary name first so readers never see a partially written file.
+        """
+        if not self.directory:
+            return
+
+        path = self.get_path(key)
+        temporary = f"{path}.{os.getpid()}.tmp"
+
+        try:
+            with open(temporary, "wb") as file:
+                file.write(_header.pack(encoded.buffer_size))
+                file.write(encoded.data)
+
+            os.replace(temporary, path)
+        except OSError as e:
+            log.warning(f"Could not write cached region {key}: {e}")
+
+    def clear(self, map_version: Optional[int] = None) -> None:
+        """
+        Removes cached regions from memory and disk, e.g. after the map is updated.
+        :param map_version: Only remove the regions of a specific map version, all regions otherwise.
+        """
+        for key in [key for key in self.entries if map_version is None or key[0] == map_version]:
+            del self.entries[key]
+
+        if not self.directory:
+            return
+
+        for name in os.listdir(self.directory):
+            if not name.endswith(".region"):
+                continue
+
+            if map_version is not None and not name.startswith(f"{map_version}-"):
+                continue
+
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except OSError as e:
+                log.warning(f"Could not remove cached region {name}: {e}")
+
+    def summary(self) -> str:
+        """
+        :returns: A one line summary of the cache statistics.
+        """
+        return (f"regions: {len(self.entries)}, hits: {self.hits}, disk hits: {self.disk_hits}, "
+                f"misses: {self.misses}, evictions: {self.evictions}")
+
@@ -0,0 +1,156 @@
+from __future__ import annotations
+import math
+from typing import Callable, Iterator, List, Tuple, TYPE_CHECKING
+
+from game.map.region import Region
+from network.modules import Constants
+
+if TYPE_CHECKING:
+    from game.entity.entity import Entity
+
+
+class Regions:
+    """
+    The map is split into a fixed grid of regions, each `division_size` tiles wide. Region
+    ids increase from left to right, then top to bottom. Every region keeps a set of the
+    entities inside it, and the surrounding regions of each region are computed once when
+    the grid is created so that sending packets to an area is a lookup.
+    """
+
+    def __init__(self, width: int, height: int, division_size: int = Constants.MAP_DIVISION_SIZE):
+        self.width = width
+        self.height = height
+        self.division_size = division_size
+
+        # Number of regions horizontally and vertically.
+        self.side_length = math.ceil(width / division_size)
+        self.side_height = math.ceil(height / division_size)
+
+        self.regions: List[Region] = [Region(region_id) for region_id in range(self.side_length * self.side_height)]
+        self.surrounding: List[Tuple[int, ...]] = [
+            self._calculate_surrounding(region_id) for region_id in range(len(self.regions))
+        ]
+
+    def _calculate_surrounding(self, region_id: int) -> Tuple[int, ...]:
+        """
+        Calculates the ids of the region and the regions (up to 8) bordering it.
+        :param region_id: The region we are calculating the neighbours of.
+        :returns: The region itself followed by its neighbours.
+        """
+        x, y = region_id % self.side_length, region_id // self.side_length
+        surrounding = [region_id]
+
+        for offset_y in (-1, 0, 1):
+            for offset_x in (-1, 0, 1):
+                neighbour_x, neighbour_y = x + offset_x, y + offset_y
+
+                if (offset_x, offset_y) == (0, 0):
+                    continue
+
+                if 0 <= neighbour_x < self.side_length and 0 <= neighbour_y < self.side_height:
+                    surrounding.append(neighbour_x + neighbour_y * self.side_length)
+
+        return tuple(surrounding)
+
+    def get_region(self, x: int, y: int) -> int:
+        """
+        Converts a grid position into the id of the region containing it.
+        :param x: The x grid coordinate.
+        :param y: The y grid coordinate.
+        :returns: The region id, or -1 if the position is outside the map.
+        """
+        if x < 0 or y < 0 or x >= self.width or y >= self.height:
+            return -1
+
+        return x // self.division_size + (y // self.division_size) * self.side_length
+
+    def get(self, region_id: int) -> Region:
+        """
+        :returns: The region object for the specified id.
+        """
+        return self.regions[region_id]
+
+    def get_surrounding_regions(self, region_id: int) -> Tuple[int, ...]:
+        """
+        :returns: The region and the regions bordering it, or nothing for an invalid id.
+        """
+        if region_id < 0 or region_id >= len(self.surrounding):
+            return ()
+
+        return self.surrounding[region_id]
+
+    def get_surrounding_slots(self, region_id: int) -> Iterator[int]:
+        """
+        Used as the candidates of a `Positions` query around an entity.
+        :returns: The position store slots of the entities in the region and the regions bordering it.
+        """
+        for surrounding_id in self.get_surrounding_regions(region_id):
+            yield from self.regions[surrounding_id].slots
+
+    def is_valid(self, region_id: int) -> bool:
+        """
+        :returns: Whether or not the region id exists within the grid.
+        """
+        return 0 <= region_id < len(self.regions)
+
+    def handle(self, entity: Entity) -> bool:
+        """
+        Updates the region membership of an entity after it has moved. Only when the entity
+        crosses a region boundary do we move it between regions and store the regions it has
+        just left (those surrounding the old region that no longer surround the new one).
+        :param entity: The entity whose position has changed.
+        :returns: Whether or not the entity changed regions.
+        """
+        region_id = self.get_region(entity.x, entity.y)
+
+        if region_id == entity.region:
+            return False
+
+        old_region = entity.region
+
+        if self.is_valid(old_region):
+            self.regions[old_region].remove_entity(entity)
+
+        if region_id != -1:
+            self.regions[region_id].add_entity(entity)
+
+        new_surrounding = self.get_surrounding_regions(region_id)
+
+        entity.set_recent_regions([
+            region for region in self.get_surrounding_regions(old_region) if region not in new_surrounding
+        ])
+        entity.set_region(region_id)
+
+        return True
+
+    def add(self, entity: Entity) -> None:
+        """
+        Adds an entity to the region containing it, used when the entity is added to the
+        world. The entity's regions are then updated whenever its position changes.
+        :param entity: The entity we are adding.
+        """
+        entity.regions = self
+
+        self.handle(entity)
+
+    def remove(self, entity: Entity) -> None:
+        """
+        Removes an entity from the region it is currently in, and stops tracking its position.
+        :param entity: The entity we are removing.
+        """
+        if self.is_valid(entity.region):
+            self.regions[entity.region].remove_entity(entity)
+
+        entity.set_region(-1)
+
+        if entity.regions is self:
+            entity.regions = None
+
+    def for_each_surrounding_region(self, region_id: int, callback: Callable[[Region], None]) -> None:
+        """
+        Iterates through the region and the regions bordering it.
+        :param region_id: The region we are starting from.
+        :param callback: The region currently being iterated.
+        """
+        for surrounding_id in self.get_surrounding_regions(region_id):
+            callback(self.regions[surrounding_id])
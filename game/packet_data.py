@@ -6,13 +6,13 @@ from pydantic import ConfigDict
 if TYPE_CHECKING:
     from game.entity.character.player.player import Player
 
-from network.packet import Packet
+from network.packet import PacketBatch
 from network.model import CamelModel
 
 class PacketData(CamelModel):
     model_config = ConfigDict(arbitrary_types_allowed=True)
 
-    packet: Packet
+    packet: PacketBatch
     player: Optional[Player] = None
     players: Optional[List[Player]] = None
     ignore: str = ""
@@ -0,0 +1,266 @@
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from common.log import log
+
+# Type alias for better readability
+IntervalCallback = Callable[[], None]
+
+
+class Interval:
+    """
+    Handle for a callback registered with the scheduler. Cancelling the handle
+    removes the callback from its bucket before the next sweep.
+    """
+    __slots__ = ("bucket", "callback")
+
+    def __init__(self, bucket: Bucket, callback: IntervalCallback):
+        self.bucket = bucket
+        self.callback = callback
+
+    def cancel(self) -> None:
+        """
+        Stops the callback from being called again.
+        """
+        self.bucket.remove(self)
+
+    def is_active(self) -> bool:
+        """
+        :returns: Whether or not the callback is still registered.
+        """
+        return self in self.bucket.intervals
+
+
+class Timeout:
+    """
+    Handle for a one-off callback in the scheduler's deadline heap. Cancelling only
+    marks the entry, it is discarded once it reaches the top of the heap.
+    """
+    __slots__ = ("scheduler", "deadline", "callback", "cancelled")
+
+    def __init__(self, scheduler: Scheduler, deadline: float, callback: IntervalCallback):
+        self.scheduler = scheduler
+        self.deadline = deadline  # `time.monotonic()` value at which the callback runs.
+        self.callback = callback
+        self.cancelled = False
+
+    def cancel(self) -> None:
+        """
+        Prevents the callback from running. Has no effect if it has already run.
+        """
+        if self.cancelled:
+            return
+
+        self.cancelled = True
+        self.scheduler.cancelled_timeouts += 1
+
+    def get_remaining_time(self) -> int:
+        """
+        :returns: The time in milliseconds until the callback runs.
+        """
+        return max(0, int((self.deadline - time.monotonic()) * 1000))
+
+
+class Bucket:
+    """
+    Every callback sharing the same interval lives in one bucket. A single task sleeps
+    for the interval and then calls every callback in the bucket in one sweep. The task
+    only exists while the bucket has callbacks.
+    """
+
+    def __init__(self, interval: int):
+        self.interval = interval  # Milliseconds between sweeps.
+
+        # Used as an insertion-ordered set so callbacks are swept in the order they registered.
+        self.intervals: Dict[Interval, None] = {}
+        self.task: Optional[asyncio.Task] = None
+
+    def add(self, callback: IntervalCallback) -> Interval:
+        """
+        Adds a callback to the bucket and starts the sweep task if it isn't running.
+        :param callback: The function called every interval.
+        :returns: The handle used to cancel the callback.
+        """
+        interval = Interval(self, callback)
+        self.intervals[interval] = None
+
+        if not self.task:
+            self.task = asyncio.create_task(self._sweep_loop())
+
+        return interval
+
+    def remove(self, interval: Interval) -> None:
+        """
+        Removes a callback from the bucket. The sweep task exits on its own once the
+        bucket is empty.
+        """
+        self.intervals.pop(interval, None)
+
+    def stop(self) -> None:
+        """
+        Removes all the callbacks and cancels the sweep task.
+        """
+        self.intervals.clear()
+
+        if self.task:
+            self.task.cancel()
+            self.task = None
+
+    async def _sweep_loop(self) -> None:
+        try:
+            while self.intervals:
+                await asyncio.sleep(self.interval / 1000.0)
+                self.sweep()
+        except asyncio.CancelledError:
+            pass
+        finally:
+            self.task = None
+
+    def sweep(self) -> None:
+        """
+        Calls every callback in the bucket. Callbacks cancelled by an earlier callback in
+        the same sweep are skipped, and an exception in one callback does not prevent the
+        rest of the bucket from running.
+        """
+        for interval in list(self.intervals):
+            if interval not in self.intervals:
+                continue
+
+            try:
+                interval.callback()
+            except Exception as e:
+                log.error(f"Error in scheduled callback ({self.interval}ms): {e}")
+
+
+class Scheduler:
+    """
+    The scheduler replaces per-entity interval tasks with one task per distinct
+    interval. Characters register their periodic callbacks (healing, effects, poison)
+    and all the callbacks sharing an interval are run together in a single sweep.
+    One-off timeouts (such as status effect expiries) are kept in a min-heap of deadlines.
+    """
+
+    def __init__(self):
+        self.buckets: Dict[int, Bucket] = {}
+
+        # Min-heap of (deadline, sequence, timeout). The sequence keeps the ordering stable
+        # for timeouts that share a deadline. A single timer handle is armed for the earliest
+        # deadline rather than one task per timeout.
+        self.timeouts: List[Tuple[float, int, Timeout]] = []
+        self.cancelled_timeouts = 0
+        self.sequence = itertools.count()
+        self.timer: Optional[asyncio.TimerHandle] = None
+        self.timer_deadline = 0.0
+
+    def every(self, interval: int, callback: IntervalCallback) -> Interval:
+        """
+        Registers a callback to be called periodically.
+        :param interval: The time between calls in milliseconds.
+        :param callback: The function to call.
+        :returns: The handle used to cancel the callback.
+        """
+        bucket = self.buckets.get(interval)
+
+        if not bucket:
+            bucket = self.buckets[interval] = Bucket(interval)
+
+        return bucket.add(callback)
+
+    def timeout(self, delay: int, callback: IntervalCallback) -> Timeout:
+        """
+        Schedules a callback to be called once after a delay.
+        :param delay: The time until the callback is called in milliseconds.
+        :param callback: The function to call.
+        :returns: The handle used to cancel the callback or read the time remaining.
+        """
+        timeout = Timeout(self, time.monotonic() + delay / 1000.0, callback)
+
+        heapq.heappush(self.timeouts, (timeout.deadline, next(self.sequence), timeout))
+
+        self._compact()
+        self._arm()
+
+        return timeout
+
+    def drain(self) -> None:
+        """
+        Calls every timeout whose deadline has passed and re-arms the timer for the next one.
+        """
+        self.timer = None
+        now = time.monotonic()
+
+        while self.timeouts and self.timeouts[0][0] <= now:
+            _, _, timeout = heapq.heappop(self.timeouts)
+
+            if timeout.cancelled:
+                self.cancelled_timeouts -= 1
+                continue
+
+            # Mark the timeout as done so cancelling it afterwards is a no-op.
+            timeout.cancelled = True
+
+            try:
+                timeout.callback()
+            except Exception as e:
+                log.error(f"Error in scheduled timeout: {e}")
+
+        self._arm()
+
+    def _arm(self) -> None:
+        """
+        Ensures the timer is set for the earliest live deadline in the heap.
+        """
+        while self.timeouts and self.timeouts[0][2].cancelled:
+            heapq.heappop(self.timeouts)
+            self.cancelled_timeouts -= 1
+
+        if not self.timeouts:
+            if self.timer:
+                self.timer.cancel()
+                self.timer = None
+            return
+
+        deadline = self.timeouts[0][0]
+
+        # The timer is already set to go off at (or before) the earliest deadline.
+        if self.timer and self.timer_deadline <= deadline:
+            return
+
+        if self.timer:
+            self.timer.cancel()
+
+        self.timer = asyncio.get_running_loop().call_later(max(0.0, deadline - time.monotonic()), self.drain)
+        self.timer_deadline = deadline
+
+    def _compact(self) -> None:
+        """
+        Rebuilds the heap without cancelled entries once they outnumber the live ones, so
+        effects refreshed over and over don't grow the heap indefinitely.
+        """
+        if self.cancelled_timeouts <= len(self.timeouts) // 2:
+            return
+
+        self.timeouts = [entry for entry in self.timeouts if not entry[2].cancelled]
+        heapq.heapify(self.timeouts)
+        self.cancelled_timeouts = 0
+
+    def stop(self) -> None:
+        """
+        Cancels every registered callback, sweep task, and pending timeout.
+        """
+        for bucket in self.buckets.values():
+            bucket.stop()
+
+        self.buckets.clear()
+
+        if self.timer:
+            self.timer.cancel()
+            self.timer = None
+
+        self.timeouts.clear()
+        self.cancelled_timeouts = 0
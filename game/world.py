@@ -6,7 +6,12 @@ from typing import Optional, Callable, Awaitable
 from common.config import config
 from common.log import log
 from database.mongodb import MongoDB
+from database.persistence import Persistence
+from game.map.positions import Positions
+from game.map.region_cache import RegionCache
+from game.map.regions import Regions
 from game.packet_data import PacketData
+from game.scheduler import Scheduler
 from network.connection import Connection
 from network.modules import PacketType
 from network.network_manager import NetworkManager
@@ -23,7 +28,13 @@ class World:
     def __init__(self, socket_handler: SocketHandler, database: Optional[MongoDB] = None):
         self.socket_handler = socket_handler
         self.database = database
+        self.scheduler = Scheduler()
+        self.positions = Positions()
+        self.regions = Regions(config.map_width, config.map_height)
+        # Encoded map data of each region, only used when `REGION_CACHE` is enabled.
+        self.region_cache = RegionCache(config.region_cache_size, config.region_cache_path, config.region_cache)
         self.network_manager = NetworkManager(self)
+        self.persistence = Persistence(database, config.save_interval / 1000.0, config.save_slots)
 
         self.max_players = config.max_players
         self.allow_connections = True
@@ -39,7 +50,8 @@ class World:
     def tick(self) -> None:
         """
         Starts the server packet parsing and region updating loop. Every `config.update_time`
-        we send all the packets in the queue to the players and update the regions.
+        we send all the packets in the queue to the players and update the regions. Players
+        are saved in the background by `Persistence.run`, spread over `config.save_interval`.
         """
         async def update_loop():
             while True:
@@ -47,13 +59,8 @@ class World:
                 # TODO: self.map.regions.parse()
                 await asyncio.sleep(config.update_time / 1000.0)
 
-        async def save_loop():
-            while True:
-                await asyncio.sleep(config.save_interval / 1000.0)
-                self.save()
-
         asyncio.create_task(update_loop())
-        asyncio.create_task(save_loop())
+        asyncio.create_task(self.persistence.run())
 
     def push(self, packet_type: PacketType, data: PacketData) -> None:
         """
@@ -72,17 +79,20 @@ class World:
                 instances = [player.connection.instance for player in data.players]
                 self.network_manager.send_to_players(instances, data.packet)
         elif packet_type == PacketType.Region:
-            if data.region:
+            if data.region is not None:
                 self.network_manager.send_to_region(data.region, data.packet, data.ignore)
         elif packet_type == PacketType.Regions:
-            if data.region:
+            if data.region is not None:
                 self.network_manager.send_to_surrounding_regions(data.region, data.packet, data.ignore)
 
-    def save(self) -> None:
+    async def save(self) -> None:
         """
-        Iterates through all the players currently logged in and saves their data.
+        Iterates through all the players currently logged in and saves their data. Players are
+        otherwise saved in the background, this is used to save everyone at once (e.g. on shutdown).
         """
-        # TODO: self.entities.for_each_player(lambda player: player.save())
+        # Players that just logged out are still being saved.
+        await self.persistence.wait_for_removals()
+        await self.persistence.flush_all()
 
         log.debug(f"{config.name} {config.server_id} has successfully saved.")
 
@@ -1,5 +1,4 @@
 import asyncio
-import json
 from fastapi import FastAPI
 from contextlib import asynccontextmanager
 
@@ -104,6 +103,14 @@ async def lifespan(app: FastAPI):
     # Shutdown logic (e.g., saving players)
     log.info("Shutting down game engine.")
 
+    if main_instance.world:
+        await main_instance.world.save()
+
+    main_instance.socket_handler.stop()
+
+    if main_instance.database:
+        main_instance.database.ip_bans.stop()
+
 
 app = FastAPI(lifespan=lifespan)
 
@@ -119,8 +126,19 @@ async def health_check():
 
 @app.websocket("/")
 async def websocket_endpoint(websocket: WebSocket):
+    address = websocket.client.host if websocket.client else "unknown"
+
+    # Attempts are rejected before any `Connection` (or player) is created for them.
+    reason = main_instance.socket_handler.admit(address)
+
     await websocket.accept()
 
+    if reason:
+        log.debug(f"Rejected connection from {address}, reason: {reason}.")
+        # The reason is sent in the close frame, the same way `Connection.reject` does.
+        await websocket.close(code=1000, reason=reason)
+        return
+
     # Create a unique instance ID for this connection
     instance_id = utils.create_instance(EntityType.Player)
     connection = Connection(instance_id, websocket)
@@ -131,32 +149,19 @@ async def websocket_endpoint(websocket: WebSocket):
 
     try:
         while not connection.closed:
-            # Wait for messages from the client
-            data = await websocket.receive_text()
-
-            # Rate limiting check
-            connection.message_rate += 1
-            if connection.message_rate > 50:  # Example limit
-                await connection.reject("spam")
-                break
-
-            # Duplicate check
-            if connection.is_duplicate(data):
-                continue
-
-            # Refresh timeout on activity
-            connection.refresh_timeout()
-
-            # Parse the message (typically JSON)
-            try:
-                message = json.loads(data)
-                if connection.message_callback:
-                    await connection.message_callback(message)
-                else:
-                    # Fallback if no callback is registered yet (e.g. before Player is created)
-                    log.debug(f"Received message from {connection.address} without callback: {message}")
-            except json.JSONDecodeError:
-                log.warning(f"Received non-JSON message from {connection.address}: {data}")
+            # Wait for messages from the client, binary frames are sent by clients using the binary protocol.
+            received = await websocket.receive()
+
+            if received["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(received.get("code", 1000))
+
+            data = received.get("text")
+
+            if data is None:
+                data = received.get("bytes")
+
+            # Rate limiting, duplicate filtering, decoding, and dispatching of the packets in the frame.
+            await connection.handle_frame(data)
 
     except WebSocketDisconnect:
         await connection.handle_close()
@@ -170,4 +175,10 @@ async def websocket_endpoint(websocket: WebSocket):
 if __name__ == "__main__":
     import uvicorn
 
-    uvicorn.run(app, host=config.host, port=config.port, reload=config.debugging)
+    uvicorn.run(
+        app,
+        host=config.host,
+        port=config.port,
+        reload=config.debugging,
+        ws_per_message_deflate=config.ws_per_message_deflate
+    )
@@ -0,0 +1,142 @@
+import time
+from collections import deque
+from typing import Deque, Dict, Optional, Tuple
+
+from common.log import log
+
+
+class AdmissionController:
+    """
+    Decides whether a new connection is accepted, before the WebSocket is accepted or any
+    `Connection` (and `Player`) is created, so that reconnect storms are shed at the cheapest
+    possible point. Connection attempts are counted over a sliding window both per address
+    and globally, and addresses that go over their limit (or are found to be banned) are put
+    in a deny cache for a while, so their attempts are rejected with a single dictionary lookup.
+
+    `admit` returns the rejection reason (the same strings passed to `Connection.reject`),
+    or None if the connection is admitted.
+    """
+
+    def __init__(
+            self,
+            window: float = 10,
+            address_limit: int = 5,
+            global_limit: int = 200,
+            deny_duration: float = 30
+    ):
+        self.window = window  # Seconds covered by the sliding windows.
+        self.address_limit = address_limit  # Attempts allowed per address within the window.
+        self.global_limit = global_limit  # Attempts allowed from all addresses within the window.
+        self.deny_duration = deny_duration  # Seconds an address is denied for after going over its limit.
+
+        # Times (`time.monotonic()`) of the recent attempts, per address and globally.
+        self.attempts: Dict[str, Deque[float]] = {}
+        self.global_attempts: Deque[float] = deque()
+
+        # Denied addresses, with the time they are denied until and the rejection reason.
+        self.denied: Dict[str, Tuple[float, str]] = {}
+
+        self.admitted = 0
+        self.rejected: Dict[str, int] = {}  # Rejections keyed by reason.
+
+    def admit(self, address: str, now: Optional[float] = None, check_address: bool = True) -> Optional[str]:
+        """
+        Records a connection attempt and decides whether it is admitted.
+        :param address: The IP address the connection is coming from.
+        :param now: The current `time.monotonic()`, used for testing.
+        :param check_address: Whether the per-address limit and deny cache apply (disabled when debugging).
+        :returns: The reason the connection is rejected, or None if it is admitted.
+        """
+        if now is None:
+            now = time.monotonic()
+
+        oldest = now - self.window
+
+        if check_address:
+            denied = self.denied.get(address)
+
+            if denied:
+                until, reason = denied
+
+                if until > now:
+                    return self.reject(reason)
+
+                del self.denied[address]
+
+        # The global window protects everything behind it (the database, player creation) during a storm.
+        self._expire(self.global_attempts, oldest)
+
+        if len(self.global_attempts) >= self.global_limit:
+            return self.reject("worldfull")
+
+        if check_address:
+            attempts = self.attempts.get(address)
+
+            if attempts is None:
+                attempts = self.attempts[address] = deque()
+
+            self._expire(attempts, oldest)
+            attempts.append(now)
+
+            if len(attempts) > self.address_limit:
+                log.notice(f"Connection attempts from {address} are coming too fast, denying for {self.deny_duration}s.")
+                self.deny(address, "toofast", now)
+                return self.reject("toofast")
+
+        self.global_attempts.append(now)
+        self.admitted += 1
+
+        return None
+
+    def deny(self, address: str, reason: str, now: Optional[float] = None, duration: Optional[float] = None) -> None:
+        """
+        Adds an address to the deny cache, its attempts are rejected until the duration has passed.
+        :param address: The address we are denying.
+        :param reason: The rejection reason given to the address' attempts.
+        :param now: The current `time.monotonic()`, used for testing.
+        :param duration: How many seconds the address is denied for, `deny_duration` by default.
+        """
+        if now is None:
+            now = time.monotonic()
+
+        self.denied[address] = (now + (self.deny_duration if duration is None else duration), reason)
+
+    def reject(self, reason: str) -> str:
+        """
+        Counts a rejected connection attempt.
+        :returns: The reason, for convenience.
+        """
+        self.rejected[reason] = self.rejected.get(reason, 0) + 1
+        return reason
+
+    def prune(self, now: Optional[float] = None) -> None:
+        """
+        Removes the windows of addresses without recent attempts and the expired denials, so
+        addresses that never come back do not accumulate.
+        :param now: The current `time.monotonic()`, used for testing.
+        """
+        if now is None:
+            now = time.monotonic()
+
+        oldest = now - self.window
+
+        for address in [address for address, attempts in self.attempts.items() if not attempts or attempts[-1] <= oldest]:
+            del self.attempts[address]
+
+        for address in [address for address, (until, _) in self.denied.items() if until <= now]:
+            del self.denied[address]
+
+        self._expire(self.global_attempts, oldest)
+
+    def summary(self) -> str:
+        """
+        :returns: A one line summary of the admission counters.
+        """
+        rejected = ", ".join(f"{reason}: {count}" for reason, count in self.rejected.items())
+        return f"admitted: {self.admitted}, rejected: {rejected or 'none'}, denied addresses: {len(self.denied)}"
+
+    @staticmethod
+    def _expire(attempts: Deque[float], oldest: float) -> None:
+        while attempts and attempts[0] <= oldest:
+            attempts.popleft()
+
@@ -0,0 +1,366 @@
+"""
+Compact tag-length binary encoding of the packets sent to (and received from) clients
+that negotiate it during the handshake. It encodes the same structure as the JSON
+protocol (the output of `Packet.serialize`), so the client decodes it into identical
+arrays and objects.
+
+Every value starts with a one byte tag:
+
+    0x00          null
+    0x01 / 0x02   false / true
+    0x03          non-negative integer, followed by its unsigned LEB128 varint
+    0x04          negative integer `n`, followed by the varint of `-n - 1`
+    0x05          float, followed by 8 bytes (IEEE 754 double, little endian)
+    0x06          string, followed by the varint byte length and the UTF-8 bytes
+    0x07          array, followed by the varint item count and the items
+    0x08          object, followed by the varint entry count, then each key followed by
+                  its value
+    0x09          bytes, followed by the varint length and the raw bytes (e.g. the gzipped
+                  map data, which JSON clients receive base64 encoded instead)
+    0x80 - 0xFF   integer 0 - 127 stored in the low 7 bits of the tag itself
+
+Object keys are a single varint `k` with no tag. An odd `k` refers to the key at index
+`k >> 1` of `KEYS`, which the server sends to the client in its handshake reply. An even `k`
+is followed by the `k >> 1` UTF-8 bytes of a key that is not in the table.
+
+A frame is an array of packets, exactly like the JSON frames.
+"""
+import struct
+from typing import Any, Callable, Dict, List, Tuple, Union
+
+NULL = 0x00
+FALSE = 0x01
+TRUE = 0x02
+INTEGER = 0x03
+NEGATIVE_INTEGER = 0x04
+FLOAT = 0x05
+STRING = 0x06
+ARRAY = 0x07
+OBJECT = 0x08
+BYTES = 0x09
+SMALL_INTEGER = 0x80
+
+# Object keys sent as an index rather than a string. Only ever append to this table, clients
+# receive it during the handshake but the indices should remain stable between versions.
+KEYS = (
+    "instance", "x", "y", "orientation", "movementSpeed", "target", "hit", "type", "damage",
+    "ranged", "aoe", "hitPoints", "maxHitPoints", "mana", "maxMana", "id", "key", "name",
+    "level", "experience", "count", "state", "effect", "status", "poison", "timestamp",
+    "forced", "targetInstance", "entities", "positions", "regions", "data", "message",
+    "success", "duration", "index", "slot", "items", "amount", "attackRange", "skill",
+    "skills", "text", "colour", "region", "owner", "username", "serverTime",
+    "serverId", "gVer", "encoding", "keys"
+)
+
+_key_indices = {name: index for index, name in enumerate(KEYS)}
+
+# Deepest nesting of arrays and objects accepted from a client. Packets are only a few levels
+# deep, this keeps a crafted message from exhausting the stack while it is decoded.
+MAX_DEPTH = 32
+
+_double = struct.Struct("<d")
+
+
+def encode(value: Any) -> bytes:
+    """
+    Encodes a JSON compatible value (as produced by `Packet.serialize`) into bytes.
+    :param value: The value we are encoding.
+    :returns: The encoded bytes.
+    """
+    buffer = bytearray()
+    _write(buffer, value)
+    return bytes(buffer)
+
+
+def encode_array_header(count: int) -> bytes:
+    """
+    Used to build a frame out of packets that have already been encoded individually.
+    :param count: The number of items in the array.
+    :returns: The tag and item count that precede the items of an array.
+    """
+    buffer = bytearray((ARRAY,))
+    _write_varint(buffer, count)
+    return bytes(buffer)
+
+
+def _write_varint(buffer: bytearray, value: int) -> None:
+    while value > 0x7F:
+        buffer.append((value & 0x7F) | 0x80)
+        value >>= 7
+
+    buffer.append(value)
+
+
+def _encode_key(key: str) -> bytes:
+    buffer = bytearray()
+    index = _key_indices.get(key)
+
+    if index is not None:
+        _write_varint(buffer, (index << 1) | 1)
+    else:
+        data = key.encode("utf-8")
+        _write_varint(buffer, len(data) << 1)
+        buffer += data
+
+    return bytes(buffer)
+
+
+# The encoded form of the keys in the table, so writing a known key is a single lookup.
+_encoded_keys = {name: _encode_key(name) for name in KEYS}
+
+
+def _write_null(buffer: bytearray, _value: None) -> None:
+    buffer.append(NULL)
+
+
+def _write_bool(buffer: bytearray, value: bool) -> None:
+    buffer.append(TRUE if value else FALSE)
+
+
+def _write_int(buffer: bytearray, value: int) -> None:
+    if 0 <= value < 0x80:
+        buffer.append(SMALL_INTEGER | value)
+    elif value >= 0:
+        buffer.append(INTEGER)
+        _write_varint(buffer, value)
+    else:
+        buffer.append(NEGATIVE_INTEGER)
+        _write_varint(buffer, -value - 1)
+
+
+def _write_float(buffer: bytearray, value: float) -> None:
+    buffer.append(FLOAT)
+    buffer += _double.pack(value)
+
+
+def _write_string(buffer: bytearray, value: str) -> None:
+    data = value.encode("utf-8")
+    length = len(data)
+
+    buffer.append(STRING)
+
+    if length < 0x80:
+        buffer.append(length)
+    else:
+        _write_varint(buffer, length)
+
+    buffer += data
+
+
+def _write_bytes(buffer: bytearray, value: bytes) -> None:
+    buffer.append(BYTES)
+    _write_varint(buffer, len(value))
+    buffer += value
+
+
+def _write_array(buffer: bytearray, value: Union[list, tuple]) -> None:
+    buffer.append(ARRAY)
+    _write_varint(buffer, len(value))
+
+    for item in value:
+        # Small integers are by far the most common value, so they are written inline.
+        if type(item) is int and 0 <= item < 0x80:
+            buffer.append(SMALL_INTEGER | item)
+        else:
+            (_writers.get(type(item)) or _get_writer(item))(buffer, item)
+
+
+def _write_object(buffer: bytearray, value: dict) -> None:
+    buffer.append(OBJECT)
+    _write_varint(buffer, len(value))
+
+    for key, item in value.items():
+        buffer += _encoded_keys.get(key) or _encode_key(_key(key))
+
+        if type(item) is int and 0 <= item < 0x80:
+            buffer.append(SMALL_INTEGER | item)
+        else:
+            (_writers.get(type(item)) or _get_writer(item))(buffer, item)
+
+
+# Writers by the exact type of the value, which saves walking an `isinstance` chain for
+# every value. Subclasses (e.g. the `IntEnum`s) are resolved once by `_get_writer`.
+_writers: Dict[type, Callable[[bytearray, Any], None]] = {
+    type(None): _write_null,
+    bool: _write_bool,
+    int: _write_int,
+    float: _write_float,
+    str: _write_string,
+    bytes: _write_bytes,
+    list: _write_array,
+    tuple: _write_array,
+    dict: _write_object
+}
+
+
+def _get_writer(value: Any) -> Callable[[bytearray, Any], None]:
+    kind = type(value)
+
+    for base in (bool, int, float, str, bytes, list, tuple, dict):
+        if isinstance(value, base):
+            writer = _writers[base]
+
+            # Integer subclasses (enums) are written as their integer value.
+            if base is int:
+                writer = _write_int_subclass
+
+            _writers[kind] = writer
+            return writer
+
+    raise TypeError(f"Object of type {kind.__name__} cannot be encoded.")
+
+
+def _write_int_subclass(buffer: bytearray, value: int) -> None:
+    _write_int(buffer, int(value))
+
+
+def _write(buffer: bytearray, value: Any) -> None:
+    (_writers.get(type(value)) or _get_writer(value))(buffer, value)
+
+
+def _key(key: Any) -> str:
+    """
+    Object keys are converted to strings the same way `json.dumps` does.
+    """
+    if isinstance(key, str):
+        return key
+
+    if key is None:
+        return "null"
+
+    if isinstance(key, bool):
+        return "true" if key else "false"
+
+    if isinstance(key, int):
+        return str(int(key))
+
+    return repr(key)
+
+
+def decode(data: bytes) -> Any:
+    """
+    Decodes bytes produced by `encode` (or sent by a client).
+    :param data: The bytes we are decoding.
+    :returns: The decoded value.
+    :raises ValueError: If the data is truncated, malformed, nested deeper than `MAX_DEPTH`,
+    or has trailing bytes.
+    """
+    try:
+        value, position = _read(memoryview(data), 0, 0)
+    except (IndexError, struct.error, UnicodeDecodeError) as e:
+        raise ValueError(f"Malformed binary message: {e}") from e
+
+    if position != len(data):
+        raise ValueError(f"Malformed binary message: {len(data) - position} trailing bytes.")
+
+    return value
+
+
+def _read_varint(data: memoryview, position: int) -> Tuple[int, int]:
+    value = 0
+    shift = 0
+
+    while True:
+        byte = data[position]
+        position += 1
+        value |= (byte & 0x7F) << shift
+
+        if byte < 0x80:
+            return value, position
+
+        shift += 7
+
+
+def _read_string(data: memoryview, position: int) -> Tuple[str, int]:
+    length, position = _read_varint(data, position)
+    end = position + length
+
+    if end > len(data):
+        raise IndexError("string out of range")
+
+    return str(data[position:end], "utf-8"), end
+
+
+def _read_bytes(data: memoryview, position: int) -> Tuple[bytes, int]:
+    length, position = _read_varint(data, position)
+    end = position + length
+
+    if end > len(data):
+        raise IndexError("bytes out of range")
+
+    return bytes(data[position:end]), end
+
+
+def _read_key(data: memoryview, position: int) -> Tuple[str, int]:
+    value, position = _read_varint(data, position)
+
+    if value & 1:
+        return KEYS[value >> 1], position
+
+    end = position + (value >> 1)
+
+    if end > len(data):
+        raise IndexError("key out of range")
+
+    return str(data[position:end], "utf-8"), end
+
+
+def _read(data: memoryview, position: int, depth: int) -> Tuple[Any, int]:
+    tag = data[position]
+    position += 1
+
+    if tag >= SMALL_INTEGER:
+        return tag & 0x7F, position
+
+    if tag == NULL:
+        return None, position
+
+    if tag == FALSE:
+        return False, position
+
+    if tag == TRUE:
+        return True, position
+
+    if tag == INTEGER:
+        return _read_varint(data, position)
+
+    if tag == NEGATIVE_INTEGER:
+        value, position = _read_varint(data, position)
+        return -value - 1, position
+
+    if tag == FLOAT:
+        return _double.unpack_from(data, position)[0], position + 8
+
+    if tag == STRING:
+        return _read_string(data, position)
+
+    if tag == BYTES:
+        return _read_bytes(data, position)
+
+    if tag == ARRAY or tag == OBJECT:
+        depth += 1
+
+        if depth > MAX_DEPTH:
+            raise ValueError(f"Malformed binary message: nested deeper than {MAX_DEPTH} levels.")
+
+    if tag == ARRAY:
+        count, position = _read_varint(data, position)
+        items: List[Any] = []
+
+        for _ in range(count):
+            item, position = _read(data, position, depth)
+            items.append(item)
+
+        return items, position
+
+    if tag == OBJECT:
+        count, position = _read_varint(data, position)
+        entries = {}
+
+        for _ in range(count):
+            key, position = _read_key(data, position)
+            entries[key], position = _read(data, position, depth)
+
+        return entries, position
+
+    raise ValueError(f"Unknown tag {tag:#04x}.")
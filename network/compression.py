@@ -0,0 +1,76 @@
+"""
+Compression of large frames for clients that negotiate it during the handshake.
+
+Frames of at least `config.compression_threshold` bytes are compressed with zlib using a
+preset dictionary, and sent as a binary WebSocket frame. Compressed frames always start
+with the zlib header byte 0x78, which no frame of the binary protocol (see `binary.py`)
+starts with, so clients can tell them apart. Once decompressed, the frame is the same JSON
+text (or binary protocol frame) that would have been sent uncompressed.
+
+The preset dictionary primes the compressor with the keys and values that large packets
+(map regions, container, quest, and store batches) repeat, which matters most for frames
+that are only a few kilobytes. Each frame is compressed on its own, so no compressor
+state is kept per connection (unlike permessage-deflate with context takeover).
+"""
+import zlib
+
+# Compressed frames start with this byte (deflate with a 32K window, see RFC 1950).
+HEADER = 0x78
+
+# The preset dictionary, sent to the client in the handshake reply. zlib favours the end of
+# the dictionary, so the most common strings go last. Only append to this when changing it,
+# clients that cached the dictionary of a previous version will fail to decompress otherwise.
+DICTIONARY = (
+    '"description":"","difficulty":"","skillRequirements":{},"questRequirements":[],'
+    '"rewards":[],"stageCount":,"completedSubStages":[],"subStage":,"stage":,"quests":['
+    '"currency":"coins","stockAmount":,"price":,"restricted":false,"refresh":,'
+    '"attackStats":{"crush":0,"slash":0,"stab":0,"archery":0,"magic":0},'
+    '"defenseStats":{"crush":0,"slash":0,"stab":0,"archery":0,"magic":0},'
+    '"bonuses":{"accuracy":0,"strength":0,"archery":0,"magic":0},'
+    '"edible":false,"interactable":false,"equippable":true,"enchantments":{},'
+    '"username":"","slots":[{"index":0,"key":"","count":0,'
+    '"region":,"data":[[],"positions":[],"entities":[],"instance":"","name":"",'
+    '"index":,"key":"","count":1,"enchantments":{},"name":"","x":,"y":'
+).encode("utf-8")
+
+LEVEL = 6
+
+
+def compress(data: bytes) -> bytes:
+    """
+    Compresses a frame using the preset dictionary.
+    :param data: The frame we are compressing (UTF-8 encoded if it is a JSON frame).
+    :returns: The compressed frame, starting with `HEADER`.
+    """
+    compressor = zlib.compressobj(LEVEL, zlib.DEFLATED, zlib.MAX_WBITS, 8, zlib.Z_DEFAULT_STRATEGY, DICTIONARY)
+    return compressor.compress(data) + compressor.flush()
+
+
+def decompress(data: bytes, limit: int) -> bytes:
+    """
+    Decompresses a frame compressed with `compress`. Decompression stops once `limit` bytes
+    have been produced, so a small frame cannot inflate to an unbounded size.
+    :param data: The compressed frame.
+    :param limit: The maximum size of the decompressed frame.
+    :raises ValueError: If the frame is not a valid compressed frame or decompresses to more than `limit` bytes.
+    """
+    try:
+        decompressor = zlib.decompressobj(zlib.MAX_WBITS, DICTIONARY)
+        decompressed = decompressor.decompress(data, limit)
+    except zlib.error as e:
+        raise ValueError(f"Malformed compressed message: {e}") from e
+
+    if decompressor.unconsumed_tail:
+        raise ValueError(f"Compressed message exceeds {limit} bytes.")
+
+    if not decompressor.eof:
+        raise ValueError("Malformed compressed message: truncated.")
+
+    return decompressed
+
+
+def is_compressed(data: bytes) -> bool:
+    """
+    :returns: Whether a binary frame is compressed (rather than a binary protocol frame).
+    """
+    return len(data) > 0 and data[0] == HEADER
@@ -1,9 +1,14 @@
 import asyncio
 import json
+import math
 import time
-from typing import Any, Callable, Optional, Awaitable
+from array import array
+from typing import Any, Callable, Dict, Hashable, List, Optional, Awaitable, Union
 from fastapi import WebSocket
+from common.config import config
 from common.log import log
+from network import binary, compression
+from network.packet import PacketFragment
 
 class Connection:
     """
@@ -16,49 +21,47 @@ class Connection:
         self.socket = socket
         self.address = socket.client.host if socket.client else "unknown"
         
-        # Used for filtering duplicate messages.
-        self.last_message = ""
-        self.last_message_time = time.time() * 1000
+        # Used for filtering duplicate messages, a ring of the hashes and receive times (`time.monotonic()`)
+        # of the last `message_history` messages.
         self.message_difference = 100 # Prevent duplicate messages coming in faster than 100ms.
+        self.message_history = 8
+        self.message_hashes = array("q", [0] * self.message_history)
+        self.message_times = array("d", [-math.inf] * self.message_history)
+        self.message_index = 0 # Position in the ring the next message is stored at.
+        self.duplicates = 0 # The amount of duplicate messages dropped.
         
-        self.message_rate = 0 # The amount of messages received in the last second.
-        self.timeout_duration = 10 * 60 # 10 minutes (in seconds for Python's asyncio)
-        
-        self.rate_task: Optional[asyncio.Task] = None
-        self.verify_task: Optional[asyncio.Task] = None
-        self.timeout_task: Optional[asyncio.Task] = None
+        # Token bucket for rate limiting, refilled at `config.message_limit` tokens per second on receive.
+        self.tokens = float(config.message_limit)
+        self.last_refill = time.monotonic()
+
+        # Idle connections are timed out by the `SocketHandler` sweep, see `get_deadline`.
+        self.timeout_duration = 10 * 60 # 10 minutes (in seconds)
+        self.last_activity = time.monotonic()
+
+        # Fragments waiting to be written to the socket, see `queue_fragments`.
+        self.outbound: List[PacketFragment] = []
+        self.outbound_size = 0  # Bytes in the outbound buffer.
+        self.writing_size = 0  # Bytes of the frame currently being written.
+        self.writer_task: Optional[asyncio.Task] = None
+        self.last_write_duration = 0.0  # Milliseconds taken to write the last frame.
+
+        # Whether the client has fallen behind (the buffer went over the high watermark).
+        self.congested = False
+        # Latest coalescable fragment of each state (by coalesce key) held back while congested.
+        self.held: Dict[Hashable, PacketFragment] = {}
+
+        # Whether the client negotiated the binary protocol during the handshake (see `network/binary.py`).
+        self.binary = False
+        # Whether the client negotiated compression of large frames (see `network/compression.py`).
+        self.compression = False
         
         self.closed = False
         
         self.message_callback: Optional[Callable[[Any], Awaitable[None]]] = None
         self.close_callback: Optional[Callable[[], Optional[Awaitable[None]]]] = None
 
-        # Reset the messages per second every second.
-        self.rate_task = asyncio.create_task(self._rate_limiter_loop())
-        
-        # Run the verification interval every 30 seconds to ensure the connection is still open.
-        self.verify_task = asyncio.create_task(self._verify_loop())
-        
         log.info(f"Received socket connection from: {self.address}.")
 
-    async def _rate_limiter_loop(self):
-        try:
-            while not self.closed:
-                await asyncio.sleep(1)
-                self.message_rate = 0
-        except asyncio.CancelledError:
-            pass
-
-    async def _verify_loop(self):
-        try:
-            while not self.closed:
-                await asyncio.sleep(30)
-                if self.closed:
-                    log.warning(f"Connection {self.address} closed improperly.")
-                    await self.handle_close()
-        except asyncio.CancelledError:
-            pass
-
     async def reject(self, reason: str):
         """
         Sends a message to the client for closing the connection,
@@ -110,9 +113,7 @@ class Connection:
             else:
                 self.close_callback()
 
-        self.clear_timeout()
-        self.clear_rate_task()
-        self.clear_verify_task()
+        self.clear_writer_task()
 
     def update_timeout(self, duration: int):
         """
@@ -122,53 +123,219 @@ class Connection:
         self.timeout_duration = duration
         self.refresh_timeout()
 
-    def refresh_timeout(self):
+    def refresh_timeout(self, now: Optional[float] = None):
         """
-        Resets the timeout every time an action is performed.
+        Resets the timeout every time an action is performed. This only records the time of
+        the activity, the `SocketHandler` sweep times out connections past their deadline.
+        @param now The current `time.monotonic()` if the caller already has it.
         """
-        self.clear_timeout()
-        self.timeout_task = asyncio.create_task(self._timeout_callback())
+        self.last_activity = time.monotonic() if now is None else now
 
-    async def _timeout_callback(self):
-        try:
-            await asyncio.sleep(self.timeout_duration)
-            await self.reject("timeout")
-        except asyncio.CancelledError:
-            pass
+    def get_deadline(self) -> float:
+        """
+        @returns The `time.monotonic()` time after which the connection has timed out.
+        """
+        return self.last_activity + self.timeout_duration
+
+    def consume(self, count: int = 1, now: Optional[float] = None) -> bool:
+        """
+        Takes tokens from the rate limiting bucket. The bucket holds up to `config.message_limit`
+        tokens and is refilled at that many tokens per second, computed lazily from the time
+        elapsed since the last call rather than by a timer.
+        @param count The number of messages being received.
+        @param now The current `time.monotonic()` if the caller already has it.
+        @returns Whether there were enough tokens, if not the client is over the rate limit.
+        """
+        if now is None:
+            now = time.monotonic()
 
-    def clear_verify_task(self):
-        if self.verify_task:
-            self.verify_task.cancel()
-            self.verify_task = None
+        limit = config.message_limit
 
-    def clear_rate_task(self):
-        if self.rate_task:
-            self.rate_task.cancel()
-            self.rate_task = None
+        self.tokens = min(limit, self.tokens + (now - self.last_refill) * limit)
+        self.last_refill = now
 
-    def clear_timeout(self):
-        if self.timeout_task:
-            self.timeout_task.cancel()
-            self.timeout_task = None
+        if self.tokens < count:
+            return False
 
-    def is_duplicate(self, message: str) -> bool:
+        self.tokens -= count
+
+        return True
+
+    def clear_writer_task(self):
+        self.outbound = []
+        self.outbound_size = 0
+        self.held = {}
+
+        if self.writer_task:
+            self.writer_task.cancel()
+            self.writer_task = None
+
+    def is_duplicate(self, message: Union[str, bytes], now: Optional[float] = None) -> bool:
         """
         Ensures duplicate packets are only parsed once every message_difference milliseconds.
+        Messages are compared by hash against the last `message_history` messages, so the
+        cost does not depend on the size of the message (beyond hashing it once) and the
+        memory used is fixed.
+        @param now The current `time.monotonic()` if the caller already has it.
         """
-        now = time.time() * 1000
-        is_dup = (message == self.last_message and now - self.last_message_time < self.message_difference)
-        
-        if not is_dup:
-            self.last_message = message
-            self.last_message_time = now
-            
-        return is_dup
+        if now is None:
+            now = time.monotonic()
+
+        message_hash = hash(message)
+        oldest = now - self.message_difference / 1000
+        times = self.message_times
+
+        for index, previous in enumerate(self.message_hashes):
+            if previous == message_hash and times[index] > oldest:
+                self.duplicates += 1
+                return True
+
+        self.message_hashes[self.message_index] = message_hash
+        times[self.message_index] = now
+        self.message_index = (self.message_index + 1) % self.message_history
+
+        return False
 
     async def send(self, message: Any):
         """
-        Takes a JSON object and stringifies it. Sends it to the client.
+        Takes a JSON object and stringifies it (or encodes it for binary clients). Sends it to the client.
+        """
+        await self.send_frame(binary.encode(message) if self.binary else json.dumps(message))
+
+    async def send_fragments(self, fragments: List[PacketFragment]):
+        """
+        Joins pre-encoded packet fragments into a single frame and sends it to the client.
+        """
+        start = time.perf_counter()
+
+        await self.send_frame(PacketFragment.join_binary(fragments) if self.binary else PacketFragment.join(fragments))
+
+        self.last_write_duration = (time.perf_counter() - start) * 1000
+
+    def queue_fragments(self, fragments: List[PacketFragment]):
+        """
+        Adds fragments to the outbound buffer without waiting on the socket. The writer task
+        sends everything buffered as a single frame, so fragments queued while a previous frame
+        is still being written are coalesced into the next one.
+
+        Once the buffered bytes exceed the high watermark the client is treated as a slow
+        consumer: depending on `config.slow_consumer_policy` we either hold back the coalescable
+        fragments (movement and points updates) until the buffer drains below the low watermark,
+        or disconnect the client. Only the latest fragment of each state is held, older ones are
+        stale and discarded, so the client receives the current state once it catches up.
+        """
+        if self.closed or not fragments:
+            return
+
+        # Stale state updates are not worth buffering for a client that is already behind.
+        if self.congested:
+            fragments = self.hold(fragments)
+
+        self.outbound.extend(fragments)
+        self.outbound_size += sum(fragment.get_size(self.binary) for fragment in fragments)
+
+        if self.outbound_size + self.writing_size > config.outbound_high_watermark:
+            self.handle_slow_consumer()
+
+        if not self.writer_task and not self.closed:
+            self.writer_task = asyncio.create_task(self._writer_loop())
+
+    def handle_slow_consumer(self):
+        """
+        Applies the slow consumer policy once the outbound buffer is over the high watermark.
+        """
+        if config.slow_consumer_policy == "drop":
+            if not self.congested:
+                log.warning(f"Connection {self.address} is falling behind, dropping coalescable packets.")
+
+            self.congested = True
+            self.outbound = self.hold(self.outbound)
+            self.outbound_size = sum(fragment.get_size(self.binary) for fragment in self.outbound)
+
+            if self.outbound_size + self.writing_size <= config.outbound_max_buffer:
+                return
+
+        # Stop buffering for the client and close the connection in the background.
+        self.clear_writer_task()
+        self.closed = True
+
+        asyncio.create_task(self._close_slow_consumer())
+
+    def hold(self, fragments: List[PacketFragment]) -> List[PacketFragment]:
+        """
+        Holds back the coalescable fragments while the client is congested, each replacing the
+        previously held fragment of the same state. Coalescable fragments without a coalesce key
+        cannot be told apart from other states, so they are discarded.
+        :param fragments: The fragments we are filtering.
+        :returns: The fragments that are not coalescable, which are buffered as usual.
+        """
+        buffered = []
+
+        for fragment in fragments:
+            if not fragment.coalescable:
+                buffered.append(fragment)
+            elif fragment.key is not None:
+                self.held.pop(fragment.key, None)
+                self.held[fragment.key] = fragment
+
+        return buffered
+
+    def release_held(self):
+        """
+        Buffers the held fragments once the client is no longer congested.
+        """
+        fragments = list(self.held.values())
+        self.held = {}
+
+        self.outbound.extend(fragments)
+        self.outbound_size += sum(fragment.get_size(self.binary) for fragment in fragments)
+
+    async def _close_slow_consumer(self):
+        log.warning(f"Disconnecting slow consumer {self.address}.")
+
+        try:
+            await self.socket.close(code=1000, reason="slow")
+        except Exception as e:
+            log.debug(f"Error while closing socket: {e}")
+
+        await self.handle_close("slow")
+
+    async def _writer_loop(self):
+        try:
+            while self.outbound and not self.closed:
+                fragments = self.outbound
+                self.writing_size = self.outbound_size
+
+                self.outbound = []
+                self.outbound_size = 0
+
+                await self.send_fragments(fragments)
+
+                self.writing_size = 0
+
+                if self.congested and self.outbound_size <= config.outbound_low_watermark:
+                    self.congested = False
+                    self.release_held()
+        except asyncio.CancelledError:
+            pass
+        finally:
+            self.writing_size = 0
+            self.writer_task = None
+
+    async def send_frame(self, frame: Union[str, bytes]):
+        """
+        Sends a JSON (text) or binary protocol (bytes) frame to the client. Frames over the
+        compression threshold are compressed if the client negotiated compression.
         """
-        await self.send_utf8(json.dumps(message))
+        if self.compression and len(frame) >= config.compression_threshold:
+            if isinstance(frame, str):
+                frame = frame.encode("utf-8")
+
+            await self.send_bytes(compression.compress(frame))
+        elif isinstance(frame, bytes):
+            await self.send_bytes(frame)
+        else:
+            await self.send_utf8(frame)
 
     async def send_utf8(self, message: str):
         """
@@ -184,6 +351,98 @@ class Connection:
             log.error(f"Failed to send message to {self.address}: {e}")
             await self.handle_close("send_failure")
 
+    async def send_bytes(self, message: bytes):
+        """
+        Sends a binary frame to the socket.
+        """
+        if self.closed:
+            log.warning("Attempted to send message to closed connection.")
+            return
+
+        try:
+            await self.socket.send_bytes(message)
+        except Exception as e:
+            log.error(f"Failed to send message to {self.address}: {e}")
+            await self.handle_close("send_failure")
+
+    def decode(self, data: Union[str, bytes]) -> Any:
+        """
+        Decodes a message received from the client, binary frames are decoded
+        with the binary protocol and text frames as JSON. Compressed frames are
+        decompressed first and decoded according to the negotiated encoding.
+        :raises ValueError: If the message cannot be decoded, or uses an encoding
+        (binary protocol or compression) the client did not negotiate.
+        """
+        if isinstance(data, bytes):
+            if not compression.is_compressed(data):
+                if not self.binary:
+                    raise ValueError("Binary message received without negotiating the binary protocol.")
+
+                return binary.decode(data)
+
+            if not self.compression:
+                raise ValueError("Compressed message received without negotiating compression.")
+
+            data = compression.decompress(data, config.max_message_size)
+
+            if self.binary:
+                return binary.decode(data)
+
+        return json.loads(data)
+
+    async def handle_frame(self, data: Union[str, bytes]):
+        """
+        Handles a frame received from the client. A frame holds either a single packet or an
+        array of packets (e.g. a burst of movement steps), which are decoded once and passed
+        to the message callback in order. Every packet counts against the message rate.
+        """
+        now = time.monotonic()
+
+        # The frame counts as one message until we know how many packets it holds.
+        if not self.consume(1, now):
+            await self.reject("spam")
+            return
+
+        if self.is_duplicate(data, now):
+            return
+
+        # Refresh timeout on activity
+        self.refresh_timeout(now)
+
+        try:
+            message = self.decode(data)
+        except ValueError:
+            log.warning(f"Received malformed message from {self.address}: {data!r}")
+            return
+
+        packets = self.unpack(message)
+
+        # Reject before dispatching any of the packets in an oversized batch.
+        if len(packets) > 1 and not self.consume(len(packets) - 1, now):
+            await self.reject("spam")
+            return
+
+        for packet in packets:
+            if self.closed:
+                return
+
+            if self.message_callback:
+                await self.message_callback(packet)
+            else:
+                # Fallback if no callback is registered yet (e.g. before Player is created)
+                log.debug(f"Received message from {self.address} without callback: {packet}")
+
+    @staticmethod
+    def unpack(message: Any) -> List[Any]:
+        """
+        Format: [id, data] for a single packet, or [[id, data], [id, data], ...] for a batch.
+        :returns: The packets contained in a decoded frame.
+        """
+        if isinstance(message, list) and len(message) > 0 and isinstance(message[0], list):
+            return message
+
+        return [message]
+
     def on_message(self, callback: Callable[[Any], Awaitable[None]]):
         self.message_callback = callback
 
@@ -23,8 +23,9 @@ from .handshake import HandshakePacket, HandshakePacketData
 from .heal import HealPacket, HealPacketData
 from .interface import InterfacePacket
 from .list import ListPacket, ListPacketData
+from .login import LoginPacketData
 from .lootbag import LootBagPacket
-from .map import MapPacket, MapPacketData
+from .map import EncodedMapData, MapPacket, MapPacketData
 from .minigame import MinigamePacket, MinigamePacketData
 from .movement import MovementPacket, MovementPacketData
 from .music import MusicPacket, MusicPacketData
@@ -38,6 +39,7 @@ from .points import PointsPacket, PointsPacketData
 from .poison import PoisonPacket, PoisonPacketData
 from .pvp import PVPPacket, PVPPacketData
 from .quest import QuestPacket, QuestPacketData
+from .ready import ReadyPacketData
 from .rank import RankPacket
 from .relay import RelayPacket
 from .resource import ResourcePacket, ResourcePacketData
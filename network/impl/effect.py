@@ -11,3 +11,7 @@ class EffectPacketData(CamelModel):
 class EffectPacket(Packet):
     def __init__(self, opcode: Opcodes.Effect, data: EffectPacketData):
         super().__init__(id=Packets.Effect, opcode=opcode, data=data)
+
+    def coalesce_key(self):
+        # An add and a remove of the same effect supersede one another, so the opcode is not part of the key.
+        return self.id, self.data.instance, self.data.effect
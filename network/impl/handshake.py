@@ -5,9 +5,14 @@ from ..packets import Packets
 
 class ClientHandshakePacketData(CamelModel):
     type: Literal['client']
+    g_ver: Optional[str] = None # Game version, sent by the client.
     instance: Optional[str] = None # Player's instance.
     server_id: Optional[int] = None
     server_time: Optional[int] = None
+    encoding: Optional[Literal['json', 'binary']] = None # Encoding of the frames sent after the handshake.
+    keys: Optional[List[str]] = None # Object key table of the binary protocol.
+    compression: Optional[Literal['zlib']] = None # Whether large frames are compressed.
+    dictionary: Optional[str] = None # Preset dictionary used to compress frames.
 
 class HubHandshakePacketData(CamelModel):
     type: Literal['hub']
@@ -0,0 +1,10 @@
+from typing import Optional
+from ..model import CamelModel
+from ..opcodes import Login as LoginOpcode
+
+# Sent by the client only, the server never sends a login packet.
+class LoginPacketData(CamelModel):
+    opcode: LoginOpcode
+    username: Optional[str] = None
+    password: Optional[str] = None
+    email: Optional[str] = None # Only used when registering.
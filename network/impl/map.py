@@ -1,25 +1,57 @@
 import gzip
 import json
 import base64
-from typing import Any
-from network.packet import Packet
+from typing import Any, List, NamedTuple, override
+from network.packet import Packet, PacketFragment
 from network.packets import Packets
 
 MapPacketData = Any
 
+class EncodedMapData(NamedTuple):
+    data: bytes # Gzipped JSON of the map data.
+    buffer_size: int # Length of the JSON before it was compressed.
+
+    @property
+    def payload(self) -> str:
+        """
+        :returns: The gzipped data base64 encoded, as sent to JSON clients.
+        """
+        return base64.b64encode(self.data).decode('utf-8')
+
+def encode_map_data(data: Any) -> EncodedMapData:
+    # We need to handle Pydantic models in data if passed, before dumping.
+    if hasattr(data, 'model_dump'):
+        data = data.model_dump(mode='json', by_alias=True, exclude_none=True)
+
+    json_bytes = json.dumps(data, separators=(',', ':')).encode('utf-8')
+    # Using gzip.compress for compression (mimics zlib.gzipSync)
+    compressed_data = gzip.compress(json_bytes, mtime=0)
+
+    return EncodedMapData(compressed_data, len(json_bytes))
+
 class MapPacket(Packet):
+    """
+    The map data is gzipped once. JSON clients receive it base64 encoded, while clients that
+    negotiated the binary protocol receive the gzipped bytes as-is, without the base64 overhead.
+    For clients that only negotiated frame compression, compressing the frame wins back the
+    base64 overhead (deflate codes the 64 base64 characters in 6 bits each).
+    """
+
     def __init__(self, data: Any):
-        # We need to handle Pydantic models in data if passed, before dumping.
-        if hasattr(data, 'model_dump'):
-            data = data.model_dump(mode='json', by_alias=True, exclude_none=True)
-
-        json_str = json.dumps(data, separators=(',', ':'))
-        # Using gzip.compress for compression (mimics zlib.gzipSync)
-        compressed_data = gzip.compress(json_str.encode('utf-8'))
-        b64_data = base64.b64encode(compressed_data).decode('utf-8')
-
-        super().__init__(
-            id=Packets.Map,
-            data=b64_data,
-            buffer_size=len(json_str.encode('utf-8'))
-        )
+        # Already encoded data (e.g. from the `RegionCache`) is sent as-is.
+        encoded = data if isinstance(data, EncodedMapData) else encode_map_data(data)
+
+        super().__init__(id=Packets.Map, data=encoded, buffer_size=encoded.buffer_size)
+
+    @override
+    def serialize(self) -> List[Any]:
+        return [self.id.value, self.data.payload, self.buffer_size]
+
+    @override
+    def encode(self) -> PacketFragment:
+        """
+        The JSON payload is encoded right away, and the binary payload is encoded from the gzipped bytes.
+        """
+        payload = json.dumps(self.serialize(), separators=(',', ':'))
+
+        return PacketFragment(self.id, None, payload, serialized=[self.id.value, self.data.data, self.buffer_size])
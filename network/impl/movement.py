@@ -18,3 +18,13 @@ class MovementPacketData(CamelModel):
 class MovementPacket(Packet):
     def __init__(self, opcode: MovementOpcode, data: Optional[MovementPacketData] = None):
         super().__init__(id=Packets.Movement, opcode=opcode, data=data)
+
+    def is_coalescable(self) -> bool:
+        # Steps and moves are positional updates superseded by the next one.
+        return self.opcode in (MovementOpcode.Step, MovementOpcode.Move)
+
+    def coalesce_key(self):
+        if self.opcode != MovementOpcode.Step or self.data is None:
+            return None
+
+        return self.id, self.opcode, self.data.instance
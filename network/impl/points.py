@@ -13,3 +13,10 @@ class PointsPacketData(CamelModel):
 class PointsPacket(Packet):
     def __init__(self, data: PointsPacketData):
         super().__init__(id=Packets.Points, data=data)
+
+    def is_coalescable(self) -> bool:
+        # Only the most recent hit points and mana are relevant to the client.
+        return True
+
+    def coalesce_key(self):
+        return self.id, self.data.instance, self.get_field_signature()
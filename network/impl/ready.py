@@ -0,0 +1,7 @@
+from typing import Optional
+from ..model import CamelModel
+
+# Sent by the client only, once it has loaded the map.
+class ReadyPacketData(CamelModel):
+    regions_loaded: Optional[int] = None
+    user_agent: Optional[str] = None
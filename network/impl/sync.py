@@ -5,3 +5,6 @@ from .player import PlayerData
 class SyncPacket(Packet):
     def __init__(self, data: PlayerData):
         super().__init__(id=Packets.Sync, data=data)
+
+    def coalesce_key(self):
+        return self.id, self.data.instance, self.get_field_signature()
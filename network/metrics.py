@@ -0,0 +1,117 @@
+import heapq
+from typing import Dict, List, Optional, Tuple
+
+from common.config import config
+from common.log import log
+
+
+class TickMetrics:
+    """
+    Records how long each tick's packet flush (`NetworkManager.parse`) takes, and which
+    connections took the longest to write to during that tick.
+    """
+
+    def __init__(self, slowest_count: int = 5):
+        self.slowest_count = slowest_count
+
+        self.ticks = 0
+        self.overruns = 0  # Flushes that took longer than `config.update_time`.
+
+        self.last_flush = 0.0  # Milliseconds taken by the most recent flush.
+        self.max_flush = 0.0
+        self.total_flush = 0.0
+
+        # The slowest connections of the most recent flush as (milliseconds, instance).
+        self.slowest: List[Tuple[float, str]] = []
+
+    def record_flush(self, duration: float, timings: Dict[str, float]) -> None:
+        """
+        Records a flush of the packet queues.
+        :param duration: How long the flush took in milliseconds.
+        :param timings: The time taken (in milliseconds) to write to each connection, keyed by instance.
+        """
+        self.ticks += 1
+        self.last_flush = duration
+        self.total_flush += duration
+        self.max_flush = max(self.max_flush, duration)
+
+        self.slowest = heapq.nlargest(
+            self.slowest_count, ((elapsed, instance) for instance, elapsed in timings.items())
+        )
+
+        if duration > config.update_time:
+            self.overruns += 1
+
+            log.warning(f"Packet flush took {duration:.1f}ms, longer than the {config.update_time}ms tick. "
+                        f"Slowest connections: {self.format_slowest()}.")
+
+    def get_average_flush(self) -> float:
+        """
+        :returns: The average flush duration in milliseconds.
+        """
+        return self.total_flush / self.ticks if self.ticks else 0.0
+
+    def format_slowest(self) -> str:
+        """
+        :returns: The slowest connections of the last flush as a readable string.
+        """
+        return ", ".join(f"{instance} ({elapsed:.1f}ms)" for elapsed, instance in self.slowest) or "none"
+
+    def summary(self) -> str:
+        """
+        :returns: A one line summary of the flush metrics.
+        """
+        return (f"ticks: {self.ticks}, last flush: {self.last_flush:.1f}ms, "
+                f"average: {self.get_average_flush():.1f}ms, max: {self.max_flush:.1f}ms, "
+                f"overruns: {self.overruns}, slowest: {self.format_slowest()}")
+
+
+class PacketMetrics:
+    """
+    Counts the packets received from clients and the time spent handling them, per packet
+    id and opcode (see `Incoming.handle_message`).
+    """
+
+    def __init__(self):
+        # Keyed by (packet id, opcode), the opcode is None for packets without one.
+        self.counts: Dict[Tuple[int, Optional[int]], int] = {}
+        self.total_time: Dict[Tuple[int, Optional[int]], float] = {}  # Milliseconds.
+        self.max_time: Dict[Tuple[int, Optional[int]], float] = {}  # Milliseconds.
+
+        self.errors = 0  # Packets whose handler raised an exception.
+        self.unknown = 0  # Packets without a handler.
+
+    def record(self, packet_id: int, opcode: Optional[int], duration: float) -> None:
+        """
+        Records a handled packet.
+        :param packet_id: The id of the packet.
+        :param opcode: The opcode of the packet, if any.
+        :param duration: How long the handler took in milliseconds.
+        """
+        key = (packet_id, opcode)
+
+        self.counts[key] = self.counts.get(key, 0) + 1
+        self.total_time[key] = self.total_time.get(key, 0.0) + duration
+
+        if duration > self.max_time.get(key, 0.0):
+            self.max_time[key] = duration
+
+    def get_average_time(self, packet_id: int, opcode: Optional[int] = None) -> float:
+        """
+        :returns: The average time in milliseconds spent handling the packet.
+        """
+        count = self.counts.get((packet_id, opcode), 0)
+        return self.total_time[(packet_id, opcode)] / count if count else 0.0
+
+    def summary(self, limit: int = 10) -> str:
+        """
+        :param limit: The number of packets to include, those with the most total time first.
+        :returns: A one line summary of the packet metrics.
+        """
+        busiest = heapq.nlargest(limit, self.total_time.items(), key=lambda item: item[1])
+        packets = ", ".join(
+            f"{packet_id}{'' if opcode is None else f'/{opcode}'}: {self.counts[(packet_id, opcode)]} "
+            f"({elapsed:.1f}ms)" for (packet_id, opcode), elapsed in busiest
+        )
+
+        return f"packets: {packets or 'none'}, errors: {self.errors}, unknown: {self.unknown}"
@@ -1,8 +1,19 @@
+from typing import Any
 from pydantic import BaseModel, ConfigDict
 from .utils import to_camel
+from .serializer import compile_serializer
 
 class CamelModel(BaseModel):
     """
     Base model that automatically converts snake_case fields to camelCase aliases.
     """
     model_config = ConfigDict(alias_generator=to_camel, populate_by_name=True)
+
+    @classmethod
+    def __pydantic_init_subclass__(cls, **kwargs: Any) -> None:
+        super().__pydantic_init_subclass__(**kwargs)
+
+        # Generate the fast-path serializer up front. Models with unresolved forward
+        # references are generated on first use instead, once they have been rebuilt.
+        if cls.__pydantic_complete__:
+            compile_serializer(cls)
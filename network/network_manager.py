@@ -1,14 +1,18 @@
 from __future__ import annotations
+import asyncio
 import time
-from typing import Dict, List, Any, Optional, TYPE_CHECKING
+from typing import Dict, Iterable, List, Optional, Tuple, TYPE_CHECKING
 
 from common.config import config
+from common.log import log
 from network.impl import ConnectedPacket
+from network.metrics import PacketMetrics, TickMetrics
 
 if TYPE_CHECKING:
     from game.world import World
 from network.connection import Connection
-from network.packet import Packet
+from network.packet import PacketBatch, PacketFragment, encode_batch
+from network.packet_queue import PacketQueue
 
 
 class NetworkManager:
@@ -22,20 +26,28 @@ class NetworkManager:
         self.database = world.database
         self.socket_handler = world.socket_handler
         
-        # In the original, world.map.regions is used. 
-        # For now, we'll leave it as None until World/Regions are implemented.
-        self.regions = None
+        # In the original, world.map.regions is used.
+        self.regions = world.regions
         
-        self.timeout_threshold = 5000 # 5 seconds
-        self.packets: Dict[str, List[Any]] = {}
+        self.packets: Dict[str, PacketQueue] = {}
+        self.metrics = TickMetrics()
+        self.packet_metrics = PacketMetrics()  # Packets received from clients, see `Incoming`.
 
     async def parse(self):
         """
         This function parses all the packets currently in the queue.
         We take each player instance and for each one we parse its
-        outstanding packets. Those are sent to each player's connection.
-        When we're done, we remove the packet from the queue.
+        outstanding packets. Those are handed off to each player's connection,
+        whose writer sends them in the background, so a slow client never holds
+        up the tick. When we're done, we remove the packet from the queue.
+
+        With `config.flush_mode` set to `concurrent`, the queues are instead sent directly
+        and the tick waits for them, writing to up to `config.flush_concurrency` connections
+        at once. Either way, the duration of the flush is recorded in the tick metrics.
         """
+        start = time.perf_counter()
+        pending: List[Tuple[Connection, List[PacketFragment]]] = []
+
         # Create a list of keys to iterate over to avoid "dictionary changed size during iteration"
         instances = list(self.packets.keys())
         
@@ -45,11 +57,51 @@ class NetworkManager:
                 connection = self.socket_handler.get(instance)
                 
                 if connection:
-                    await connection.send(queue)
-                    self.packets[instance] = []
+                    # Superseded packets are dropped from the queue here, before they are sent.
+                    pending.append((connection, queue.take()))
                 else:
                     self.socket_handler.remove(instance)
 
+        timings: Dict[str, float] = {}
+
+        if config.flush_mode == "concurrent":
+            await self.flush_concurrently(pending, timings)
+        else:
+            for connection, queue in pending:
+                connection.queue_fragments(queue)
+
+                # The writer runs in the background, so we report the last frame it wrote.
+                timings[connection.instance] = connection.last_write_duration
+
+        self.metrics.record_flush((time.perf_counter() - start) * 1000, timings)
+
+    async def flush_concurrently(
+            self,
+            pending: List[Tuple[Connection, List[PacketFragment]]],
+            timings: Dict[str, float]
+    ):
+        """
+        Sends the queues to their connections in groups of `config.flush_concurrency`, with
+        every connection in a group being written to at the same time.
+        @param pending The connections and the fragments queued for each of them.
+        @param timings Filled with the time taken to write to each connection (in milliseconds).
+        """
+        async def send(connection: Connection, queue: List[PacketFragment]):
+            await connection.send_fragments(queue)
+            timings[connection.instance] = connection.last_write_duration
+
+        group_size = max(1, config.flush_concurrency)
+
+        for index in range(0, len(pending), group_size):
+            results = await asyncio.gather(
+                *(send(connection, queue) for connection, queue in pending[index:index + group_size]),
+                return_exceptions=True
+            )
+
+            for result in results:
+                if isinstance(result, Exception):
+                    log.error(f"Failed to flush packets: {result}")
+
     async def handle_connection(self, connection: Connection):
         """
         We create a player instance when we receive a connection and begin a
@@ -59,30 +111,15 @@ class NetworkManager:
         is_banned = await self.database.is_ip_banned(connection.address) if self.database else False
 
         if is_banned:
+            # Further attempts from the address are rejected by admission without querying the database.
+            self.socket_handler.admission.deny(connection.address, 'banned')
             await connection.reject('banned')
             return
 
-        # Create the packet queue for the connection instance.
-        self.packets[connection.instance] = []
-
-        # Check the time difference between the last connection.
-        last_time = self.get_last_connection(connection)
-        time_difference = (time.time() * 1000) - last_time
-
-        # Update the last time the connection was made.
-        self.socket_handler.update_last_time(connection.address)
-
-        # Skip if we are in debug mode.
-        if not config.debugging:
-            # Check that the connections aren't coming too fast.
-            if time_difference < self.timeout_threshold:
-                await connection.reject('toofast')
-                return
+        # The connection rate and count per address were checked by `SocketHandler.admit`.
 
-            # Ensure that we don't have too many connections from the same IP address.
-            if self.socket_handler.is_max_connections(connection.address):
-                await connection.reject('toomany')
-                return
+        # Create the packet queue for the connection instance.
+        self.packets[connection.instance] = PacketQueue()
 
         # Create the player instance finally.
         from game.entity.character.player.player import Player
@@ -91,12 +128,8 @@ class NetworkManager:
         # Send the connected packet, begin the handshake process.
         await connection.send([ConnectedPacket().serialize()])
 
-    def get_last_connection(self, connection: Connection) -> int:
-        address_info = self.socket_handler.addresses.get(connection.address)
-        return address_info.last_time if address_info else 0
-
     def create_packet_queue(self, instance: str):
-        self.packets[instance] = []
+        self.packets[instance] = PacketQueue()
 
     def delete_packet_queue(self, instance: str):
         if instance in self.packets:
@@ -104,39 +137,80 @@ class NetworkManager:
 
     # Broadcasting and Socket Communication
 
-    def broadcast(self, packet: Packet):
+    def broadcast(self, packet: PacketBatch):
         """
-        Broadcasts a packet to the entire server.
+        Broadcasts a packet to the entire server. The packet is encoded
+        once and the same fragment is shared between every queue.
         """
-        serialized = packet.serialize()
-        
+        fragments = encode_batch(packet)
+
         for queue in self.packets.values():
-            queue.append(serialized)
+            queue.extend(fragments)
 
-    def send(self, instance: str, packet: Packet):
+    def send(self, instance: str, packet: PacketBatch):
         """
         Send a packet to a player's connection.
         """
         if instance not in self.packets:
             return
 
-        serialized = packet.serialize()
-        self.packets[instance].append(serialized)
+        self.packets[instance].extend(encode_batch(packet))
 
-    def send_to_players(self, instances: List[str], packet: Packet):
-        for instance in instances:
-            self.send(instance, packet)
+    def send_to_players(self, instances: List[str], packet: PacketBatch):
+        self.send_to_instances(instances, packet)
 
-    def send_to_region(self, region_id: int, packet: Packet, ignore: Optional[str] = None):
-        if not self.regions:
+    def send_to_region(self, region_id: int, packet: PacketBatch, ignore: Optional[str] = None):
+        """
+        Sends a packet to all the players within a region.
+        @param region_id The region we are sending the packet to.
+        @param packet The packet (or group of packets) we are sending.
+        @param ignore An optional player instance that should not receive the packet.
+        """
+        if not self.regions or not self.regions.is_valid(region_id):
             return
-            
-        # TODO: Implement region logic when Regions class is available
-        pass
 
-    def send_to_surrounding_regions(self, region_id: int, packet: Packet, ignore: Optional[str] = None):
+        self.send_to_instances(self.regions.get(region_id).players, packet, ignore)
+
+    def send_to_surrounding_regions(self, region_id: int, packet: PacketBatch, ignore: Optional[str] = None):
+        """
+        Sends a packet to all the players within a region and the regions bordering it.
+        The surrounding regions are precomputed by `Regions`, so this is a lookup.
+        @param region_id The region at the centre of the area we are sending to.
+        @param packet The packet (or group of packets) we are sending.
+        @param ignore An optional player instance that should not receive the packet.
+        """
         if region_id < 0 or not self.regions:
             return
-            
-        # TODO: Implement surrounding region logic
-        pass
+
+        fragments: Optional[List[PacketFragment]] = None
+
+        for surrounding_id in self.regions.get_surrounding_regions(region_id):
+            players = self.regions.get(surrounding_id).players
+
+            if not players:
+                continue
+
+            # Only encode the packet once we know there is someone to receive it.
+            if fragments is None:
+                fragments = encode_batch(packet)
+
+            self._append(players, fragments, ignore)
+
+    def send_to_instances(self, instances: Iterable[str], packet: PacketBatch, ignore: Optional[str] = None):
+        """
+        Encodes a packet once and appends it to the queue of every instance specified.
+        """
+        if not instances:
+            return
+
+        self._append(instances, encode_batch(packet), ignore)
+
+    def _append(self, instances: Iterable[str], fragments: List[PacketFragment], ignore: Optional[str] = None):
+        for instance in instances:
+            if instance == ignore:
+                continue
+
+            queue = self.packets.get(instance)
+
+            if queue is not None:
+                queue.extend(fragments)
@@ -1,7 +1,106 @@
-from typing import Any, Optional, List
+import json
+from typing import Any, Hashable, Optional, List, Tuple, Union
 from enum import IntEnum
 from pydantic import BaseModel, ConfigDict
+from . import binary
 from .packets import Packets
+from .serializer import serialize
+
+
+class PacketFragment:
+    """
+    A packet that has already been serialized for the wire. Fragments are encoded once,
+    shared between every queue the packet is pushed to, and joined together when the
+    frame for a connection is built. The JSON payload and the binary payload (for clients
+    that negotiated the binary protocol, see `network/binary.py`) are each encoded at most
+    once, when first needed.
+
+    Fragments with a coalesce key (see `Packet.coalesce_key`) hold onto their packet and
+    are only serialized when a payload is first needed, so packets superseded in every
+    queue before the flush are never serialized at all.
+    """
+    __slots__ = ("id", "opcode", "_payload", "_binary", "_serialized", "coalescable", "key", "packet")
+
+    def __init__(
+            self,
+            packet_id: Packets,
+            opcode: Optional[int],
+            payload: Optional[str],
+            coalescable: bool = False,
+            key: Optional[Hashable] = None,
+            packet: Optional["Packet"] = None,
+            serialized: Optional[List[Any]] = None
+    ):
+        self.id = packet_id
+        self.opcode = opcode
+        self._payload = payload
+        self._binary: Optional[bytes] = None
+        # Output of `Packet.serialize`, used to encode the other payload (raw bytes rather than base64 for `MapPacket`).
+        self._serialized = serialized
+        self.coalescable = coalescable  # See `Packet.is_coalescable`.
+        self.key = key  # See `Packet.coalesce_key`.
+        self.packet = packet  # Only kept until the packet is serialized.
+
+    def __len__(self) -> int:
+        return len(self.payload)
+
+    @property
+    def serialized(self) -> List[Any]:
+        """
+        :returns: The serialized packet, serializing it on first access if necessary.
+        """
+        if self._serialized is None:
+            if self.packet is not None:
+                self._serialized = self.packet.serialize()
+                self.packet = None
+            else:
+                self._serialized = json.loads(self._payload)
+
+        return self._serialized
+
+    @property
+    def payload(self) -> str:
+        """
+        :returns: The JSON encoded packet, encoding it on first access if necessary.
+        """
+        if self._payload is None:
+            self._payload = json.dumps(self.serialized, separators=(',', ':'))
+
+        return self._payload
+
+    @property
+    def binary(self) -> bytes:
+        """
+        :returns: The binary encoded packet, encoding it on first access if necessary.
+        """
+        if self._binary is None:
+            self._binary = binary.encode(self.serialized)
+
+        return self._binary
+
+    def get_size(self, is_binary: bool = False) -> int:
+        """
+        :param is_binary: Whether we are measuring the binary payload rather than the JSON payload.
+        :returns: The size of the payload sent to the client.
+        """
+        return len(self.binary) if is_binary else len(self.payload)
+
+    @staticmethod
+    def join(fragments: List["PacketFragment"]) -> str:
+        """
+        Builds the frame sent to the client from a list of fragments.
+        Format: [[id, ...], [id, ...], ...]
+        """
+        return f"[{','.join(fragment.payload for fragment in fragments)}]"
+
+    @staticmethod
+    def join_binary(fragments: List["PacketFragment"]) -> bytes:
+        """
+        Builds the binary frame sent to the client from a list of fragments, an array
+        of the binary encoded packets.
+        """
+        return binary.encode_array_header(len(fragments)) + b"".join(fragment.binary for fragment in fragments)
+
 
 class Packet(BaseModel):
     id: Packets
@@ -22,10 +121,11 @@ class Packet(BaseModel):
         data_val = self.data
         if isinstance(data_val, BaseModel):
             # Serialize Pydantic models to dict, ensuring aliases (camelCase) are used
-            # and None values are excluded (similar to TS ignoring undefined)
-            data_val = data_val.model_dump(by_alias=True, exclude_none=True)
+            # and None values are excluded (similar to TS ignoring undefined).
+            # See `network/serializer.py` for the generated fast path.
+            data_val = serialize(data_val)
         elif isinstance(data_val, list):
-             data_val = [item.model_dump(by_alias=True, exclude_none=True) if isinstance(item, BaseModel) else item for item in data_val]
+             data_val = [serialize(item) if isinstance(item, BaseModel) else item for item in data_val]
 
         if opcode_val is None:
             packet = [packet_id, data_val]
@@ -36,3 +136,61 @@ class Packet(BaseModel):
             packet.append(self.buffer_size)
 
         return packet
+
+    def is_coalescable(self) -> bool:
+        """
+        Whether the packet only carries state that a later packet of the same kind
+        supersedes (e.g. a position or hit points update). Coalescable packets may be
+        dropped for clients that cannot keep up, see `Connection.queue_fragments`.
+        """
+        return False
+
+    def coalesce_key(self) -> Optional[Hashable]:
+        """
+        Packets that are idempotent updates of some state return a key identifying that state,
+        usually (packet id, opcode, instance). When a packet with the same key is queued for a
+        connection within the same tick, the older one is superseded (see `PacketQueue`).
+        :returns: The coalesce key, or None if every copy of the packet must be sent.
+        """
+        return None
+
+    def get_field_signature(self) -> Tuple[str, ...]:
+        """
+        Packets that carry partial updates (e.g. only hit points, or only mana) can only supersede
+        packets updating the same fields, so their coalesce key includes the fields that are set.
+        :returns: The names of the data fields that are not None.
+        """
+        if not isinstance(self.data, BaseModel):
+            return ()
+
+        return tuple(name for name, value in self.data.__dict__.items() if value is not None)
+
+    def encode(self) -> PacketFragment:
+        """
+        Serializes the packet into a fragment. The fragment can be appended to any number of
+        packet queues without being serialized again, and is encoded into JSON or binary once
+        the payload is first needed. Packets with a coalesce key are serialized lazily too.
+        """
+        opcode_val = self.opcode.value if self.opcode is not None else None
+        key = self.coalesce_key()
+
+        if key is not None:
+            return PacketFragment(self.id, opcode_val, None, self.is_coalescable(), key, self)
+
+        return PacketFragment(self.id, opcode_val, None, self.is_coalescable(), serialized=self.serialize())
+
+
+# Type alias for a single packet or a group of packets pushed together (e.g. every hit of an AoE attack).
+PacketBatch = Union[Packet, List[Packet]]
+
+
+def encode_batch(packets: PacketBatch) -> List[PacketFragment]:
+    """
+    Encodes a single packet or a group of packets into fragments, in order.
+    :param packets: The packet or packets we are encoding.
+    :returns: A list of the encoded fragments.
+    """
+    if isinstance(packets, list):
+        return [packet.encode() for packet in packets]
+
+    return [packets.encode()]
@@ -0,0 +1,74 @@
+from typing import Dict, Hashable, Iterable, Iterator, List, Optional
+
+from network.packet import PacketFragment
+
+
+class PacketQueue:
+    """
+    The fragments queued for a single connection during the current tick. Fragments
+    with a coalesce key (see `Packet.coalesce_key`) supersede the fragment queued earlier
+    in the tick under the same key, e.g. five `PointsPacket`s for the same character
+    only result in the last one being sent.
+
+    The superseded fragment is blanked out and the new one is appended, rather than
+    writing the new one over the old slot. This way the latest state is never sent
+    ahead of packets that were queued before it (a step followed by a teleport and
+    another step must still end on the second step).
+    """
+    __slots__ = ("fragments", "keys", "superseded")
+
+    def __init__(self):
+        self.fragments: List[Optional[PacketFragment]] = []
+        # Index of the most recent fragment queued under each coalesce key.
+        self.keys: Dict[Hashable, int] = {}
+        self.superseded = 0
+
+    def __len__(self) -> int:
+        return len(self.fragments) - self.superseded
+
+    def __iter__(self) -> Iterator[PacketFragment]:
+        return (fragment for fragment in self.fragments if fragment is not None)
+
+    def __getitem__(self, index: int) -> PacketFragment:
+        return list(self)[index]
+
+    def append(self, fragment: PacketFragment) -> None:
+        """
+        Adds a fragment to the queue, superseding the previous fragment with the same key.
+        :param fragment: The fragment we are queueing.
+        """
+        key = fragment.key
+
+        if key is not None:
+            index = self.keys.get(key)
+
+            if index is not None:
+                self.fragments[index] = None
+                self.superseded += 1
+
+            self.keys[key] = len(self.fragments)
+
+        self.fragments.append(fragment)
+
+    def extend(self, fragments: Iterable[PacketFragment]) -> None:
+        """
+        Adds several fragments to the queue, in order.
+        """
+        for fragment in fragments:
+            self.append(fragment)
+
+    def take(self) -> List[PacketFragment]:
+        """
+        Empties the queue.
+        :returns: The fragments that were queued, without the superseded ones.
+        """
+        fragments = self.fragments
+
+        if self.superseded:
+            fragments = [fragment for fragment in fragments if fragment is not None]
+
+        self.fragments = []
+        self.keys = {}
+        self.superseded = 0
+
+        return fragments
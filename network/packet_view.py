@@ -0,0 +1,91 @@
+from typing import Annotated, Any, Dict, Generic, Optional, Tuple, Type, TypeVar
+
+from pydantic import BaseModel, TypeAdapter, ValidationError
+
+Model = TypeVar("Model", bound=BaseModel)
+
+_adapters: Dict[Tuple[Type[BaseModel], str], TypeAdapter] = {}
+
+
+class PacketView(Generic[Model]):
+    """
+    Read-only view of the data of a packet received from the client, typed by one of the
+    `*PacketData` models. Rather than validating the whole model up front, each field is
+    validated (against the type of the model's field) the first time a handler reads it,
+    so a handler only pays for the fields it touches and unknown extra keys are ignored.
+
+    Fields are read by their snake_case name (`view.g_ver`) and looked up by their alias
+    (`gVer`) in the raw data. Missing optional fields return their default, missing required
+    fields and invalid values raise a pydantic `ValidationError`.
+    """
+    __slots__ = ("model", "data", "values")
+
+    def __init__(self, model: Type[Model], data: Any):
+        self.model = model
+        self.data: Dict[str, Any] = data if isinstance(data, dict) else {}
+        self.values: Dict[str, Any] = {}  # Fields that have already been validated.
+
+    def __getattr__(self, name: str) -> Any:
+        try:
+            values = object.__getattribute__(self, "values")
+        except AttributeError:
+            raise AttributeError(name) from None
+
+        if name in values:
+            return values[name]
+
+        field = self.model.model_fields.get(name)
+
+        if field is None:
+            raise AttributeError(f"{self.model.__name__} has no field {name}.")
+
+        alias = field.alias or name
+
+        if alias in self.data:
+            value = _get_adapter(self.model, name).validate_python(self.data[alias])
+        elif name in self.data and self.model.model_config.get("populate_by_name"):
+            value = _get_adapter(self.model, name).validate_python(self.data[name])
+        elif field.is_required():
+            # Let pydantic build the error so handlers see the same exception as a full validation.
+            raise ValidationError.from_exception_data(self.model.__name__, [
+                {"type": "missing", "loc": (alias,), "input": self.data}
+            ])
+        else:
+            value = field.get_default(call_default_factory=True)
+
+        values[name] = value
+
+        return value
+
+    def get(self, key: str, default: Optional[Any] = None) -> Any:
+        """
+        :returns: The raw (unvalidated) value of a key in the packet data.
+        """
+        return self.data.get(key, default)
+
+    def validate(self) -> Model:
+        """
+        Validates the entire packet data into the model.
+        :raises ValidationError: If the data does not match the model.
+        """
+        return self.model.model_validate(self.data)
+
+
+def _get_adapter(model: Type[BaseModel], name: str) -> TypeAdapter:
+    """
+    :returns: The type adapter used to validate a single field of a model, created once per field.
+    """
+    key = (model, name)
+    adapter = _adapters.get(key)
+
+    if adapter is None:
+        field = model.model_fields[name]
+        annotation = field.annotation
+
+        if field.metadata:
+            annotation = Annotated[(annotation, *field.metadata)]
+
+        adapter = _adapters[key] = TypeAdapter(annotation)
+
+    return adapter
+
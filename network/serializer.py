@@ -0,0 +1,219 @@
+"""
+Fast-path serialization for pydantic models sent to the client.
+
+`model_dump(by_alias=True, exclude_none=True)` walks the pydantic-core schema on every
+call. Packets are built thousands of times a second, so instead we generate a plain
+Python function per model class, once, with the camelCase aliases and the None-skipping
+resolved in advance. The generated function produces exactly the same output as
+`model_dump(by_alias=True, exclude_none=True)`; models using features we do not
+replicate (custom serializers, computed fields, extra fields) fall back to `model_dump`.
+"""
+import enum
+import types
+from typing import Any, Callable, Dict, List, Literal, Optional, Type, Union, get_args, get_origin
+
+from pydantic import BaseModel, RootModel
+from pydantic.functional_serializers import PlainSerializer, WrapSerializer
+
+# Type aliases for better readability
+Converter = Callable[[Any], Any]
+ModelSerializer = Callable[[BaseModel], Dict[str, Any]]
+
+# Types that pydantic passes through unchanged when dumping in python mode.
+SCALAR_TYPES = (int, float, str, bool, bytes, type(None))
+
+_serializers: Dict[Type[BaseModel], ModelSerializer] = {}
+
+
+def serialize(model: BaseModel) -> Dict[str, Any]:
+    """
+    Serializes a pydantic model into a dictionary using the aliases of the fields
+    and excluding None values. Equivalent to `model_dump(by_alias=True, exclude_none=True)`.
+    :param model: The model we are serializing.
+    :returns: A dictionary of the model's data.
+    """
+    serializer = _serializers.get(type(model))
+
+    if serializer is None:
+        serializer = compile_serializer(type(model))
+
+    return serializer(model)
+
+
+def compile_serializer(cls: Type[BaseModel]) -> ModelSerializer:
+    """
+    Generates the serializer function for a model class and caches it.
+    :param cls: The model class we are generating a serializer for.
+    :returns: The serializer function for the model class.
+    """
+    if cls in _serializers:
+        return _serializers[cls]
+
+    if _requires_model_dump(cls):
+        serializer: ModelSerializer = _dump
+    else:
+        serializer = _generate(cls)
+
+    _serializers[cls] = serializer
+
+    return serializer
+
+
+def _dump(model: BaseModel) -> Dict[str, Any]:
+    return model.model_dump(by_alias=True, exclude_none=True)
+
+
+def _requires_model_dump(cls: Type[BaseModel]) -> bool:
+    """
+    Checks whether the model uses serialization features that the generated serializer
+    does not replicate, in which case we fall back onto pydantic's `model_dump`.
+    """
+    if issubclass(cls, RootModel) or cls.model_config.get("extra") == "allow":
+        return True
+
+    decorators = cls.__pydantic_decorators__
+    if decorators.field_serializers or decorators.model_serializers or cls.model_computed_fields:
+        return True
+
+    return any(
+        isinstance(metadata, (PlainSerializer, WrapSerializer))
+        for field in cls.model_fields.values()
+        for metadata in field.metadata
+    )
+
+
+def _generate(cls: Type[BaseModel]) -> ModelSerializer:
+    """
+    Generates the source code of the serializer function for a model class. Every field
+    becomes a direct `__dict__` lookup followed by a None check, and fields that contain
+    nested models or containers are passed through their own converter.
+    """
+    namespace: Dict[str, Any] = {}
+    lines = ["def serialize(model):", "    data = model.__dict__", "    output = {}"]
+
+    for index, (name, field) in enumerate(cls.model_fields.items()):
+        if field.exclude:
+            continue
+
+        alias = field.serialization_alias or field.alias or name
+        converter = _converter(field.annotation)
+
+        lines.append(f"    value = data[{name!r}]")
+        lines.append("    if value is not None:")
+
+        if converter is None:
+            lines.append(f"        output[{alias!r}] = value")
+        else:
+            namespace[f"convert_{index}"] = converter
+            lines.append(f"        output[{alias!r}] = convert_{index}(value)")
+
+    lines.append("    return output")
+
+    exec("\n".join(lines), namespace)
+
+    return namespace["serialize"]
+
+
+def _converter(annotation: Any) -> Optional[Converter]:
+    """
+    Builds the converter for a field's type annotation. Returns None when the value
+    is passed through unchanged (scalars, enums, literals).
+    """
+    origin = get_origin(annotation)
+    args = [arg for arg in get_args(annotation) if arg is not type(None)]
+
+    # Optional[X] is serialized the same as X since None values are skipped.
+    if origin in (Union, types.UnionType):
+        if len(args) == 1:
+            return _converter(args[0])
+
+        models = [arg for arg in args if isinstance(arg, type) and issubclass(arg, BaseModel)]
+        if models:
+            return _union_converter(models)
+
+        if all(_converter(arg) is None for arg in args):
+            return None
+
+        return _dynamic
+
+    if origin is Literal:
+        return None
+
+    if origin in (list, List):
+        item = _converter(args[0]) if args else _dynamic
+        if item is None:
+            return list
+        return lambda value: [item(entry) if entry is not None else None for entry in value]
+
+    if origin in (dict, Dict):
+        item = _converter(args[1]) if len(args) > 1 else _dynamic
+        if item is None:
+            return dict
+        return lambda value: {key: item(entry) if entry is not None else None for key, entry in value.items()}
+
+    if isinstance(annotation, type):
+        if issubclass(annotation, BaseModel):
+            return _model_converter(annotation)
+
+        if issubclass(annotation, SCALAR_TYPES) or issubclass(annotation, enum.Enum):
+            return None
+
+    return _dynamic
+
+
+def _model_converter(cls: Type[BaseModel]) -> Converter:
+    """
+    Nested models are serialized as their declared type (matching pydantic, which drops
+    the fields of subclasses). The serializer is looked up lazily so that models can
+    reference themselves or models that are declared later.
+    """
+    def convert(value: Any) -> Any:
+        if not isinstance(value, cls):
+            return _dynamic(value)
+
+        serializer = _serializers.get(cls)
+
+        if serializer is None:
+            serializer = compile_serializer(cls)
+
+        return serializer(value)
+
+    return convert
+
+
+def _union_converter(models: List[Type[BaseModel]]) -> Converter:
+    """
+    Unions of models pick the member matching the value's exact type first and
+    otherwise the first member the value is an instance of, as pydantic does.
+    """
+    converters = {cls: _model_converter(cls) for cls in models}
+
+    def convert(value: Any) -> Any:
+        converter = converters.get(type(value))
+
+        if converter is None:
+            converter = next((converters[cls] for cls in models if isinstance(value, cls)), _dynamic)
+
+        return converter(value)
+
+    return convert
+
+
+def _dynamic(value: Any) -> Any:
+    """
+    Used for `Any` fields and annotations we cannot resolve in advance. The value is
+    serialized based on its runtime type.
+    """
+    if isinstance(value, BaseModel):
+        return serialize(value)
+
+    if isinstance(value, list):
+        return [_dynamic(entry) for entry in value]
+
+    if isinstance(value, dict):
+        return {key: _dynamic(entry) for key, entry in value.items()}
+
+    if isinstance(value, tuple):
+        return tuple(_dynamic(entry) for entry in value)
+
+    return value
@@ -1,48 +1,99 @@
+from __future__ import annotations
+import asyncio
+import heapq
 import time
-from typing import Dict, Optional, TYPE_CHECKING
+from typing import Dict, List, Optional, Set, Tuple, TYPE_CHECKING
 if TYPE_CHECKING:
     from game.world import ConnectionCallback
+from common.config import config
 from common.log import log
+from network.admission import AdmissionController
 from network.connection import Connection
 from network.modules import Constants
 
 class AddressInfo:
     def __init__(self):
-        self.count = 0
-        self.last_time = 0
+        # Instances of the connections currently open from the address.
+        self.instances: Set[str] = set()
+
+    @property
+    def count(self) -> int:
+        return len(self.instances)
 
 class SocketHandler:
     """
     This class acts as a central registry for all active connections.
-    It tracks the number of connections per IP address to enforce limits.
+    It indexes the connections by IP address to enforce limits, and new connections
+    go through the `AdmissionController` (see `admit`) before they are created.
+
+    Idle connections are timed out by a single task sweeping a heap of connection deadlines
+    (see `sweep`), rather than a timeout task per connection. Receiving a message only updates
+    `Connection.last_activity`; the heap entry of the connection is corrected the next time it
+    reaches the top of the heap, so each connection has exactly one entry.
     """
 
     def __init__(self):
-        # Keeps track of addresses, their counts, and their last connection time.
+        # Keeps track of addresses and the connections open from them.
         self.addresses: Dict[str, AddressInfo] = {}
         # List of all connections to the server, keyed by instance ID.
         self.connections: Dict[str, Connection] = {}
         
         self.connection_callback: Optional[ConnectionCallback] = None
 
+        self.admission = AdmissionController(
+            config.admission_window,
+            config.admission_address_limit,
+            config.admission_global_limit,
+            config.admission_deny_duration
+        )
+
+        # Duplicate messages dropped by connections that have since been removed.
+        self.duplicates = 0
+
+        # Heap of (deadline, instance), the deadlines may be earlier than the actual ones.
+        self.deadlines: List[Tuple[float, str]] = []
+        self.sweep_interval = 1 # Seconds between sweeps.
+        self.sweep_task: Optional[asyncio.Task] = None
+
+    def admit(self, address: str) -> Optional[str]:
+        """
+        Decides whether a new connection from an address is accepted, this is called before
+        the WebSocket is accepted so rejected attempts never create a `Connection`.
+        :param address: The IP address the connection is coming from.
+        :returns: The reason the connection is rejected, or None if it is admitted.
+        """
+        # Skip the per-address limits if we are in debug mode.
+        if config.debugging:
+            return self.admission.admit(address, check_address=False)
+
+        if self.is_max_connections(address):
+            return self.admission.reject("toomany")
+
+        return self.admission.admit(address)
+
     async def add(self, connection: Connection):
         """
         Adds a connection to our dictionary of connections.
         """
         self.connections[connection.instance] = connection
-        self.add_address(connection.address)
+        self.add_address(connection.address, connection.instance)
+
+        heapq.heappush(self.deadlines, (connection.get_deadline(), connection.instance))
+
+        if not self.sweep_task:
+            self.sweep_task = asyncio.create_task(self._sweep_loop())
         
         if self.connection_callback:
             await self.connection_callback(connection)
 
-    def add_address(self, address: str):
+    def add_address(self, address: str, instance: str):
         """
-        Stores an address into our dictionary of addresses.
+        Stores a connection's instance under its address in our dictionary of addresses.
         """
         if address not in self.addresses:
             self.addresses[address] = AddressInfo()
             
-        self.addresses[address].count += 1
+        self.addresses[address].instances.add(instance)
 
     def remove(self, instance: str):
         """
@@ -52,49 +103,107 @@ class SocketHandler:
             return
             
         connection = self.connections[instance]
-        self.remove_address(connection.address)
+        self.remove_address(connection.address, instance)
+        self.duplicates += connection.duplicates
         
         del self.connections[instance]
 
-    def remove_address(self, address: str):
+    def remove_address(self, address: str, instance: str):
         """
-        Removes an address from our dictionary.
+        Removes a connection's instance from its address, and the address once it has no connections left.
         """
         if address not in self.addresses:
             return
             
-        self.addresses[address].count -= 1
+        self.addresses[address].instances.discard(instance)
         
         if self.addresses[address].count <= 0:
             del self.addresses[address]
 
+    async def sweep(self, now: Optional[float] = None):
+        """
+        Times out the connections whose deadline has passed. Entries whose connection has
+        been active since they were pushed are pushed back with the connection's new deadline.
+        :param now: The current `time.monotonic()`, used for testing.
+        """
+        if now is None:
+            now = time.monotonic()
+
+        while self.deadlines and self.deadlines[0][0] <= now:
+            _, instance = heapq.heappop(self.deadlines)
+            connection = self.connections.get(instance)
+
+            # Removed connections leave their entry behind, it is discarded here.
+            if not connection:
+                continue
+
+            if connection.closed:
+                log.warning(f"Connection {connection.address} closed improperly.")
+                self.remove(instance)
+                continue
+
+            deadline = connection.get_deadline()
+
+            if deadline > now:
+                heapq.heappush(self.deadlines, (deadline, instance))
+                continue
+
+            await connection.reject("timeout")
+
+    async def _sweep_loop(self):
+        try:
+            while True:
+                await asyncio.sleep(self.sweep_interval)
+
+                try:
+                    await self.sweep()
+                    self.admission.prune()
+                except Exception as e:
+                    log.error(f"Error while sweeping connections: {e}")
+        except asyncio.CancelledError:
+            pass
+
+    def stop(self):
+        """
+        Stops the sweeping task.
+        """
+        if self.sweep_task:
+            self.sweep_task.cancel()
+            self.sweep_task = None
+
     def get(self, instance: str) -> Optional[Connection]:
         """
         Finds and returns a connection in our dictionary of connections.
         """
         return self.connections.get(instance)
 
+    def get_connections(self, address: str) -> List[Connection]:
+        """
+        Returns the connections currently open from an IP address.
+        """
+        if address not in self.addresses:
+            return []
+        return [self.connections[instance] for instance in self.addresses[address].instances]
+
     def is_max_connections(self, address: str) -> bool:
         """
         Checks whether the current IP address has reached the maximum allowed connections.
         """
         if address not in self.addresses:
             return False
-        return self.addresses[address].count > Constants.MAX_CONNECTIONS
+        return self.addresses[address].count >= Constants.MAX_CONNECTIONS
 
-    def has_connections(self) -> bool:
+    def get_duplicate_count(self) -> int:
         """
-        Checks whether or not we have anyone currently connected to the server.
+        Returns the number of duplicate messages dropped by all connections, past and present.
         """
-        return len(self.connections) > 0
+        return self.duplicates + sum(connection.duplicates for connection in self.connections.values())
 
-    def update_last_time(self, address: str):
+    def has_connections(self) -> bool:
         """
-        Updates the last time a connection was made from an address.
+        Checks whether or not we have anyone currently connected to the server.
         """
-        if address not in self.addresses:
-            self.addresses[address] = AddressInfo()
-        self.addresses[address].last_time = int(time.time() * 1000)
+        return len(self.connections) > 0
 
     def on_connection(self, callback: ConnectionCallback):
         """
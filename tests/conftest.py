@@ -0,0 +1,15 @@
+import pytest
+from unittest.mock import MagicMock
+from game.scheduler import Scheduler
+
+
+@pytest.fixture
+def world():
+    """
+    A mocked world with a real scheduler, which characters need for their intervals.
+    Tests using it must run in an event loop (`@pytest.mark.anyio`).
+    """
+    world = MagicMock()
+    world.scheduler = Scheduler()
+    yield world
+    world.scheduler.stop()
@@ -0,0 +1,65 @@
+from network.admission import AdmissionController
+
+
+def test_attempts_within_the_limit_are_admitted():
+    admission = AdmissionController(window=10, address_limit=3)
+
+    assert [admission.admit("1.1.1.1", now=float(index)) for index in range(3)] == [None, None, None]
+    assert admission.admitted == 3
+
+
+def test_address_over_its_limit_is_denied():
+    admission = AdmissionController(window=10, address_limit=2, deny_duration=30)
+
+    admission.admit("1.1.1.1", now=0.0)
+    admission.admit("1.1.1.1", now=1.0)
+
+    assert admission.admit("1.1.1.1", now=2.0) == "toofast"
+    # Other addresses are unaffected.
+    assert admission.admit("2.2.2.2", now=2.0) is None
+
+    # The deny cache rejects the address even once its window has emptied.
+    assert admission.admit("1.1.1.1", now=20.0) == "toofast"
+    assert admission.admit("1.1.1.1", now=33.0) is None
+    assert admission.rejected == {"toofast": 2}
+
+
+def test_window_slides():
+    admission = AdmissionController(window=10, address_limit=2)
+
+    admission.admit("1.1.1.1", now=0.0)
+    admission.admit("1.1.1.1", now=5.0)
+
+    assert admission.admit("1.1.1.1", now=10.0) is None
+
+
+def test_global_limit():
+    admission = AdmissionController(window=10, global_limit=2)
+
+    admission.admit("1.1.1.1", now=0.0)
+    admission.admit("2.2.2.2", now=0.0)
+
+    assert admission.admit("3.3.3.3", now=1.0) == "worldfull"
+    assert admission.admit("3.3.3.3", now=10.0) is None
+
+
+def test_denied_reason_is_kept():
+    admission = AdmissionController()
+    admission.deny("1.1.1.1", "banned", now=0.0, duration=60)
+
+    assert admission.admit("1.1.1.1", now=1.0) == "banned"
+    assert admission.admit("1.1.1.1", now=1.0, check_address=False) is None
+
+
+def test_prune_forgets_idle_addresses():
+    admission = AdmissionController(window=10, address_limit=1, deny_duration=5)
+
+    admission.admit("1.1.1.1", now=0.0)
+    admission.admit("2.2.2.2", now=8.0)
+    admission.admit("2.2.2.2", now=9.0)
+
+    admission.prune(now=15.0)
+
+    assert list(admission.attempts) == ["2.2.2.2"]
+    assert admission.denied == {}
+    assert "toofast: 1" in admission.summary()
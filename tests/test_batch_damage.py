@@ -0,0 +1,86 @@
+import pytest
+from unittest.mock import MagicMock
+from game.entity.character.character import Character
+from game.entity.character.combat.hit_table import HitTable
+from game.map.positions import Positions
+from game.map.regions import Regions
+
+
+class MockCharacter(Character):
+    def serialize(self):
+        return super().serialize()
+
+
+@pytest.fixture(autouse=True)
+def send_to_regions(monkeypatch):
+    send = MagicMock()
+    monkeypatch.setattr(Character, "send_to_regions", send)
+    return send
+
+
+@pytest.fixture
+def world(world):
+    world.positions = Positions()
+    world.regions = Regions(128, 128)
+    return world
+
+
+def create_targets(world, count):
+    targets = []
+
+    for index in range(count):
+        target = MockCharacter(f"0-target_{index}", world, "target", 10 + index % 3, 10)
+        target.hit_points.set_max_hit_points(1000)
+        target.hit_points.set_hit_points(1000)
+        world.regions.handle(target)
+        targets.append(target)
+
+    return targets
+
+
+def test_hit_table_rows():
+    table = HitTable()
+    assert not table
+
+    table.add("a", 5)
+    table.add("b", 7, aoe=2)
+
+    assert len(table) == 2
+    assert list(table) == [("a", 5), ("b", 7)]
+    assert list(table.aoe) == [0, 2]
+    assert table.get_total_damage() == 12
+
+
+@pytest.mark.anyio
+async def test_handle_aoe_pushes_hits_once(world, send_to_regions):
+    source = MockCharacter("0-source", world, "source", 10, 10)
+    world.regions.handle(source)
+    targets = create_targets(world, 3)
+
+    send_to_regions.reset_mock()
+    source.handle_aoe(30, None, 3)
+
+    # The first push carries every hit, anything after it is sent by the targets being hit.
+    packets = send_to_regions.call_args_list[0].args[0]
+    hits = [call.args[0] for call in send_to_regions.call_args_list if isinstance(call.args[0], list)]
+
+    assert hits == [packets]
+
+    assert [packet.data.target for packet in packets] == [target.instance for target in targets]
+    assert [packet.data.hit.aoe for packet in packets] == [1, 2, 3]
+    assert [target.hit_points.get_hit_points() for target in targets] == [1000 - 30 // 1, 1000 - 30 // 2, 1000 - 30 // 3]
+
+
+@pytest.mark.anyio
+async def test_handle_aoe_sends_every_hit_before_applying_them(world, send_to_regions, monkeypatch):
+    source = MockCharacter("0-source", world, "source", 10, 10)
+    world.regions.handle(source)
+    targets = create_targets(world, 3)
+
+    events = []
+    send_to_regions.side_effect = lambda packet, *args: events.append("send")
+    monkeypatch.setattr(MockCharacter, "hit", lambda self, damage, attacker=None: events.append(self.instance))
+
+    source.handle_aoe(30, None, 3)
+
+    assert events == ["send"] + [target.instance for target in targets]
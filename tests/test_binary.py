@@ -0,0 +1,140 @@
+import asyncio
+import json
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from network import binary
+from network import opcodes as Opcodes
+from network.connection import Connection
+from network.impl.movement import MovementPacket, MovementPacketData
+from network.modules import Hits, Orientation
+from network.packet import PacketFragment
+
+
+def movement(instance="0-12345", x=120, y=340):
+    return MovementPacket(Opcodes.Movement.Step, MovementPacketData(
+        instance=instance, x=x, y=y, orientation=Orientation.Left, movement_speed=220
+    ))
+
+
+@pytest.mark.parametrize("value", [
+    None, True, False, 0, 127, 128, 300, 2 ** 40, -1, -128, -2 ** 40, 1.5, -0.25,
+    "", "hello", "héllo wörld ✓", b"", b"\x00\xff", [], [1, [2, [3]]], {}, {"instance": "1-2", "unknownKey": [None, True]},
+])
+def test_round_trip(value):
+    assert binary.decode(binary.encode(value)) == value
+
+
+def test_enums_are_encoded_as_their_values():
+    assert binary.decode(binary.encode([Hits.Critical, Orientation.Left])) == [Hits.Critical.value, Orientation.Left.value]
+
+
+def test_small_integers_use_one_byte():
+    assert binary.encode(5) == bytes([binary.SMALL_INTEGER | 5])
+
+
+def test_known_keys_are_sent_as_indices():
+    index = binary.KEYS.index("instance")
+
+    assert binary.encode({"instance": 1}) == bytes([binary.OBJECT, 1, (index << 1) | 1, binary.SMALL_INTEGER | 1])
+    assert binary.encode({"zz": 1}) == bytes([binary.OBJECT, 1, 2 << 1]) + b"zz" + bytes([binary.SMALL_INTEGER | 1])
+
+
+def test_keys_are_converted_like_json():
+    value = {1: "a", None: "b", True: "c"}
+
+    assert binary.decode(binary.encode(value)) == json.loads(json.dumps(value))
+
+
+def test_key_table_has_no_duplicates():
+    assert len(set(binary.KEYS)) == len(binary.KEYS)
+
+
+@pytest.mark.parametrize("data", [b"", bytes([binary.STRING, 5]) + b"ab", bytes([0x7F]), bytes([binary.NULL, binary.NULL])])
+def test_malformed_data_raises_value_error(data):
+    with pytest.raises(ValueError):
+        binary.decode(data)
+
+
+@pytest.mark.parametrize("tag", [binary.ARRAY, binary.OBJECT])
+def test_deeply_nested_data_raises_value_error(tag):
+    nested = bytes([tag, 1] if tag == binary.ARRAY else [tag, 1, 1]) * 100_000 + bytes([binary.NULL])
+
+    with pytest.raises(ValueError):
+        binary.decode(nested)
+
+
+def test_nesting_up_to_the_limit_is_decoded():
+    value = None
+
+    for _ in range(binary.MAX_DEPTH):
+        value = [value]
+
+    assert binary.decode(binary.encode(value)) == value
+
+
+def test_unencodable_values_raise_type_error():
+    with pytest.raises(TypeError):
+        binary.encode(object())
+
+
+def test_fragment_encodings_match():
+    packet = movement()
+    fragment = packet.encode()
+
+    assert json.loads(fragment.payload) == packet.serialize()
+    assert binary.decode(fragment.binary) == packet.serialize()
+    assert fragment.get_size(True) < fragment.get_size(False)
+
+
+def test_lazy_fragment_is_serialized_once(monkeypatch):
+    packet = movement()
+    fragment = packet.encode()
+    calls = []
+
+    serialize = type(packet).serialize
+    monkeypatch.setattr(type(packet), "serialize", lambda self: calls.append(self) or serialize(self))
+
+    assert fragment.binary
+    assert fragment.payload
+
+    assert len(calls) == 1
+    assert fragment.packet is None
+
+
+def test_binary_frame_is_smaller_than_json():
+    fragments = [movement(f"0-{index}", index, index * 2).encode() for index in range(50)]
+
+    text = PacketFragment.join(fragments)
+    frame = PacketFragment.join_binary(fragments)
+
+    assert binary.decode(frame) == json.loads(text)
+    assert len(frame) < len(text.encode("utf-8")) / 2
+
+
+@pytest.mark.anyio
+async def test_binary_connection_sends_bytes():
+    socket = MagicMock()
+    socket.client = MagicMock(host="127.0.0.1")
+    socket.send_text = AsyncMock()
+    socket.send_bytes = AsyncMock()
+
+    connection = Connection("1-1", socket)
+    connection.binary = True
+
+    fragments = [movement().encode()]
+    connection.queue_fragments(fragments)
+    await asyncio.sleep(0.01)
+
+    await connection.send([[1, {"instance": "1-1"}]])
+
+    socket.send_text.assert_not_called()
+
+    frame, message = (call.args[0] for call in socket.send_bytes.call_args_list)
+    assert binary.decode(frame) == [fragments[0].serialized]
+    assert binary.decode(message) == [[1, {"instance": "1-1"}]]
+    assert connection.outbound_size == 0
+
+    assert connection.decode(message) == [[1, {"instance": "1-1"}]]
+    assert connection.decode('[1, {"instance": "1-1"}]') == [1, {"instance": "1-1"}]
+
+    await connection.handle_close("test")
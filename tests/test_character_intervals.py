@@ -1,6 +1,5 @@
 import pytest
 import asyncio
-from unittest.mock import MagicMock
 from game.entity.character.character import Character
 from network.modules import Effects
 
@@ -8,12 +7,8 @@ class MockCharacter(Character):
     def serialize(self):
         return super().serialize()
 
-@pytest.fixture
-def mock_world():
-    return MagicMock()
-
 @pytest.mark.anyio
-async def test_character_intervals_start_and_stop(mock_world):
+async def test_character_intervals_start_and_stop(world):
     # Mock Constants to have very short intervals for testing
     from network.modules import Constants
     original_heal_rate = Constants.HEAL_RATE
@@ -21,42 +16,55 @@ async def test_character_intervals_start_and_stop(mock_world):
     Constants.HEAL_RATE = 10  # 10ms
     Constants.EFFECT_RATE = 10 # 10ms
     
-    char = MockCharacter("0-instance_1", mock_world, "char_1", 10, 10)
+    char = MockCharacter("0-instance_1", world, "char_1", 10, 10)
     
     # Give it some time to run
     await asyncio.sleep(0.05)
     
-    # We can't easily spy on methods that were already captured in create_task
-    # unless we replace them before __init__ or use a different approach.
-    # Since we already ran, let's just check that tasks are running.
-    assert char.healing_task is not None
-    assert not char.healing_task.done()
-    assert char.effect_task is not None
-    assert not char.effect_task.done()
+    assert char.healing_interval is not None
+    assert char.healing_interval.is_active()
+    assert char.effect_interval is not None
+    assert char.effect_interval.is_active()
+
+    # Both callbacks share a single sweep task for the 10ms interval.
+    assert list(world.scheduler.buckets) == [10]
+    assert not world.scheduler.buckets[10].task.done()
     
     # Stop intervals
     char.stop()
     
-    assert char.healing_task is None
-    assert char.effect_task is None
+    assert char.healing_interval is None
+    assert char.effect_interval is None
+    assert not world.scheduler.buckets[10].intervals
     
     # Restore Constants
     Constants.HEAL_RATE = original_heal_rate
     Constants.EFFECT_RATE = original_effect_rate
 
 @pytest.mark.anyio
-async def test_character_poison_interval(mock_world):
+async def test_character_poison_interval(world):
     from network.modules import Constants, PoisonTypes
-    char = MockCharacter("0-instance_1", mock_world, "char_1", 10, 10)
+    char = MockCharacter("0-instance_1", world, "char_1", 10, 10)
     
     # Set poison
     char.set_poison(PoisonTypes.Venom)
     
-    assert char.poison_task is not None
-    assert not char.poison_task.done()
+    assert char.poison_interval is not None
+    assert char.poison_interval.is_active()
     
     # Remove poison
     char.set_poison(None)
-    assert char.poison_task is None
+    assert char.poison_interval is None
     
     char.stop()
+
+@pytest.mark.anyio
+async def test_characters_share_interval_buckets(world):
+    characters = [MockCharacter(f"0-instance_{i}", world, "char", 10, 10) for i in range(50)]
+
+    # One bucket (and one task) per distinct interval rather than two tasks per character.
+    assert len(world.scheduler.buckets) == 2
+    assert all(len(bucket.intervals) == 50 for bucket in world.scheduler.buckets.values())
+
+    for character in characters:
+        character.stop()
@@ -0,0 +1,52 @@
+import pytest
+from game.entity.character.character import Character
+from game.entity.character.combat.hit import Hit
+from game.entity.character.effect.poison import Poison
+from network.modules import Effects, Hits, PoisonTypes
+
+
+class SlottedCharacter(Character):
+    __slots__ = ()
+
+    def serialize(self):
+        return super().serialize()
+
+
+@pytest.mark.anyio
+async def test_character_has_no_instance_dict(world):
+    character = SlottedCharacter("3-1", world, "rat", 10, 10)
+
+    for value in (character, character.hit_points, character.status, Hit(Hits.Normal, 5), Poison(PoisonTypes.Venom)):
+        assert not hasattr(value, "__dict__")
+
+
+@pytest.mark.anyio
+async def test_containers_are_allocated_on_first_use(world):
+    character = SlottedCharacter("3-1", world, "rat", 10, 10)
+    attacker = SlottedCharacter("3-2", world, "rat", 11, 10)
+
+    # Read-only queries do not allocate anything.
+    assert character.get_attacker_count() == 0
+    assert not character.has_attacker(attacker)
+    assert character.in_combat() is False
+    assert character.find_nearest_target() is None
+    assert character.get_random_attacker() is None
+    assert not character.status.has_timeout(Effects.Stun)
+    assert character.status.serialize() == {}
+
+    assert character._attackers is None
+    assert character._damage_table is None
+    assert character._recent_regions is None
+    assert character.status._effects is None
+    assert character.status._durations is None
+
+    character.add_attacker(attacker)
+    character.add_to_damage_table(attacker, 5)
+
+    assert character.attackers == [attacker]
+    assert character.in_combat() is True
+    assert character.damage_table == {attacker.instance: 5}
+    assert character.recent_regions == []
+
+    character.clear_attackers()
+    assert character.get_attacker_count() == 0
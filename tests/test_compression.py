@@ -0,0 +1,165 @@
+import asyncio
+import json
+import random
+import zlib
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from common.config import config
+from network import binary, compression
+from network.connection import Connection
+from network.impl.map import MapPacket
+from network.impl.store import SerializedStoreItem, StorePacket, StorePacketData
+from network.opcodes import Store as StoreOpcode
+from network.packet import PacketFragment
+
+
+def store_batch(count=20):
+    items = [SerializedStoreItem(key=f"item{index}", name=f"Item {index}", count=index, price=index * 10, index=index)
+             for index in range(count)]
+
+    return StorePacket(StoreOpcode.Update, StorePacketData(key="generalstore", currency="coins", items=items))
+
+
+def create_connection():
+    socket = MagicMock()
+    socket.client = MagicMock(host="127.0.0.1")
+    socket.send_text = AsyncMock()
+    socket.send_bytes = AsyncMock()
+
+    return Connection("1-1", socket), socket
+
+
+def map_region():
+    tiles = random.Random(1)
+    return {"region": 5, "data": [[tiles.randrange(4000), tiles.randrange(4000)] for _ in range(2000)]}
+
+
+def test_round_trip():
+    data = json.dumps(store_batch().serialize()).encode("utf-8")
+    compressed = compression.compress(data)
+
+    assert compression.is_compressed(compressed)
+    assert compression.decompress(compressed, config.max_message_size) == data
+
+
+def test_preset_dictionary_improves_compression():
+    data = json.dumps(store_batch(5).serialize()).encode("utf-8")
+
+    assert len(compression.compress(data)) < len(zlib.compress(data, compression.LEVEL))
+
+
+def test_binary_protocol_frames_are_not_compressed_frames():
+    assert not compression.is_compressed(binary.encode([[1, {"instance": "1-1"}]]))
+    assert not compression.is_compressed(b"")
+
+
+def test_malformed_data_raises_value_error():
+    with pytest.raises(ValueError):
+        compression.decompress(b"\x78\x00garbage", 1024)
+
+    with pytest.raises(ValueError):
+        compression.decompress(compression.compress(b"[1,2,3]" * 10)[:-4], 1024)
+
+
+def test_oversized_data_raises_value_error():
+    # A few kilobytes that inflate to 64 MB.
+    bomb = compression.compress(b"\x00" * (64 * 1024 * 1024))
+
+    assert len(bomb) < 100 * 1024
+
+    with pytest.raises(ValueError):
+        compression.decompress(bomb, 64 * 1024)
+
+    data = b"[1,2,3]" * 10
+    assert compression.decompress(compression.compress(data), len(data)) == data
+
+
+@pytest.mark.anyio
+async def test_frames_over_threshold_are_compressed(monkeypatch):
+    monkeypatch.setattr(config, "compression_threshold", 256)
+
+    connection, socket = create_connection()
+    connection.compression = True
+
+    small = [PacketFragment.join([store_batch(0).encode()])]
+    large = [store_batch(20).encode()]
+
+    connection.queue_fragments([store_batch(0).encode()])
+    await asyncio.sleep(0.01)
+
+    connection.queue_fragments(large)
+    await asyncio.sleep(0.01)
+
+    socket.send_text.assert_called_once_with(small[0])
+
+    frame = socket.send_bytes.call_args.args[0]
+    assert json.loads(compression.decompress(frame, config.max_message_size)) == [large[0].serialized]
+
+    await connection.handle_close("test")
+
+
+@pytest.mark.anyio
+async def test_frames_are_not_compressed_without_negotiation(monkeypatch):
+    monkeypatch.setattr(config, "compression_threshold", 0)
+
+    connection, socket = create_connection()
+
+    await connection.send([store_batch().serialize()])
+
+    socket.send_bytes.assert_not_called()
+    socket.send_text.assert_called_once()
+
+    await connection.handle_close("test")
+
+
+@pytest.mark.anyio
+async def test_compressed_binary_frames_are_decoded(monkeypatch):
+    monkeypatch.setattr(config, "compression_threshold", 0)
+
+    connection, socket = create_connection()
+    connection.binary = True
+    connection.compression = True
+
+    message = [[1, {"instance": "1-1"}]]
+    await connection.send(message)
+
+    frame = socket.send_bytes.call_args.args[0]
+
+    assert compression.is_compressed(frame)
+    assert connection.decode(frame) == message
+
+    connection.binary = False
+    assert connection.decode(compression.compress(b'[2, {"opcode": 2}]')) == [2, {"opcode": 2}]
+
+    await connection.handle_close("test")
+
+
+def test_encodings_must_be_negotiated():
+    connection, _ = create_connection()
+
+    with pytest.raises(ValueError):
+        connection.decode(compression.compress(b'[2, {"opcode": 2}]'))
+
+    with pytest.raises(ValueError):
+        connection.decode(binary.encode([2, {"opcode": 2}]))
+
+    connection.compression = True
+
+    with pytest.raises(ValueError):
+        connection.decode(compression.compress(b" " * (config.max_message_size + 1)))
+
+
+def test_map_data_has_no_base64_overhead_once_negotiated():
+    packet = MapPacket(map_region())
+    fragment = packet.encode()
+    gzipped = packet.data.data
+
+    # JSON clients receive the data base64 encoded, binary clients receive the gzipped bytes.
+    assert json.loads(fragment.payload) == packet.serialize()
+    assert binary.decode(fragment.binary) == [packet.id.value, gzipped, packet.buffer_size]
+    assert fragment.get_size(False) > len(gzipped) * 4 / 3
+    assert fragment.get_size(True) < len(gzipped) + 16
+
+    # Compressing the JSON frame wins back the base64 overhead.
+    frame = PacketFragment.join([fragment]).encode("utf-8")
+    assert len(compression.compress(frame)) < len(gzipped) * 1.05
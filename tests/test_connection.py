@@ -0,0 +1,283 @@
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from common.config import config
+from network.connection import Connection
+from network.packet import PacketFragment
+from network.packets import Packets
+
+
+class SlowSocket:
+    """
+    Socket whose writes only complete once the gate is opened.
+    """
+
+    def __init__(self):
+        self.client = MagicMock(host="127.0.0.1")
+        self.gate = asyncio.Event()
+        self.sent = []
+        self.close = AsyncMock()
+
+    async def send_text(self, message):
+        await self.gate.wait()
+        self.sent.append(message)
+
+
+def fragment(payload, coalescable=False, key=None):
+    return PacketFragment(Packets.Points, None, payload, coalescable, key)
+
+
+@pytest.fixture
+def watermarks(monkeypatch):
+    monkeypatch.setattr(config, "outbound_high_watermark", 10)
+    monkeypatch.setattr(config, "outbound_low_watermark", 4)
+    monkeypatch.setattr(config, "outbound_max_buffer", 30)
+
+
+async def create_connection():
+    socket = SlowSocket()
+    connection = Connection("1-1", socket)
+    return connection, socket
+
+
+@pytest.mark.anyio
+async def test_fragments_queued_while_writing_are_coalesced():
+    connection, socket = await create_connection()
+
+    connection.queue_fragments([fragment("1")])
+    await asyncio.sleep(0)
+
+    # The first frame is being written, these are buffered for the next one.
+    connection.queue_fragments([fragment("2")])
+    connection.queue_fragments([fragment("3"), fragment("4")])
+
+    socket.gate.set()
+    await asyncio.sleep(0.01)
+
+    assert socket.sent == ["[1]", "[2,3,4]"]
+    assert connection.writer_task is None
+    assert connection.outbound_size == 0
+
+    await connection.handle_close("test")
+
+
+@pytest.mark.anyio
+async def test_slow_consumer_drops_coalescable_fragments(watermarks, monkeypatch):
+    monkeypatch.setattr(config, "slow_consumer_policy", "drop")
+    connection, socket = await create_connection()
+
+    connection.queue_fragments([fragment("11111")])
+    await asyncio.sleep(0)
+
+    connection.queue_fragments([fragment("22", True), fragment("333")])
+    assert not connection.congested
+
+    # Going over the high watermark discards the buffered and incoming stale updates.
+    connection.queue_fragments([fragment("44", True), fragment("5")])
+    assert connection.congested
+    assert [f.payload for f in connection.outbound] == ["333", "5"]
+
+    connection.queue_fragments([fragment("66", True)])
+    assert [f.payload for f in connection.outbound] == ["333", "5"]
+
+    socket.gate.set()
+    await asyncio.sleep(0.01)
+
+    assert socket.sent == ["[11111]", "[333,5]"]
+    assert not connection.congested
+    assert not connection.closed
+
+    await connection.handle_close("test")
+
+
+@pytest.mark.anyio
+async def test_slow_consumer_receives_the_latest_state(watermarks, monkeypatch):
+    monkeypatch.setattr(config, "slow_consumer_policy", "drop")
+    connection, socket = await create_connection()
+
+    connection.queue_fragments([fragment("11111")])
+    await asyncio.sleep(0)
+
+    connection.queue_fragments([fragment("22", True, "a"), fragment("333")])
+    connection.queue_fragments([fragment("44", True, "b"), fragment("5")])
+    assert connection.congested
+
+    # Only the latest update of each state is held back while congested.
+    connection.queue_fragments([fragment("66", True, "a")])
+    assert [f.payload for f in connection.outbound] == ["333", "5"]
+    assert [f.payload for f in connection.held.values()] == ["44", "66"]
+
+    socket.gate.set()
+    await asyncio.sleep(0.01)
+
+    assert socket.sent == ["[11111]", "[333,5,44,66]"]
+    assert connection.held == {}
+    assert not connection.congested
+
+    await connection.handle_close("test")
+
+
+@pytest.mark.anyio
+async def test_slow_consumer_is_disconnected(watermarks, monkeypatch):
+    monkeypatch.setattr(config, "slow_consumer_policy", "disconnect")
+    connection, socket = await create_connection()
+    connection.on_close(MagicMock())
+
+    connection.queue_fragments([fragment("111111")])
+    await asyncio.sleep(0)
+    connection.queue_fragments([fragment("22222")])
+    await asyncio.sleep(0.01)
+
+    assert connection.closed
+    assert connection.outbound == []
+    socket.close.assert_awaited_once()
+    connection.close_callback.assert_called_once()
+
+    # Nothing else is buffered for a closed connection.
+    connection.queue_fragments([fragment("3")])
+    assert connection.outbound == []
+
+
+@pytest.mark.anyio
+async def test_buffer_over_limit_disconnects_with_drop_policy(watermarks, monkeypatch):
+    monkeypatch.setattr(config, "slow_consumer_policy", "drop")
+    connection, socket = await create_connection()
+
+    connection.queue_fragments([fragment("1" * 12)])
+    await asyncio.sleep(0)
+    connection.queue_fragments([fragment("2" * 20)])
+    await asyncio.sleep(0.01)
+
+    assert connection.closed
+    socket.close.assert_awaited_once()
+
+
+async def create_receiving_connection():
+    connection, socket = await create_connection()
+    received = []
+
+    async def on_message(message):
+        received.append(message)
+
+    connection.on_message(on_message)
+
+    return connection, socket, received
+
+
+@pytest.mark.anyio
+async def test_batched_frame_is_dispatched_in_order(monkeypatch):
+    monkeypatch.setattr(config, "message_limit", 10)
+
+    connection, _socket, received = await create_receiving_connection()
+
+    await connection.handle_frame('[[11, {"opcode": 0}], [11, {"opcode": 1}], [9, {}]]')
+    await connection.handle_frame('[2, {"opcode": 2}]')
+
+    assert received == [[11, {"opcode": 0}], [11, {"opcode": 1}], [9, {}], [2, {"opcode": 2}]]
+    assert connection.tokens == pytest.approx(6, abs=0.5)
+
+    await connection.handle_close("test")
+
+
+@pytest.mark.anyio
+async def test_rate_limit_counts_every_packet_in_a_batch(monkeypatch):
+    monkeypatch.setattr(config, "message_limit", 5)
+
+    connection, socket, received = await create_receiving_connection()
+
+    await connection.handle_frame('[[11, {}], [11, {}], [11, {}]]')
+    assert len(received) == 3
+
+    # Going over the limit rejects the client before any packet of the batch is dispatched.
+    await connection.handle_frame('[[11, {}], [11, {}], [9, {}]]')
+
+    assert len(received) == 3
+    assert connection.closed
+    socket.close.assert_awaited_once()
+
+    await connection.handle_close("test")
+
+
+@pytest.mark.anyio
+async def test_duplicate_and_malformed_frames_are_skipped():
+    connection, _socket, received = await create_receiving_connection()
+
+    await connection.handle_frame('[[11, {}], [9, {}]]')
+    await connection.handle_frame('[[11, {}], [9, {}]]')
+    await connection.handle_frame('[11, {')
+
+    assert received == [[11, {}], [9, {}]]
+
+    await connection.handle_close("test")
+
+
+@pytest.mark.anyio
+async def test_token_bucket_refills_over_time(monkeypatch):
+    monkeypatch.setattr(config, "message_limit", 10)
+
+    connection, _socket = await create_connection()
+    connection.last_refill = 100.0
+
+    assert connection.consume(10, now=100.0)
+    assert not connection.consume(1, now=100.0)
+
+    # Half a second refills half of the bucket.
+    assert connection.consume(5, now=100.5)
+    assert not connection.consume(1, now=100.5)
+
+    # The bucket never holds more than the limit.
+    assert not connection.consume(11, now=1000.0)
+    assert connection.tokens == 10
+
+    await connection.handle_close("test")
+
+
+@pytest.mark.anyio
+async def test_no_background_tasks_per_connection():
+    tasks = len(asyncio.all_tasks())
+    connection, _socket, _received = await create_receiving_connection()
+
+    await connection.handle_frame('[11, {}]')
+
+    assert len(asyncio.all_tasks()) == tasks
+
+    await connection.handle_close("test")
+
+
+def test_unpack():
+    assert Connection.unpack([2, {"opcode": 2}]) == [[2, {"opcode": 2}]]
+    assert Connection.unpack([[2, {}], [3, {}]]) == [[2, {}], [3, {}]]
+    assert Connection.unpack([]) == [[]]
+    assert Connection.unpack({"opcode": 2}) == [{"opcode": 2}]
+
+
+@pytest.mark.anyio
+async def test_duplicates_are_detected_within_the_history():
+    connection, _socket = await create_connection()
+
+    for index in range(connection.message_history):
+        assert not connection.is_duplicate(f"[11, {index}]", now=10.0)
+
+    # Every message in the ring is remembered, not only the last one.
+    assert connection.is_duplicate("[11, 0]", now=10.05)
+    assert connection.is_duplicate("[11, 3]", now=10.05)
+    assert connection.duplicates == 2
+
+    # A new message overwrites the oldest entry of the ring.
+    assert not connection.is_duplicate("[11, 99]", now=10.05)
+    assert not connection.is_duplicate("[11, 0]", now=10.05)
+
+    await connection.handle_close("test")
+
+
+@pytest.mark.anyio
+async def test_duplicates_are_allowed_after_the_difference():
+    connection, _socket = await create_connection()
+
+    assert not connection.is_duplicate("[11, 1]", now=10.0)
+    assert connection.is_duplicate("[11, 1]", now=10.099)
+    assert not connection.is_duplicate("[11, 1]", now=10.1)
+
+    assert connection.duplicates == 1
+
+    await connection.handle_close("test")
@@ -1,8 +1,10 @@
 import pytest
+from unittest.mock import MagicMock
 from common.utils import Utils
+from game.entity.character.effect.status import Status
 from game.info.formulas import Formulas
 from game.info.loader import Loader
-from network.modules import Constants
+from network.modules import Constants, Effects
 
 class TestFormulas:
     @pytest.fixture(autouse=True)
@@ -37,6 +39,58 @@ class TestFormulas:
         assert Formulas.prev_exp(83) == 83
         assert Formulas.prev_exp(82) == 0
 
+    def test_bisection_matches_linear_scan(self):
+        def exp_to_level(experience):
+            if experience < 0:
+                return -1
+            for i in range(1, len(Formulas.LEVEL_EXP)):
+                if experience < Formulas.LEVEL_EXP[i]:
+                    return i
+            return Constants.MAX_LEVEL
+
+        def next_exp(experience):
+            if experience < 0:
+                return -1
+            for i in range(1, len(Formulas.LEVEL_EXP)):
+                if experience < Formulas.LEVEL_EXP[i]:
+                    return Formulas.LEVEL_EXP[i]
+            return -1
+
+        def prev_exp(experience):
+            if experience < 0:
+                return 0
+            for i in range(Constants.MAX_LEVEL, 0, -1):
+                if i < len(Formulas.LEVEL_EXP) and experience >= Formulas.LEVEL_EXP[i]:
+                    return Formulas.LEVEL_EXP[i]
+            return 0
+
+        samples = [-5, -1, 0, 1, 82, 83, 84, Formulas.LEVEL_EXP[-1] - 1, Formulas.LEVEL_EXP[-1],
+                   Formulas.LEVEL_EXP[-1] + 1]
+        for level_exp in Formulas.LEVEL_EXP:
+            samples.extend((level_exp - 1, level_exp, level_exp + 1))
+
+        for experience in samples:
+            assert Formulas.exp_to_level(experience) == exp_to_level(experience)
+            assert Formulas.next_exp(experience) == next_exp(experience)
+            assert Formulas.prev_exp(experience) == prev_exp(experience)
+
+        assert Formulas.exp_to_levels(samples) == [exp_to_level(experience) for experience in samples]
+
+    def test_max_damage_effects(self):
+        character = MagicMock()
+        character.get_damage_bonus.return_value = 10
+        character.get_skill_damage_level.return_value = 10
+        character.is_player.return_value = False
+        character.status = Status(MagicMock())
+
+        assert Formulas.get_max_damage(character) == 25
+
+        character.status.add(Effects.StrengthBuff)
+        assert Formulas.get_max_damage(character) == pytest.approx(25 * 1.1)
+
+        character.status.add(Effects.StrengthSuperBuff)
+        assert Formulas.get_max_damage(character) == pytest.approx(25 * 1.1 * 1.15)
+
     def test_get_max_hit_points(self):
         assert Formulas.get_max_hit_points(1) == 39 + 30
         assert Formulas.get_max_hit_points(10) == 39 + 300
@@ -0,0 +1,134 @@
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from pydantic import ValidationError
+from common.config import config
+from game.entity.character.player.incoming import Incoming
+from network.impl.handshake import ClientHandshakePacketData
+from network.impl.login import LoginPacketData
+from network.metrics import PacketMetrics
+from network.opcodes import Login
+from network.packet_view import PacketView
+from network.packets import Packets
+
+
+@pytest.fixture
+def incoming():
+    player = MagicMock()
+    player.instance = "1-1"
+    player.connection.send = AsyncMock()
+    player.connection.reject = AsyncMock()
+    player.connection.binary = False
+    player.world.network_manager.packet_metrics = PacketMetrics()
+
+    return Incoming(player)
+
+
+def test_view_validates_fields_on_access():
+    view = PacketView(LoginPacketData, {"opcode": 2, "username": "Tester", "unknown": [1, 2]})
+
+    assert view.opcode is Login.Guest
+    assert view.username == "Tester"
+    assert view.password is None
+    assert set(view.values) == {"opcode", "username", "password"}
+
+
+def test_view_uses_aliases():
+    view = PacketView(ClientHandshakePacketData, {"type": "client", "gVer": "1.0", "serverId": "2"})
+
+    assert view.g_ver == "1.0"
+    assert view.server_id == 2
+
+
+def test_view_raises_for_invalid_and_missing_fields():
+    view = PacketView(LoginPacketData, {"username": 5})
+
+    with pytest.raises(ValidationError):
+        view.opcode
+
+    with pytest.raises(ValidationError):
+        view.username
+
+    with pytest.raises(AttributeError):
+        view.not_a_field
+
+
+def test_view_of_non_dict_data():
+    view = PacketView(LoginPacketData, None)
+
+    assert view.email is None
+    assert view.get("opcode") is None
+
+
+@pytest.mark.anyio
+async def test_handshake_completes(incoming, monkeypatch):
+    monkeypatch.setattr(config, "binary_protocol", True)
+
+    await incoming.handle_message([Packets.Handshake, {"type": "client", "gVer": config.gver, "encoding": "binary"}])
+
+    assert incoming.completed_handshake
+    assert incoming.connection.binary is True
+
+    (reply,), _ = incoming.connection.send.call_args
+    assert reply[0][1]["encoding"] == "binary"
+
+
+@pytest.mark.anyio
+async def test_unsupported_encoding_falls_back_to_json(incoming):
+    await incoming.handle_message([Packets.Handshake, {"type": "client", "gVer": config.gver, "encoding": "msgpack"}])
+
+    assert incoming.completed_handshake
+    assert incoming.connection.binary is False
+
+
+@pytest.mark.anyio
+async def test_version_mismatch_is_rejected(incoming):
+    await incoming.handle_message([Packets.Handshake, {"type": "client", "gVer": "0.0.0"}])
+
+    assert not incoming.completed_handshake
+    incoming.connection.reject.assert_awaited_once_with("updated")
+
+
+@pytest.mark.anyio
+async def test_packets_before_handshake_are_rejected(incoming):
+    await incoming.handle_message([Packets.Login, {"opcode": Login.Guest}])
+
+    incoming.connection.reject.assert_awaited_once_with("lost")
+    assert incoming.world.network_manager.packet_metrics.counts == {}
+
+
+@pytest.mark.anyio
+async def test_metrics_are_recorded_per_packet_and_opcode(incoming):
+    metrics = incoming.world.network_manager.packet_metrics
+
+    await incoming.handle_message([Packets.Handshake, {"type": "client", "gVer": config.gver}])
+    await incoming.handle_message([Packets.Ready, {"regionsLoaded": 3}])
+    await incoming.handle_message([Packets.Ready, {"regionsLoaded": 4}])
+    await incoming.handle_message([Packets.Login, {"opcode": Login.Login, "username": "Tester"}])
+
+    assert metrics.counts == {
+        (Packets.Handshake, None): 1,
+        (Packets.Ready, None): 2,
+        (Packets.Login, Login.Login): 1
+    }
+    assert metrics.get_average_time(Packets.Ready) >= 0
+    assert "errors: 0" in metrics.summary()
+
+
+@pytest.mark.anyio
+async def test_unknown_and_failing_packets_are_counted(incoming):
+    metrics = incoming.world.network_manager.packet_metrics
+    incoming.completed_handshake = True
+
+    await incoming.handle_message([9999, {}])
+    await incoming.handle_message([[1], {}])
+    await incoming.handle_message([Packets.Login, {"opcode": 99}])
+
+    assert metrics.unknown == 2
+    assert metrics.errors == 1
+
+
+def test_opcodes_are_bounded():
+    assert Incoming.get_opcode({"opcode": 3}) == 3
+    assert Incoming.get_opcode({"opcode": 10 ** 6}) is None
+    assert Incoming.get_opcode({"opcode": "3"}) is None
+    assert Incoming.get_opcode([3]) is None
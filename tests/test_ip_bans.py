@@ -0,0 +1,141 @@
+import asyncio
+import pytest
+from database.ip_bans import IPBans
+
+
+class Cursor:
+    def __init__(self, documents):
+        self.documents = documents
+
+    async def to_list(self, length=None):
+        return list(self.documents)
+
+
+class ChangeStream:
+    """
+    Yields a change whenever one is pushed, like a Motor change stream.
+    """
+
+    def __init__(self):
+        self.changes = asyncio.Queue()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        return False
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        return await self.changes.get()
+
+
+class Collection:
+    """
+    Stand-in for the `ipbans` collection, supporting the calls `IPBans` makes.
+    """
+
+    def __init__(self, documents=None, change_streams=True):
+        self.documents = documents or []
+        self.queries = 0
+        self.stream = ChangeStream() if change_streams else None
+
+    def find(self, query, projection=None):
+        self.queries += 1
+        return Cursor({"ip": document["ip"]} for document in self.documents)
+
+    def insert_one(self, document):
+        self.documents.append(document)
+
+        if self.stream:
+            self.stream.changes.put_nowait({"operationType": "insert"})
+
+    def watch(self):
+        if not self.stream:
+            raise RuntimeError("The $changeStream stage is only supported on replica sets")
+
+        return self.stream
+
+
+def test_single_addresses():
+    bans = IPBans()
+    bans.load([{"ip": "1.2.3.4"}, {"ip": "2001:db8::1"}, {"ip": "10.0.0.1/32"}])
+
+    assert bans.is_banned("1.2.3.4")
+    assert bans.is_banned("2001:db8::1")
+    assert bans.is_banned("10.0.0.1")
+    assert not bans.is_banned("1.2.3.5")
+    assert bans.networks == {}
+
+
+def test_ranges():
+    bans = IPBans()
+    bans.load([{"ip": "192.168.0.0/16"}, {"ip": "10.1.2.0/24"}, {"ip": "2001:db8::/32"}])
+
+    assert bans.is_banned("192.168.40.3")
+    assert bans.is_banned("10.1.2.255")
+    assert not bans.is_banned("10.1.3.0")
+    assert bans.is_banned("2001:db8:ffff::1")
+    assert not bans.is_banned("2001:db9::1")
+
+
+def test_ipv4_mapped_addresses():
+    bans = IPBans()
+    bans.load([{"ip": "1.2.3.4"}, {"ip": "10.0.0.0/8"}])
+
+    assert bans.is_banned("::ffff:1.2.3.4")
+    assert bans.is_banned("::ffff:10.20.30.40")
+
+
+def test_invalid_entries_are_skipped():
+    bans = IPBans()
+    bans.load([{"ip": "not an ip"}, {"ip": "1.2.3.0/99"}, {"ip": None}, {}, {"ip": "1.2.3.4"}])
+
+    assert bans.addresses == {"1.2.3.4"}
+    assert not bans.is_banned("unknown")
+
+
+def test_load_replaces_bans():
+    bans = IPBans()
+    bans.load([{"ip": "1.2.3.4"}, {"ip": "10.0.0.0/8"}])
+    bans.load([{"ip": "5.6.7.8"}])
+
+    assert not bans.is_banned("1.2.3.4")
+    assert not bans.is_banned("10.0.0.1")
+    assert bans.is_banned("5.6.7.8")
+
+
+@pytest.mark.anyio
+async def test_change_stream_refreshes_bans():
+    collection = Collection([{"ip": "1.2.3.4"}])
+    bans = IPBans()
+
+    await bans.refresh(collection)
+    bans.start(collection)
+
+    collection.insert_one({"ip": "5.6.7.0/24"})
+    await asyncio.sleep(0.01)
+
+    assert bans.is_banned("5.6.7.8")
+    assert bans.is_banned("1.2.3.4")
+
+    bans.stop()
+
+
+@pytest.mark.anyio
+async def test_polling_without_change_streams():
+    collection = Collection([{"ip": "1.2.3.4"}], change_streams=False)
+    bans = IPBans(interval=0.01)
+
+    await bans.refresh(collection)
+    bans.start(collection)
+
+    collection.insert_one({"ip": "5.6.7.8"})
+    await asyncio.sleep(0.05)
+
+    assert bans.is_banned("5.6.7.8")
+    assert collection.queries > 1
+
+    bans.stop()
@@ -0,0 +1,92 @@
+import asyncio
+import pytest
+from database.mongodb_loader import Loader, PROJECTIONS
+from database.models.player import PlayerBundle
+
+
+class Collection:
+    def __init__(self, documents, delay):
+        self.documents = documents
+        self.delay = delay
+        self.projections = []
+
+    async def find_one(self, query, projection=None):
+        self.projections.append(projection)
+        await asyncio.sleep(self.delay)
+
+        for document in self.documents:
+            if document["username"] == query["username"]:
+                return {key: value for key, value in document.items() if projection.get(key)}
+
+        return None
+
+
+class Database:
+    """
+    Stand-in for the Motor database, every query taking `delay` seconds.
+    """
+
+    def __init__(self, documents, delay=0.0):
+        self.collections = {}
+        self.documents = documents
+        self.delay = delay
+
+    def __getitem__(self, name):
+        if name not in self.collections:
+            self.collections[name] = Collection(self.documents.get(name, []), self.delay)
+
+        return self.collections[name]
+
+
+DOCUMENTS = {
+    "player_inventory": [{"_id": 1, "username": "Tester", "slots": [], "legacy": True}],
+    "player_skills": [{"_id": 2, "username": "Tester", "skills": [], "cheater": False}],
+    "player_bank": [{"_id": 3, "username": "Tester"}]  # Missing its slots.
+}
+
+
+@pytest.mark.anyio
+async def test_player_collections_are_loaded():
+    bundle = await Loader(Database(DOCUMENTS)).load_player("Tester")
+
+    assert bundle.inventory.username == "Tester"
+    assert bundle.inventory.slots == []
+    assert bundle.skills.cheater is False
+    assert bundle.info is None
+    # Invalid documents are skipped rather than failing the entire load.
+    assert bundle.bank is None
+
+
+@pytest.mark.anyio
+async def test_only_model_fields_are_projected():
+    database = Database(DOCUMENTS)
+    await Loader(database).load_player("Tester")
+
+    projection = database.collections["player_inventory"].projections[0]
+
+    assert projection == PROJECTIONS["player_inventory"]
+    assert projection["_id"] == 0
+    assert "legacy" not in projection
+    assert len(database.collections) == 9
+
+
+@pytest.mark.anyio
+async def test_collections_are_queried_concurrently():
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+
+    await Loader(Database(DOCUMENTS, delay=0.05)).load_player("Tester")
+
+    # Nine sequential queries would take at least 0.45 seconds.
+    assert loop.time() - start < 0.3
+
+
+@pytest.mark.anyio
+async def test_selected_fields_and_missing_database():
+    database = Database(DOCUMENTS)
+    bundle = await Loader(database).load_player("Tester", ["skills"])
+
+    assert set(database.collections) == {"player_skills"}
+    assert bundle.skills is not None
+
+    assert await Loader(None).load_player("Tester") == PlayerBundle()
@@ -0,0 +1,142 @@
+import asyncio
+import json
+import pytest
+from unittest.mock import MagicMock, AsyncMock, patch
+from common.config import config
+from network.metrics import TickMetrics
+from network.network_manager import NetworkManager
+from network.packet import Packet, PacketFragment
+from network.impl.points import PointsPacket, PointsPacketData
+from network.impl.chat import ChatPacket, ChatPacketData
+
+
+@pytest.fixture
+def network_manager():
+    world = MagicMock()
+    world.database = None
+    return NetworkManager(world)
+
+
+def test_broadcast_encodes_once(network_manager):
+    for instance in ("0-1", "0-2", "0-3"):
+        network_manager.create_packet_queue(instance)
+
+    packet = PointsPacket(PointsPacketData(instance="0-1", hit_points=10, max_hit_points=20))
+
+    with patch.object(Packet, "serialize", autospec=True, side_effect=Packet.serialize) as serialize:
+        network_manager.broadcast(packet)
+        fragments = [queue[0] for queue in network_manager.packets.values()]
+        payloads = [fragment.payload for fragment in fragments]
+
+    assert serialize.call_count == 1
+    assert all(fragment is fragments[0] for fragment in fragments)
+    assert json.loads(payloads[0]) == packet.serialize()
+
+
+def test_send_to_players_skips_unknown_instances(network_manager):
+    network_manager.create_packet_queue("0-1")
+
+    network_manager.send_to_players(["0-1", "0-2"], PointsPacket(PointsPacketData(instance="0-1", mana=5)))
+
+    assert len(network_manager.packets["0-1"]) == 1
+    assert "0-2" not in network_manager.packets
+
+
+def test_joined_frame_matches_serialized_queue():
+    packets = [
+        PointsPacket(PointsPacketData(instance="0-1", hit_points=10, max_hit_points=20)),
+        ChatPacket(ChatPacketData(instance="0-1", message="hello", colour="white"))
+    ]
+
+    frame = PacketFragment.join([packet.encode() for packet in packets])
+
+    assert json.loads(frame) == json.loads(json.dumps([packet.serialize() for packet in packets]))
+
+
+@pytest.mark.anyio
+async def test_parse_hands_off_queue_and_clears_it(network_manager):
+    connection = MagicMock()
+    network_manager.socket_handler.get.return_value = connection
+
+    network_manager.create_packet_queue("0-1")
+    network_manager.send("0-1", PointsPacket(PointsPacketData(instance="0-1", mana=5)))
+    fragments = list(network_manager.packets["0-1"])
+
+    await network_manager.parse()
+
+    connection.queue_fragments.assert_called_once_with(fragments)
+    assert len(network_manager.packets["0-1"]) == 0
+
+
+def test_send_group_of_packets(network_manager):
+    network_manager.create_packet_queue("0-1")
+    network_manager.create_packet_queue("0-2")
+
+    packets = [
+        PointsPacket(PointsPacketData(instance="0-1", hit_points=10)),
+        PointsPacket(PointsPacketData(instance="0-2", hit_points=20))
+    ]
+
+    network_manager.send_to_players(["0-1", "0-2"], packets)
+
+    first, second = network_manager.packets["0-1"]
+    assert json.loads(first.payload) == packets[0].serialize()
+    assert json.loads(second.payload) == packets[1].serialize()
+    assert network_manager.packets["0-2"][0] is first
+
+
+def create_slow_connection(instance, delay, active):
+    connection = MagicMock(instance=instance, last_write_duration=0.0)
+
+    async def send_fragments(fragments):
+        active.append(instance)
+        peak = len(active)
+        await asyncio.sleep(delay)
+        active.remove(instance)
+        connection.last_write_duration = delay * 1000
+        connection.peak = peak
+
+    connection.send_fragments = send_fragments
+    return connection
+
+
+@pytest.mark.anyio
+async def test_concurrent_flush_sends_in_bounded_groups(network_manager, monkeypatch):
+    monkeypatch.setattr(config, "flush_mode", "concurrent")
+    monkeypatch.setattr(config, "flush_concurrency", 2)
+
+    active = []
+    connections = {f"0-{index}": create_slow_connection(f"0-{index}", 0.02 + index * 0.01, active) for index in range(4)}
+    network_manager.socket_handler.get.side_effect = connections.get
+
+    for instance in connections:
+        network_manager.create_packet_queue(instance)
+        network_manager.send(instance, PointsPacket(PointsPacketData(instance=instance, mana=5)))
+
+    await network_manager.parse()
+
+    assert all(len(queue) == 0 for queue in network_manager.packets.values())
+    assert max(connection.peak for connection in connections.values()) == 2
+
+    # Two groups of two: (30ms) + (50ms), rather than 20 + 30 + 40 + 50ms serially.
+    assert network_manager.metrics.ticks == 1
+    assert network_manager.metrics.last_flush < 120
+    assert [instance for _, instance in network_manager.metrics.slowest[:2]] == ["0-3", "0-2"]
+
+
+def test_tick_metrics_records_overruns(monkeypatch):
+    monkeypatch.setattr(config, "update_time", 300)
+    metrics = TickMetrics(slowest_count=2)
+
+    metrics.record_flush(100, {"0-1": 10.0, "0-2": 90.0, "0-3": 40.0})
+    metrics.record_flush(500, {})
+
+    assert metrics.ticks == 2
+    assert metrics.overruns == 1
+    assert metrics.max_flush == 500
+    assert metrics.get_average_flush() == 300
+    assert metrics.slowest == []
+
+    metrics.record_flush(50, {"0-1": 10.0, "0-2": 90.0, "0-3": 40.0})
+    assert metrics.slowest == [(90.0, "0-2"), (40.0, "0-3")]
+    assert "0-2 (90.0ms)" in metrics.summary()
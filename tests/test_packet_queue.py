@@ -0,0 +1,103 @@
+import json
+import pytest
+from unittest.mock import MagicMock, patch
+from network import opcodes as Opcodes
+from network.impl.chat import ChatPacket, ChatPacketData
+from network.impl.effect import EffectPacket, EffectPacketData
+from network.impl.movement import MovementPacket, MovementPacketData
+from network.impl.points import PointsPacket, PointsPacketData
+from network.impl.teleport import TeleportPacket, TeleportPacketData
+from network.modules import Effects
+from network.network_manager import NetworkManager
+from network.packet import Packet
+from network.packet_queue import PacketQueue
+
+
+def points(instance="0-1", **fields):
+    return PointsPacket(PointsPacketData(instance=instance, **fields))
+
+
+def step(x, instance="0-1"):
+    return MovementPacket(Opcodes.Movement.Step, MovementPacketData(instance=instance, x=x, y=0))
+
+
+def payloads(queue):
+    return [json.loads(fragment.payload) for fragment in queue.take()]
+
+
+def test_superseded_points_are_never_encoded():
+    queue = PacketQueue()
+    packets = [points(hit_points=hit_points) for hit_points in (50, 40, 30, 20, 10)]
+    expected = [packets[-1].serialize()]
+
+    with patch.object(Packet, "serialize", autospec=True, side_effect=Packet.serialize) as serialize:
+        queue.extend(packet.encode() for packet in packets)
+
+        assert len(queue) == 1
+        assert payloads(queue) == expected
+
+    assert serialize.call_count == 1
+    assert len(queue) == 0
+
+
+def test_points_only_supersede_the_same_fields():
+    queue = PacketQueue()
+    queue.append(points(hit_points=10).encode())
+    queue.append(points(mana=5).encode())
+    queue.append(points(hit_points=8).encode())
+    queue.append(points(instance="0-2", hit_points=3).encode())
+
+    assert payloads(queue) == [
+        points(mana=5).serialize(), points(hit_points=8).serialize(), points(instance="0-2", hit_points=3).serialize()
+    ]
+
+
+def test_latest_state_is_not_sent_ahead_of_earlier_packets():
+    queue = PacketQueue()
+    teleport = TeleportPacket(TeleportPacketData(instance="0-1", x=50, y=50))
+
+    for packet in (step(1), teleport, step(2)):
+        queue.append(packet.encode())
+
+    assert payloads(queue) == [teleport.serialize(), step(2).serialize()]
+
+
+def test_effect_add_and_remove_supersede_each_other():
+    queue = PacketQueue()
+    add = EffectPacket(Opcodes.Effect.Add, EffectPacketData(instance="0-1", effect=Effects.Burning))
+    remove = EffectPacket(Opcodes.Effect.Remove, EffectPacketData(instance="0-1", effect=Effects.Burning))
+    other = EffectPacket(Opcodes.Effect.Add, EffectPacketData(instance="0-1", effect=Effects.Stun))
+
+    for packet in (add, other, remove):
+        queue.append(packet.encode())
+
+    assert payloads(queue) == [other.serialize(), remove.serialize()]
+
+
+def test_packets_without_a_key_are_all_sent():
+    queue = PacketQueue()
+    chats = [ChatPacket(ChatPacketData(instance="0-1", message="hello")) for _ in range(3)]
+
+    queue.extend(packet.encode() for packet in chats)
+
+    assert len(queue) == 3
+    assert payloads(queue) == [chat.serialize() for chat in chats]
+
+
+@pytest.mark.anyio
+async def test_parse_sends_only_the_latest_points():
+    world = MagicMock()
+    world.database = None
+    network_manager = NetworkManager(world)
+
+    connection = MagicMock()
+    network_manager.socket_handler.get.return_value = connection
+    network_manager.create_packet_queue("0-1")
+
+    for hit_points in (50, 40, 30):
+        network_manager.send("0-1", points(hit_points=hit_points))
+
+    await network_manager.parse()
+
+    fragments = connection.queue_fragments.call_args.args[0]
+    assert [json.loads(fragment.payload) for fragment in fragments] == [points(hit_points=30).serialize()]
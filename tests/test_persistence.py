@@ -0,0 +1,284 @@
+import asyncio
+import pytest
+from unittest.mock import MagicMock
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+from database.mongodb_creator import Creator
+from database.persistence import Persistence
+from game.entity.character.player.player import Player
+
+
+class Collection:
+    def __init__(self, fail=False):
+        self.writes = []
+        self.fail = fail
+        self.failed_indices = []  # Writes rejected by the server, the others are applied.
+        self.gate = None  # Event the writes wait on when set, to hold them in flight.
+
+    async def bulk_write(self, operations, ordered=True):
+        if self.gate:
+            await self.gate.wait()
+
+        if self.fail:
+            raise RuntimeError("write failed")
+
+        self.writes.append(operations)
+
+        if self.failed_indices:
+            raise BulkWriteError({
+                "writeErrors": [{"index": index, "code": 11000, "errmsg": "duplicate key"} for index in self.failed_indices]
+            })
+
+
+class Database:
+    """
+    Stand-in for the `MongoDB` manager, recording the bulk writes made to each collection.
+    """
+
+    def __init__(self, fail=False):
+        self.collections = {}
+        self.fail = fail
+        self.database = self
+
+    def __getitem__(self, name):
+        if name not in self.collections:
+            self.collections[name] = Collection(self.fail)
+
+        return self.collections[name]
+
+
+def create_player(persistence, username, instance="1-1"):
+    world = MagicMock()
+    world.persistence = persistence
+
+    player = Player(world, MagicMock(address="127.0.0.1", instance=instance))
+    player.username = username
+
+    return player
+
+
+@pytest.fixture
+def database():
+    return Database()
+
+
+@pytest.mark.anyio
+async def test_unchanged_players_are_not_written(database):
+    persistence = Persistence(database)
+    player = create_player(persistence, "Tester")
+
+    persistence.add(player)
+    persistence.mark_dirty(player)
+    await persistence.flush_all()
+
+    assert database.collections == {}
+    assert persistence.skipped == 1
+    assert persistence.dirty == set()
+
+
+@pytest.mark.anyio
+async def test_only_changed_fields_are_set(database):
+    persistence = Persistence(database)
+    player = create_player(persistence, "Tester")
+    persistence.add(player)
+
+    player.set_last_warp(1234)
+    assert persistence.dirty == {"Tester"}
+
+    await persistence.flush_all()
+
+    assert database.collections["player_info"].writes == [
+        [UpdateOne({"username": "Tester"}, {"$set": {"lastWarp": 1234}}, upsert=True)]
+    ]
+
+    # The snapshot was updated, so the same data is not written again.
+    persistence.mark_dirty(player)
+    await persistence.flush_all()
+    assert len(database.collections["player_info"].writes) == 1
+
+
+@pytest.mark.anyio
+async def test_new_players_are_written_entirely(database):
+    persistence = Persistence(database)
+    player = create_player(persistence, "Tester")
+
+    persistence.add(player, saved=False)
+    await persistence.flush_all()
+
+    document = Creator.serialize(player).model_dump(mode="json", by_alias=True, exclude={"reset_token"})
+
+    assert database.collections["player_info"].writes == [
+        [UpdateOne({"username": "Tester"}, {"$set": document}, upsert=True)]
+    ]
+
+
+@pytest.mark.anyio
+async def test_players_of_a_flush_share_one_bulk_write(database):
+    persistence = Persistence(database, slots=1)
+    players = [create_player(persistence, f"Tester{index}", f"1-{index}") for index in range(3)]
+
+    for player in players:
+        persistence.add(player)
+        player.set_last_warp(5)
+
+    await persistence.flush_slot()
+
+    (operations,) = database.collections["player_info"].writes
+    assert len(operations) == 3
+    assert persistence.writes == 3
+
+
+@pytest.mark.anyio
+async def test_slots_stagger_flushes(database):
+    persistence = Persistence(database, slots=2)
+    first, second = create_player(persistence, "First", "1-1"), create_player(persistence, "Second", "1-2")
+    persistence.add(first)
+    persistence.add(second)
+
+    first.set_last_warp(1)
+    second.set_last_warp(1)
+
+    await persistence.flush_slot()
+    assert persistence.dirty == {"Second"}
+
+    await persistence.flush_slot()
+    assert persistence.dirty == set()
+    assert len(database.collections["player_info"].writes) == 2
+
+
+@pytest.mark.anyio
+async def test_failed_writes_are_retried():
+    database = Database(fail=True)
+    persistence = Persistence(database)
+    player = create_player(persistence, "Tester")
+    persistence.add(player)
+
+    player.set_last_warp(1)
+    await persistence.flush_all()
+
+    assert persistence.dirty == {"Tester"}
+    assert persistence.failures == 1
+
+    database.collections["player_info"].fail = False
+    await persistence.flush_all()
+
+    assert persistence.dirty == set()
+    assert persistence.writes == 1
+
+
+@pytest.mark.anyio
+async def test_remove_writes_pending_changes(database):
+    persistence = Persistence(database)
+    player = create_player(persistence, "Tester")
+    persistence.add(player)
+
+    player.set_last_warp(1)
+    await persistence.remove(player)
+
+    assert len(database.collections["player_info"].writes) == 1
+    assert persistence.players == {}
+
+
+@pytest.mark.anyio
+async def test_only_rejected_writes_are_retried(database):
+    persistence = Persistence(database)
+    first, second = create_player(persistence, "First", "1-1"), create_player(persistence, "Second", "1-2")
+    persistence.add(first)
+    persistence.add(second)
+
+    first.set_last_warp(1)
+    second.set_last_warp(1)
+    database["player_info"].failed_indices = [1]
+
+    await persistence.flush(["First", "Second"])
+
+    # The first player's write was applied, so only the second player's changes are kept.
+    assert first.changed_fields == set()
+    assert second.changed_fields == {"last_warp"}
+    assert persistence.dirty == {"Second"}
+    assert persistence.writes == 1
+
+
+@pytest.mark.anyio
+async def test_failed_logout_keeps_the_player():
+    database = Database(fail=True)
+    persistence = Persistence(database)
+    player = create_player(persistence, "Tester")
+    persistence.add(player)
+
+    player.set_last_warp(1)
+    persistence.schedule_remove(player)
+    await persistence.wait_for_removals()
+
+    # The changes are kept and written by a later flush, after which the player is forgotten.
+    assert persistence.players == {"Tester": player}
+    assert persistence.dirty == {"Tester"}
+
+    database.collections["player_info"].fail = False
+    await persistence.flush_all()
+
+    assert persistence.players == {}
+    assert persistence.leaving == set()
+    assert database.collections["player_info"].writes == [
+        [UpdateOne({"username": "Tester"}, {"$set": {"lastWarp": 1}}, upsert=True)]
+    ]
+
+
+@pytest.mark.anyio
+async def test_logout_during_a_failed_flush_keeps_the_changes(database):
+    persistence = Persistence(database)
+    player = create_player(persistence, "Tester")
+    persistence.add(player)
+
+    collection = database["player_info"]
+    collection.gate = asyncio.Event()
+    collection.fail = True
+
+    player.set_last_warp(1)
+    flush = asyncio.create_task(persistence.flush_slot())
+    await asyncio.sleep(0)
+
+    # The changes were taken by the flush in flight, so the logout has nothing to write.
+    await persistence.remove(player)
+    assert persistence.players == {"Tester": player}
+
+    collection.gate.set()
+    await flush
+
+    assert persistence.dirty == {"Tester"}
+    assert player.changed_fields == {"last_warp"}
+
+    collection.fail = False
+    await persistence.flush_all()
+
+    assert persistence.players == {}
+    assert collection.writes == [[UpdateOne({"username": "Tester"}, {"$set": {"lastWarp": 1}}, upsert=True)]]
+
+
+@pytest.mark.anyio
+async def test_guests_are_not_persisted(database):
+    persistence = Persistence(database)
+    guest = create_player(persistence, "Guest")
+    guest.is_guest = True
+
+    await guest.load(Creator.serialize(guest))
+    guest.set_position(5, 6)
+    await persistence.flush_all()
+
+    assert persistence.players == {}
+    assert database.collections == {}
+
+
+@pytest.mark.anyio
+async def test_players_without_a_document_are_written_entirely(database):
+    persistence = Persistence(database)
+    player = create_player(persistence, "Tester")
+
+    await player.load(Creator.serialize(player), saved=False)
+    await persistence.flush_all()
+
+    document = Creator.serialize(player).model_dump(mode="json", by_alias=True, exclude={"reset_token"})
+
+    assert database.collections["player_info"].writes == [
+        [UpdateOne({"username": "Tester"}, {"$set": document}, upsert=True)]
+    ]
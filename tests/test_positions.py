@@ -0,0 +1,104 @@
+import random
+import pytest
+from game.entity.entity import Entity
+from game.map.positions import Positions
+from game.map.regions import Regions
+
+
+class MockEntity(Entity):
+    __slots__ = ()
+
+    def serialize(self):
+        return super().serialize()
+
+
+@pytest.fixture
+def positions():
+    return Positions()
+
+
+def create_entities(positions, count, size=40):
+    rng = random.Random(7)
+    entities = []
+
+    for index in range(count):
+        entity = MockEntity(f"3-{index}", "rat", rng.randrange(size), rng.randrange(size))
+        positions.add(entity)
+        entities.append(entity)
+
+    return entities
+
+
+def test_set_position_writes_through(positions):
+    entity = MockEntity("3-1", "rat", 5, 6)
+    slot = positions.add(entity)
+
+    assert (positions.x[slot], positions.y[slot]) == (5, 6)
+
+    entity.set_position(7, 8)
+
+    assert (positions.x[slot], positions.y[slot]) == (7, 8)
+    assert (positions.old_x[slot], positions.old_y[slot]) == (5, 6)
+
+
+def test_slots_are_reused(positions):
+    first, second = MockEntity("3-1", "rat", 1, 1), MockEntity("3-2", "rat", 2, 2)
+    positions.add(first)
+    positions.add(second)
+
+    positions.remove(first)
+
+    assert first.slot == -1
+    assert positions.get_within(1, 1, 0) == []
+    assert len(positions) == 1
+
+    third = MockEntity("3-3", "rat", 3, 3)
+
+    assert positions.add(third) == 0
+    assert positions.get(0) is third
+    assert len(positions.x) == 2
+
+
+def test_get_within_matches_is_near(positions):
+    entities = create_entities(positions, 300)
+
+    for centre in entities[:20]:
+        for distance in (0, 1, 3, 8):
+            expected = [entity for entity in entities if centre.is_near(entity, distance)]
+            assert positions.get_within(centre.x, centre.y, distance) == expected
+
+
+def test_get_nearest_matches_get_distance(positions):
+    entities = create_entities(positions, 300)
+    candidates = entities[50:120]
+
+    for centre in entities[:20]:
+        expected = min(candidates, key=centre.get_distance)
+        nearest = positions.get_nearest(centre.x, centre.y, [entity.slot for entity in candidates])
+
+        assert nearest is expected
+
+    odd = positions.get_nearest(0, 0, predicate=lambda entity: int(entity.instance.split("-")[1]) % 2 == 1)
+    assert odd is min((entity for entity in entities[1::2]), key=lambda entity: entity.x + entity.y)
+
+    assert positions.get_nearest(0, 0, []) is None
+
+
+def test_regions_track_slots(positions):
+    regions = Regions(40, 30, 10)
+    entities = create_entities(positions, 50, 30)
+
+    for entity in entities:
+        regions.handle(entity)
+
+    centre = entities[0]
+    candidates = list(regions.get_surrounding_slots(centre.region))
+    expected = [entity for entity in entities if entity.slot in candidates and centre.is_near(entity, 4)]
+
+    assert sorted(positions.get_within(centre.x, centre.y, 4, candidates), key=entities.index) == expected
+
+    region = regions.get(entities[1].region)
+    assert entities[1].slot in region.slots
+
+    regions.remove(entities[1])
+    assert entities[1].slot not in region.slots
@@ -0,0 +1,131 @@
+import gzip
+import json
+from game.map.region_cache import RegionCache
+from network.impl.map import EncodedMapData, MapPacket
+
+
+def region_data(region_id):
+    return {"region": region_id, "data": [[region_id, index] for index in range(50)]}
+
+
+class Builder:
+    """
+    Counts how many times the map data of a region is built.
+    """
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, region_id):
+        def build():
+            self.calls.append(region_id)
+            return region_data(region_id)
+
+        return build
+
+
+def decode(encoded: EncodedMapData):
+    return json.loads(gzip.decompress(encoded.data))
+
+
+def test_region_is_encoded_once():
+    cache = RegionCache()
+    builder = Builder()
+
+    first = cache.get(1, 5, builder(5))
+    second = cache.get(1, 5, builder(5))
+
+    assert first is second
+    assert builder.calls == [5]
+    assert decode(first) == region_data(5)
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_map_version_is_part_of_the_key():
+    cache = RegionCache()
+    builder = Builder()
+
+    cache.get(1, 5, builder(5))
+    cache.get(2, 5, builder(5))
+
+    assert builder.calls == [5, 5]
+
+
+def test_least_recently_used_region_is_evicted():
+    cache = RegionCache(max_entries=2)
+    builder = Builder()
+
+    cache.get(1, 1, builder(1))
+    cache.get(1, 2, builder(2))
+    cache.get(1, 1, builder(1))  # Region 2 is now the least recently used.
+    cache.get(1, 3, builder(3))
+
+    assert list(cache.entries) == [(1, 1), (1, 3)]
+    assert cache.evictions == 1
+
+    cache.get(1, 2, builder(2))
+    assert builder.calls == [1, 2, 3, 2]
+
+
+def test_disabled_cache_always_encodes():
+    cache = RegionCache(enabled=False)
+    builder = Builder()
+
+    cache.get(1, 5, builder(5))
+    cache.get(1, 5, builder(5))
+
+    assert builder.calls == [5, 5]
+    assert len(cache) == 0
+
+
+def test_disk_cache_survives_a_new_cache(tmp_path):
+    builder = Builder()
+    encoded = RegionCache(directory=str(tmp_path)).get(1, 5, builder(5))
+
+    cache = RegionCache(directory=str(tmp_path))
+    restored = cache.get(1, 5, builder(5))
+
+    assert restored == encoded
+    assert builder.calls == [5]
+    assert cache.disk_hits == 1
+
+
+def test_evicted_regions_are_read_from_disk(tmp_path):
+    cache = RegionCache(max_entries=1, directory=str(tmp_path))
+    builder = Builder()
+
+    cache.get(1, 1, builder(1))
+    cache.get(1, 2, builder(2))
+    cache.get(1, 1, builder(1))
+
+    assert builder.calls == [1, 2]
+    assert cache.disk_hits == 1
+
+
+def test_corrupt_file_is_rebuilt(tmp_path):
+    cache = RegionCache(directory=str(tmp_path))
+    (tmp_path / "1-5.region").write_bytes(b"")
+
+    builder = Builder()
+    encoded = cache.get(1, 5, builder(5))
+
+    assert builder.calls == [5]
+    assert decode(encoded) == region_data(5)
+
+
+def test_clear_removes_a_map_version(tmp_path):
+    cache = RegionCache(directory=str(tmp_path))
+    builder = Builder()
+
+    cache.get(1, 5, builder(5))
+    cache.get(2, 5, builder(5))
+    cache.clear(1)
+
+    assert list(cache.entries) == [(2, 5)]
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["2-5.region"]
+
+
+def test_map_packet_accepts_encoded_data():
+    encoded = RegionCache().get(1, 5, lambda: region_data(5))
+
+    assert MapPacket(encoded).serialize() == MapPacket(region_data(5)).serialize()
@@ -0,0 +1,138 @@
+import pytest
+from unittest.mock import MagicMock
+from game.entity.character.character import Character
+from game.entity.entity import Entity
+from game.map.positions import Positions
+from game.map.regions import Regions
+from network.network_manager import NetworkManager
+from network.impl.points import PointsPacket, PointsPacketData
+
+
+class MockEntity(Entity):
+    def serialize(self):
+        return super().serialize()
+
+
+class MockCharacter(Character):
+    def serialize(self):
+        return super().serialize()
+
+
+@pytest.fixture
+def regions():
+    # 4 x 3 grid of regions that are 10 tiles wide.
+    return Regions(40, 30, 10)
+
+
+def test_get_region(regions):
+    assert regions.get_region(0, 0) == 0
+    assert regions.get_region(15, 5) == 1
+    assert regions.get_region(5, 15) == 4
+    assert regions.get_region(39, 29) == 11
+    assert regions.get_region(40, 0) == -1
+    assert regions.get_region(-1, 0) == -1
+
+
+def test_surrounding_regions_are_precomputed(regions):
+    assert sorted(regions.get_surrounding_regions(0)) == [0, 1, 4, 5]
+    assert sorted(regions.get_surrounding_regions(5)) == [0, 1, 2, 4, 5, 6, 8, 9, 10]
+    assert sorted(regions.get_surrounding_regions(11)) == [6, 7, 10, 11]
+    assert regions.get_surrounding_regions(5)[0] == 5
+    assert regions.get_surrounding_regions(-1) == ()
+    assert regions.surrounding[5] is regions.get_surrounding_regions(5)
+
+
+def test_handle_moves_entity_between_regions(regions):
+    player = MockEntity("0-1", "player", 5, 5)
+
+    assert regions.handle(player)
+    assert player.region == 0
+    assert "0-1" in regions.get(0).players
+
+    # Moving within the same region does nothing.
+    player.set_position(6, 6)
+    assert not regions.handle(player)
+
+    player.set_position(35, 5)
+    assert regions.handle(player)
+    assert player.region == 3
+    assert "0-1" not in regions.get(0).players
+    assert "0-1" in regions.get(3).players
+    assert sorted(player.recent_regions) == [0, 1, 4, 5]
+
+    regions.remove(player)
+    assert player.region == -1
+    assert not regions.get(3).has_entity(player)
+
+
+def test_non_players_are_not_recipients(regions):
+    mob = MockEntity("3-1", "rat", 5, 5)
+    regions.handle(mob)
+
+    assert regions.get(0).has_entity(mob)
+    assert not regions.get(0).has_players()
+
+
+def test_send_to_surrounding_regions(regions):
+    world = MagicMock()
+    world.regions = regions
+    network_manager = NetworkManager(world)
+
+    nearby = MockEntity("0-1", "player", 5, 5)
+    adjacent = MockEntity("0-2", "player", 15, 15)
+    distant = MockEntity("0-3", "player", 35, 25)
+
+    for player in (nearby, adjacent, distant):
+        regions.handle(player)
+        network_manager.create_packet_queue(player.instance)
+
+    packet = PointsPacket(PointsPacketData(instance="0-1", hit_points=1))
+    network_manager.send_to_surrounding_regions(nearby.region, packet, ignore="0-1")
+
+    assert len(network_manager.packets["0-1"]) == 0
+    assert len(network_manager.packets["0-2"]) == 1
+    assert len(network_manager.packets["0-3"]) == 0
+
+    network_manager.send_to_region(distant.region, packet)
+    assert len(network_manager.packets["0-3"]) == 1
+
+
+def test_added_entities_follow_their_position(regions):
+    mob = MockEntity("3-1", "rat", 5, 5)
+    regions.add(mob)
+
+    assert mob.region == 0
+    assert regions.get(0).has_entity(mob)
+
+    mob.set_position(35, 5)
+    assert mob.region == 3
+    assert not regions.get(0).has_entity(mob)
+    assert regions.get(3).has_entity(mob)
+
+    mob.update_position(5, 15)
+    assert mob.region == 4
+
+    regions.remove(mob)
+    mob.set_position(5, 5)
+    assert mob.region == -1
+    assert not regions.get(0).has_entity(mob)
+
+
+@pytest.mark.anyio
+async def test_characters_are_registered_when_created(world, regions):
+    world.positions = Positions()
+    world.regions = regions
+
+    player = MockCharacter("0-1", world, "player", 5, 5)
+    mob = MockCharacter("3-1", world, "rat", 6, 5)
+
+    # The mob never moved, but is in its region and found by the player.
+    assert regions.get(0).has_entity(mob)
+
+    nearby = []
+    player.for_each_nearby_character(nearby.append)
+    assert nearby == [mob]
+
+    player.set_position(15, 5)
+    assert player.region == 1
+    assert "0-1" in regions.get(1).players
@@ -0,0 +1,91 @@
+import pytest
+import asyncio
+from game.scheduler import Scheduler
+
+
+@pytest.fixture
+def scheduler():
+    scheduler = Scheduler()
+    yield scheduler
+    scheduler.stop()
+
+
+@pytest.mark.anyio
+async def test_callbacks_run_in_one_sweep(scheduler):
+    calls = []
+
+    scheduler.every(10, lambda: calls.append("a"))
+    scheduler.every(10, lambda: calls.append("b"))
+
+    await asyncio.sleep(0.015)
+
+    assert calls[:2] == ["a", "b"]
+
+
+@pytest.mark.anyio
+async def test_cancel_stops_callback_and_task(scheduler):
+    calls = []
+
+    interval = scheduler.every(10, lambda: calls.append(1))
+    interval.cancel()
+
+    await asyncio.sleep(0.025)
+
+    assert calls == []
+    assert not interval.is_active()
+    assert scheduler.buckets[10].task is None
+
+
+@pytest.mark.anyio
+async def test_cancel_during_sweep(scheduler):
+    calls = []
+    second = None
+
+    def first():
+        calls.append("first")
+        second.cancel()
+
+    scheduler.every(10, first)
+    second = scheduler.every(10, lambda: calls.append("second"))
+
+    await asyncio.sleep(0.015)
+
+    assert "second" not in calls
+
+
+@pytest.mark.anyio
+async def test_exception_does_not_stop_bucket(scheduler):
+    calls = []
+
+    def failing():
+        raise RuntimeError("failure")
+
+    scheduler.every(10, failing)
+    scheduler.every(10, lambda: calls.append(1))
+
+    await asyncio.sleep(0.025)
+
+    assert len(calls) >= 1
+
+
+@pytest.mark.anyio
+async def test_timeouts_run_in_deadline_order(scheduler):
+    calls = []
+
+    scheduler.timeout(30, lambda: calls.append("late"))
+    scheduler.timeout(10, lambda: calls.append("early"))
+
+    await asyncio.sleep(0.05)
+
+    assert calls == ["early", "late"]
+    assert scheduler.timer is None
+
+
+@pytest.mark.anyio
+async def test_cancelled_timeouts_are_compacted(scheduler):
+    for _ in range(100):
+        scheduler.timeout(1000, lambda: None).cancel()
+
+    scheduler.timeout(1000, lambda: None)
+
+    assert len(scheduler.timeouts) < 100
@@ -0,0 +1,102 @@
+import inspect
+import pytest
+from typing import Any, Dict, List, Optional, Union
+from unittest.mock import patch
+from pydantic import field_serializer
+
+import test_packets as packet_tests
+from network import serializer
+from network.model import CamelModel
+from network.modules import Hits, Orientation
+from network.shared_types import HitData, EntityData
+from network.impl.player import PlayerData
+
+
+class Child(CamelModel):
+    child_value: Optional[int] = None
+
+
+class GrandChild(Child):
+    extra_value: int = 1
+
+
+class Parent(CamelModel):
+    some_name: str
+    nested: Optional[Child] = None
+    children: List[Child] = []
+    mapping: Dict[str, Child] = {}
+    optional_items: List[Optional[int]] = []
+    optional_values: Dict[str, Optional[int]] = {}
+    either: Union[Child, int, None] = None
+    anything: Any = None
+    orientation: Orientation = Orientation.Up
+
+
+class Custom(CamelModel):
+    hit_count: int
+
+    @field_serializer("hit_count")
+    def double(self, value: int) -> int:
+        return value * 2
+
+
+MODELS = [
+    Parent(some_name="a"),
+    Parent(
+        some_name="b",
+        nested=GrandChild(child_value=1),
+        children=[Child(), Child(child_value=2)],
+        mapping={"x": Child(child_value=3)},
+        optional_items=[None, 1],
+        optional_values={"x": None, "y": 2},
+        either=GrandChild(),
+        anything={"k": None, "m": Child(child_value=4), "l": [Child()]}
+    ),
+    Parent(some_name="c", either=5, anything=(1, None)),
+    Custom(hit_count=3),
+    HitData(type=Hits.Critical, damage=5, aoe=None, poison=True),
+    EntityData(instance="1-1", type=1, key="rat", name="Rat", x=1, y=2),
+    PlayerData(instance="0-1", type=0, key="player", name="Name", x=1, y=2, rank=0, pvp=False, equipments=[])
+]
+
+
+@pytest.mark.parametrize("model", MODELS)
+def test_matches_model_dump(model):
+    expected = model.model_dump(by_alias=True, exclude_none=True)
+    result = serializer.serialize(model)
+
+    assert result == expected
+    assert [type(value) for value in result.values()] == [type(value) for value in expected.values()]
+
+
+def test_serializer_is_generated_once():
+    assert Parent in serializer._serializers
+    first = serializer.compile_serializer(Parent)
+    assert serializer.compile_serializer(Parent) is first
+
+
+def test_custom_serializer_falls_back_to_model_dump():
+    assert serializer.compile_serializer(Custom) is serializer._dump
+    assert serializer.serialize(Custom(hit_count=3)) == {"hitCount": 6}
+
+
+def test_packet_tests_parity():
+    """
+    Runs every packet test with a check that the fast path matches `model_dump`
+    for each model serialized along the way.
+    """
+    fast = serializer.serialize
+    checked = []
+
+    def checked_serialize(model):
+        result = fast(model)
+        assert result == model.model_dump(by_alias=True, exclude_none=True)
+        checked.append(model)
+        return result
+
+    with patch("network.packet.serialize", side_effect=checked_serialize):
+        for name, test in inspect.getmembers(packet_tests, inspect.isfunction):
+            if name.startswith("test_") and not inspect.signature(test).parameters:
+                test()
+
+    assert checked
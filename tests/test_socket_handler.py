@@ -0,0 +1,131 @@
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from network.connection import Connection
+from network.modules import Constants
+from network.socket_handler import SocketHandler
+
+
+def create_connection(instance):
+    socket = MagicMock()
+    socket.client = MagicMock(host="127.0.0.1")
+    socket.close = AsyncMock()
+
+    connection = Connection(instance, socket)
+    connection.timeout_duration = 10
+    connection.last_activity = 100.0
+
+    return connection
+
+
+@pytest.mark.anyio
+async def test_idle_connection_is_timed_out():
+    handler = SocketHandler()
+    connection = create_connection("1-1")
+    connection.reject = AsyncMock()
+
+    await handler.add(connection)
+
+    await handler.sweep(now=109.0)
+    connection.reject.assert_not_called()
+
+    await handler.sweep(now=110.0)
+    connection.reject.assert_awaited_once_with("timeout")
+    assert handler.deadlines == []
+
+    handler.stop()
+
+
+@pytest.mark.anyio
+async def test_active_connection_is_pushed_back():
+    handler = SocketHandler()
+    connection = create_connection("1-1")
+    connection.reject = AsyncMock()
+
+    await handler.add(connection)
+
+    connection.refresh_timeout(105.0)
+    await handler.sweep(now=111.0)
+
+    connection.reject.assert_not_called()
+    assert handler.deadlines == [(115.0, "1-1")]
+
+    await handler.sweep(now=115.0)
+    connection.reject.assert_awaited_once_with("timeout")
+
+    handler.stop()
+
+
+@pytest.mark.anyio
+async def test_removed_and_closed_connections_are_discarded():
+    handler = SocketHandler()
+    removed, closed = create_connection("1-1"), create_connection("1-2")
+    removed.reject, closed.reject = AsyncMock(), AsyncMock()
+
+    await handler.add(removed)
+    await handler.add(closed)
+
+    handler.remove("1-1")
+    closed.closed = True
+
+    await handler.sweep(now=200.0)
+
+    removed.reject.assert_not_called()
+    closed.reject.assert_not_called()
+    assert handler.deadlines == []
+    assert not handler.has_connections()
+
+    handler.stop()
+
+
+@pytest.mark.anyio
+async def test_one_sweep_task_for_every_connection():
+    handler = SocketHandler()
+
+    await handler.add(create_connection("1-1"))
+    task = handler.sweep_task
+
+    await handler.add(create_connection("1-2"))
+
+    assert handler.sweep_task is task
+
+    handler.stop()
+    assert handler.sweep_task is None
+
+
+@pytest.mark.anyio
+async def test_duplicate_count_includes_removed_connections():
+    handler = SocketHandler()
+    first, second = create_connection("1-1"), create_connection("1-2")
+
+    await handler.add(first)
+    await handler.add(second)
+
+    first.duplicates, second.duplicates = 3, 2
+    handler.remove("1-1")
+
+    assert handler.get_duplicate_count() == 5
+
+    handler.stop()
+
+
+@pytest.mark.anyio
+async def test_connections_are_indexed_by_address(monkeypatch):
+    monkeypatch.setattr(Constants, "MAX_CONNECTIONS", 2)
+    handler = SocketHandler()
+    first, second = create_connection("1-1"), create_connection("1-2")
+
+    assert handler.admit("127.0.0.1") is None
+    await handler.add(first)
+    assert handler.admit("127.0.0.1") is None
+    await handler.add(second)
+
+    assert set(handler.get_connections("127.0.0.1")) == {first, second}
+    assert handler.admit("127.0.0.1") == "toomany"
+
+    handler.remove("1-1")
+    assert handler.get_connections("127.0.0.1") == [second]
+
+    handler.remove("1-2")
+    assert handler.addresses == {}
+
+    handler.stop()
@@ -1,13 +1,20 @@
 import pytest
 import asyncio
 import time
-from game.entity.character.effect.status import Status
+from game.entity.character.effect.status import Status, effect_mask
+from game.scheduler import Scheduler
 from network.modules import Effects
 from database.models.player import SerializedDuration
 
 @pytest.fixture
-def status_system():
-    return Status()
+def scheduler():
+    scheduler = Scheduler()
+    yield scheduler
+    scheduler.stop()
+
+@pytest.fixture
+def status_system(scheduler):
+    return Status(scheduler)
 
 @pytest.mark.anyio
 async def test_add_remove_effect(status_system):
@@ -56,7 +63,7 @@ async def test_permanent_freezing(status_system):
     assert not status_system.has_timeout(Effects.Freezing)
 
 @pytest.mark.anyio
-async def test_serialize_load(status_system):
+async def test_serialize_load(status_system, scheduler):
     # Use a longer duration for serialization to avoid race conditions
     status_system.add_with_timeout(Effects.Stun, 5000)
     
@@ -64,7 +71,7 @@ async def test_serialize_load(status_system):
     assert int(Effects.Stun) in serialized
     assert serialized[int(Effects.Stun)].remaining_time > 3000
 
-    new_status_system = Status()
+    new_status_system = Status(scheduler)
     new_status_system.load(serialized)
     
     assert new_status_system.has(Effects.Stun)
@@ -83,3 +90,66 @@ async def test_callbacks(status_system):
     
     status_system.remove(Effects.Stun)
     assert Effects.Stun in removed
+
+@pytest.mark.anyio
+async def test_refresh_invalidates_previous_timeout(status_system, scheduler):
+    removed = []
+    status_system.on_remove(lambda s: removed.append(s))
+
+    status_system.add_with_timeout(Effects.Stun, 50)
+    status_system.add_with_timeout(Effects.Stun, 150)
+
+    # Only one live entry, the refreshed one is discarded lazily.
+    assert sum(not entry[2].cancelled for entry in scheduler.timeouts) == 1
+
+    await asyncio.sleep(0.1)
+    assert status_system.has(Effects.Stun)
+    assert removed == []
+
+    await asyncio.sleep(0.1)
+    assert not status_system.has(Effects.Stun)
+    assert removed == [Effects.Stun]
+
+@pytest.mark.anyio
+async def test_remove_cancels_timeout(status_system, scheduler):
+    callback_called = False
+    def callback():
+        nonlocal callback_called
+        callback_called = True
+
+    status_system.add_with_timeout(Effects.Stun, 50, callback)
+    status_system.remove(Effects.Stun)
+
+    await asyncio.sleep(0.1)
+
+    assert not callback_called
+    assert scheduler.timeouts == []
+
+@pytest.mark.anyio
+async def test_effect_mask_checks(status_system):
+    blockers = effect_mask(Effects.Freezing, Effects.Burning, Effects.Terror)
+
+    assert not status_system.has_any(blockers)
+
+    status_system.add(Effects.Burning, Effects.Stun)
+    assert status_system.has_any(blockers)
+    assert not status_system.has_all(blockers)
+    assert status_system.has_all(effect_mask(Effects.Burning, Effects.Stun))
+
+    status_system.remove(Effects.Burning)
+    assert not status_system.has_any(blockers)
+
+    status_system.clear()
+    assert status_system.mask == 0
+
+@pytest.mark.anyio
+async def test_for_each_effect_keeps_insertion_order(status_system):
+    status_system.add(Effects.Freezing, Effects.Burning, Effects.Stun)
+    status_system.add(Effects.Freezing)
+    status_system.remove(Effects.Burning)
+    status_system.add(Effects.Burning)
+
+    effects = []
+    status_system.for_each_effect(effects.append)
+
+    assert effects == [Effects.Freezing, Effects.Stun, Effects.Burning]